@@ -15,15 +15,26 @@ def create_note(
     image_filename: str | None,
     audio_filename: str,
     unique_id: str,
+    extra_audio_filenames: list[str] | None = None,
 ) -> genanki.Note:
-    """Create an Anki note."""
+    """
+    Create an Anki note.
+
+    Extra audio (e.g. slow or second-voice variants) is added as further
+    ``[sound:]`` tags in the Audio Sentence field, played after the main one.
+    The note's GUID comes from ``unique_id``, so re-importing a regenerated
+    card updates the existing note instead of adding a duplicate.
+    """
     image_field = f'<img src="{image_filename}">' if image_filename else ""
+    audio_field = "".join(
+        f"[sound:{name}]" for name in [audio_filename, *(extra_audio_filenames or [])]
+    )
     core_fields = [
         expression,
         english,
         reading,
         image_field,
-        f"[sound:{audio_filename}]",
+        audio_field,
         unique_id,
     ]
     # Pad with empty strings for the 33 additional fields (vocab, kanji, grammar)
@@ -31,6 +42,7 @@ def create_note(
     return genanki.Note(
         model=IMMERSION_KIT_MODEL,
         fields=fields,
+        guid=genanki.guid_for(unique_id),
     )
 
 
@@ -8,6 +8,8 @@ import tempfile
 import zipfile
 from dataclasses import dataclass, field
 
+from ..media.placement import replacing
+
 
 FIELD_SEPARATOR = "\x1f"
 
@@ -103,8 +105,9 @@ def extract_media(apkg_path: str, output_dir: str) -> list[str]:
         for archive_name, real_name in media_mapping.items():
             if archive_name in z.namelist():
                 dest = os.path.join(output_dir, real_name)
-                with z.open(archive_name) as src, open(dest, "wb") as dst:
-                    shutil.copyfileobj(src, dst)
+                with replacing(dest) as tmp_path:
+                    with z.open(archive_name) as src, open(tmp_path, "wb") as dst:
+                        shutil.copyfileobj(src, dst)
                 extracted.append(dest)
 
     return extracted
@@ -1,7 +1,25 @@
 import click
+import json
+import tempfile
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from .config.settings import Settings
-from .core import furigana, translation, audio, image, transcription
+from .core import (
+    furigana,
+    translation,
+    audio,
+    image,
+    image_processing,
+    transcription,
+    clips,
+    subtitles,
+)
+from .core.concurrency import coalesced_count, limiter_stats
+from .core.encoding import ENCODING_PRESETS, get_preset
+from .core.fingerprint import get_fingerprint_index
+from .core.image_processing import IMAGE_PRESETS, get_image_preset
 from .anki.card_builder import (
     create_note,
     create_note_from_fields,
@@ -9,18 +27,39 @@ from .anki.card_builder import (
     export_package,
 )
 from .anki.reader import read_apkg, extract_media
-from .media.manager import generate_unique_id, generate_media_filenames
-from .media.bundler import extract_from_zip, copy_media_file
+from .media.placement import placement_stats
+from .media.store import STORE_DIRNAME, rename_references, store_media
+from .media.manager import (
+    DEFAULT_NAMESPACE,
+    generate_media_filenames,
+    generate_unique_id,
+    normalize_sentence,
+    source_namespace,
+)
+from .media.bundler import (
+    Bundle,
+    copy_media_file,
+    extract_from_zip,
+    extract_member,
+    iter_bundles,
+    read_member_text,
+)
 from .config.cache import is_cached, mark_cached
 
 
-def transcribe_with_error_handling(audio_path: str, settings) -> str:
+TTS_BACKENDS = ["voicevox", "gtts", "openai"]
+
+
+def transcribe_with_error_handling(
+    audio_path: str, settings, reuse: bool = True
+) -> str:
     """
     Transcribe audio file with proper error handling.
 
     Args:
         audio_path: Path to audio file
         settings: Settings object with openai_api_key
+        reuse: Reuse the transcript of a near-duplicate clip heard before
 
     Returns:
         Transcribed text
@@ -36,7 +75,9 @@ def transcribe_with_error_handling(audio_path: str, settings) -> str:
 
     click.echo(f"Transcribing: {audio_path}")
     try:
-        text = transcription.transcribe_audio(audio_path, settings.openai_api_key)
+        text = transcription.transcribe_audio(
+            audio_path, settings.openai_api_key, reuse=reuse
+        )
         click.echo(f"Transcribed: {text}\n")
         return text
     except Exception as e:
@@ -111,11 +152,31 @@ def translate(sentence, audio_path, use_ai, model):
 
 
 @cli.command()
-@click.argument("audio_path", type=click.Path(exists=True), metavar="<audio_file>")
-@click.option("--output", help="Save transcription to file")
+@click.argument(
+    "audio_paths",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True),
+    metavar="<audio_file>...",
+)
+@click.option(
+    "--output", help="Save transcription to file (JSON Lines for a directory)"
+)
 @click.option("--language", default="ja", help="Audio language code (default: ja)")
-def transcribe(audio_path, output, language):
-    """Transcribe audio file to text using Whisper."""
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Files transcribed at once when given a directory",
+)
+@click.option(
+    "--no-reuse-transcripts",
+    is_flag=True,
+    help="Send every clip to Whisper, even near-duplicates of earlier ones",
+)
+def transcribe(audio_paths, output, language, jobs, no_reuse_transcripts):
+    """Transcribe audio files, ZIP bundles, or a directory using Whisper."""
     settings = Settings.load()
 
     if not settings.openai_api_key:
@@ -126,40 +187,190 @@ def transcribe(audio_path, output, language):
         )
         raise click.Abort()
 
-    # Validate audio file
-    if not transcription.validate_audio_file(audio_path):
-        click.echo(
-            "Error: Invalid or unsupported audio file.\n"
-            "Supported formats: MP3, WAV, M4A, MP4, MPEG, MPGA, WEBM",
-            err=True,
+    if len(audio_paths) == 1 and Path(audio_paths[0]).is_dir():
+        transcribe_directory(
+            audio_paths[0],
+            output,
+            language,
+            jobs,
+            settings,
+            reuse=not no_reuse_transcripts,
         )
-        raise click.Abort()
+        return
+
+    with tempfile.TemporaryDirectory() as bundle_dir:
+        # ZIP bundles contribute their audio clip
+        clip_paths = []
+        for path in audio_paths:
+            if Path(path).suffix.lower() == ".zip":
+                extracted = extract_from_zip(path, bundle_dir)
+                if not extracted["audio"]:
+                    click.echo(f"Error: No audio file found in {path}", err=True)
+                    raise click.Abort()
+                clip_paths.append(extracted["audio"])
+            else:
+                clip_paths.append(path)
+
+        # Validate audio files
+        for path in clip_paths:
+            if not transcription.validate_audio_file(path):
+                click.echo(
+                    "Error: Invalid or unsupported audio file.\n"
+                    "Supported formats: MP3, WAV, M4A, MP4, MPEG, MPGA, WEBM, OGG, FLAC",
+                    err=True,
+                )
+                raise click.Abort()
 
-    click.echo(f"Transcribing: {audio_path}")
+        try:
+            if len(clip_paths) == 1:
+                click.echo(f"Transcribing: {audio_paths[0]}")
+                result = transcription.transcribe_audio(
+                    clip_paths[0],
+                    settings.openai_api_key,
+                    language,
+                    reuse=not no_reuse_transcripts,
+                )
+            else:
+                click.echo(f"Transcribing {len(clip_paths)} files")
+                texts = transcription.transcribe_clips(
+                    clip_paths,
+                    settings.openai_api_key,
+                    language,
+                    reuse=not no_reuse_transcripts,
+                )
+                result = "\n".join(
+                    f"{Path(path).name}\t{text}"
+                    for path, text in zip(audio_paths, texts)
+                )
 
-    try:
-        result = transcription.transcribe_audio(
-            audio_path, settings.openai_api_key, language
-        )
+            if output:
+                with open(output, "w", encoding="utf-8") as f:
+                    f.write(result)
+                click.echo(f"Saved transcription to: {output}")
 
-        if output:
-            with open(output, "w", encoding="utf-8") as f:
-                f.write(result)
-            click.echo(f"Saved transcription to: {output}")
+            click.echo(result)
+        except Exception as e:
+            click.echo(f"Error: {e}", err=True)
+            raise click.Abort()
 
-        click.echo(result)
-    except Exception as e:
-        click.echo(f"Error: {e}", err=True)
+
+def transcribe_directory(
+    directory: str,
+    output: str | None,
+    language: str,
+    jobs: int,
+    settings,
+    reuse: bool = True,
+) -> None:
+    """
+    Transcribe every audio file under a directory, one JSON line per file.
+
+    Lines hold the file's path relative to ``directory``, its text,
+    duration, and request latency, and are appended to ``output`` (or
+    printed) as files finish. Files already recorded in ``output`` are
+    skipped, so an interrupted run picks up where it stopped; failed files
+    are left out so the next run retries them.
+
+    Args:
+        directory: Folder to walk for audio and video files
+        output: JSON Lines file to append to, or None for stdout
+        language: Audio language code
+        jobs: Files transcribed at once
+        settings: Settings object with openai_api_key
+        reuse: Reuse the transcript of a near-duplicate clip heard before
+
+    Raises:
+        click.Abort: If any file failed
+    """
+    root = Path(directory)
+    done = set()
+    if output and Path(output).exists():
+        with open(output, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["file"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    files = {
+        path.relative_to(root).as_posix(): path
+        for path in transcription.find_audio_files(directory)
+    }
+    pending = [name for name in files if name not in done]
+    skipped = len(files) - len(pending)
+    click.echo(
+        f"Transcribing {len(pending)} of {len(files)} files"
+        + (f" ({skipped} already in {output})" if skipped else ""),
+        err=True,
+    )
+
+    def run(name: str) -> dict:
+        started = time.perf_counter()
+        text = transcription.transcribe_audio(
+            str(files[name]), settings.openai_api_key, language, reuse=reuse
+        )
+        latency = time.perf_counter() - started
+        return {
+            "file": name,
+            "text": text,
+            "duration": transcription.audio_duration(str(files[name])),
+            "latency": round(latency, 3),
+        }
+
+    failed = 0
+    sink = open(output, "a", encoding="utf-8") if output else None
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(run, name): name for name in pending}
+            for future in as_completed(futures):
+                try:
+                    record = future.result()
+                except Exception as e:
+                    failed += 1
+                    click.echo(f"Error: {futures[future]}: {e}", err=True)
+                    continue
+                line = json.dumps(record, ensure_ascii=False)
+                if sink:
+                    sink.write(line + "\n")
+                    sink.flush()
+                    click.echo(f"Transcribed: {record['file']}", err=True)
+                else:
+                    click.echo(line)
+    finally:
+        if sink:
+            sink.close()
+
+    click.echo(f"Done: {len(pending) - failed} transcribed, {failed} failed", err=True)
+    if failed:
         raise click.Abort()
 
 
-def ensure_voicevox_or_fallback(settings, use_gtts: bool) -> bool:
+def start_warmup(settings, speaker_id: int | None = None, variants=()):
+    """
+    Preload the speakers a command will use, in the background.
+
+    Only talks to an engine that is already running; starting the container
+    is left to the prompt in ``ensure_voicevox_or_fallback`` and to
+    ``ankicard warmup``.
+
+    Args:
+        settings: Settings object with voicevox_url
+        speaker_id: Speaker from --speaker-id, or None for the default
+        variants: Resolved (speaker, speed) voice variants, if any
+    """
+    default = speaker_id if speaker_id is not None else settings.voicevox_speaker_id
+    speakers = [speaker for speaker, _ in variants] or [default]
+    return audio.start_voicevox_warmup(settings.voicevox_url, speakers)
+
+
+def ensure_voicevox_or_fallback(settings, use_gtts: bool, warmup=None) -> bool:
     """
     Check VOICEVOX availability and optionally start Docker.
 
     Args:
         settings: Settings object with voicevox_url
         use_gtts: If True, skip VOICEVOX entirely
+        warmup: Future from ``start_warmup``; waited on before probing
 
     Returns:
         True if VOICEVOX should be used, False to use gTTS
@@ -167,7 +378,15 @@ def ensure_voicevox_or_fallback(settings, use_gtts: bool) -> bool:
     if use_gtts:
         return False
 
-    if audio.is_voicevox_available(settings.voicevox_url):
+    if warmup is not None:
+        try:
+            if warmup.result():
+                return True
+        except Exception as e:
+            click.echo(f"VOICEVOX warm-up failed: {e}", err=True)
+
+    health = audio.get_voicevox_health(settings.voicevox_url)
+    if health.is_available():
         return True
 
     # Detect container runtime for user-facing messages
@@ -189,6 +408,7 @@ def ensure_voicevox_or_fallback(settings, use_gtts: bool) -> bool:
     ):
         click.echo(f"Starting VOICEVOX {runtime} container...")
         if audio.start_voicevox_docker(base_url=settings.voicevox_url):
+            health.record_success()
             click.echo("VOICEVOX is ready!")
             return True
         else:
@@ -202,9 +422,379 @@ def ensure_voicevox_or_fallback(settings, use_gtts: bool) -> bool:
         return False
 
 
+def require_openai_for_translation(settings) -> None:
+    """Abort if OpenAI translation was requested without an API key."""
+    if not settings.openai_api_key:
+        click.echo("Error: OPENAI_API_KEY required for OpenAI translation", err=True)
+        click.echo("Add your OpenAI API key to .env file.", err=True)
+        raise click.Abort()
+
+
+def require_openai_for_enhancement(settings) -> None:
+    """Abort if speech enhancement was requested without an API key."""
+    if not settings.openai_api_key:
+        click.echo("Error: OPENAI_API_KEY required for speech enhancement", err=True)
+        click.echo("Add your OpenAI API key to .env file.", err=True)
+        raise click.Abort()
+
+
+def enhance_speech_texts(sentences: list[str], settings) -> list[str]:
+    """Add natural pauses to sentences before synthesis, batched and cached."""
+    require_openai_for_enhancement(settings)
+    return audio.enhance_texts_for_speech(sentences, api_key=settings.openai_api_key)
+
+
+def translate_sentence(sentence: str, settings, use_ai: bool, model: str) -> str:
+    """Translate a sentence with OpenAI Chat or Google Translate."""
+    if use_ai:
+        return translation.translate_to_english_openai(
+            sentence, api_key=settings.openai_api_key, model=model
+        )
+    return translation.translate_to_english(sentence)
+
+
+def synthesize_sentence(
+    sentence: str,
+    output: str,
+    settings,
+    use_voicevox: bool,
+    speaker_id: int | None = None,
+    speed: float | None = None,
+    preset: str = "mp3",
+    backend: str = "voicevox",
+) -> str:
+    """
+    Generate sentence audio with VOICEVOX, gTTS, or OpenAI TTS.
+
+    With the VOICEVOX backend, falls back to gTTS when the circuit is open
+    or synthesis fails, so a hung engine costs at most a few timeouts per
+    batch.
+    """
+    if backend == "openai":
+        return audio.generate_audio_openai(
+            sentence, output, api_key=settings.openai_api_key, preset=preset
+        )
+    health = audio.get_voicevox_health(settings.voicevox_url)
+    if use_voicevox and health.breaker.allow():
+        try:
+            return audio.generate_audio_voicevox(
+                sentence,
+                output,
+                base_url=settings.voicevox_url,
+                speaker_id=speaker_id
+                if speaker_id is not None
+                else settings.voicevox_speaker_id,
+                speed=speed if speed is not None else 0.95,
+                preset=preset,
+            )
+        except Exception as e:
+            health.breaker.release()
+            click.echo(f"Warning: {e}. Falling back to gTTS.", err=True)
+    return audio.generate_audio(sentence, output, preset=preset)
+
+
+def parse_voice_variants(ctx, param, value) -> list[tuple[int | None, float | None]]:
+    """Parse ``--variant SPEAKER:SPEED`` values; either part may be left empty."""
+    variants = []
+    for raw in value:
+        speaker, _, speed = raw.partition(":")
+        try:
+            variants.append(
+                (
+                    int(speaker) if speaker.strip() else None,
+                    float(speed) if speed.strip() else None,
+                )
+            )
+        except ValueError:
+            raise click.BadParameter(
+                f"{raw!r} is not SPEAKER:SPEED (e.g. 13:0.95 or :0.7)"
+            )
+    return variants
+
+
+def resolve_voice_variants(
+    variants, settings, speaker_id: int | None, speed: float | None
+) -> list[tuple[int, float]]:
+    """Fill unset variant parts from --speaker-id/--speed or the defaults."""
+    default_speaker = (
+        speaker_id if speaker_id is not None else settings.voicevox_speaker_id
+    )
+    default_speed = speed if speed is not None else 0.95
+    return [
+        (
+            variant_speaker if variant_speaker is not None else default_speaker,
+            variant_speed if variant_speed is not None else default_speed,
+        )
+        for variant_speaker, variant_speed in variants
+    ]
+
+
+def synthesize_variants(
+    sentence: str,
+    outputs: list[str],
+    settings,
+    use_voicevox: bool,
+    variants: list[tuple[int, float]],
+    preset: str = "mp3",
+) -> list[str]:
+    """
+    Generate every voice variant of a sentence in one pass.
+
+    Falls back to a single gTTS track when VOICEVOX is unavailable, since
+    gTTS has neither speakers nor speed control.
+    """
+    health = audio.get_voicevox_health(settings.voicevox_url)
+    if use_voicevox and health.breaker.allow():
+        try:
+            return audio.generate_audio_voicevox_variants(
+                sentence,
+                outputs,
+                variants,
+                base_url=settings.voicevox_url,
+                preset=preset,
+            )
+        except Exception as e:
+            health.breaker.release()
+            click.echo(f"Warning: {e}. Falling back to gTTS.", err=True)
+    if len(variants) > 1:
+        click.echo(
+            "Warning: Voice variants need VOICEVOX; using one gTTS track.", err=True
+        )
+    return [audio.generate_audio(sentence, outputs[0], preset=preset)]
+
+
+def resolve_tts_backend(settings, backend: str, use_gtts: bool) -> str:
+    """Apply --use-gtts and check that the chosen TTS backend can run."""
+    if use_gtts:
+        return "gtts"
+    if backend == "openai" and not settings.openai_api_key:
+        click.echo("Error: OPENAI_API_KEY required for OpenAI TTS", err=True)
+        raise click.Abort()
+    return backend
+
+
+def resolve_audio_preset(settings, audio_preset: str | None) -> str:
+    """Pick the --audio-preset value or the configured AUDIO_PRESET."""
+    try:
+        return get_preset(audio_preset or settings.audio_preset).name
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+
+
+def resolve_image_preset(settings, image_preset: str | None):
+    """Pick the --image-preset value or the configured IMAGE_PRESET."""
+    try:
+        return get_image_preset(image_preset or settings.image_preset)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+
+
+def convert_image(source_path: str, output_path: str, preset) -> str:
+    """Fit a user-supplied image to the image preset, aborting if unreadable."""
+    try:
+        return image_processing.convert_image_file(source_path, output_path, preset)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+
+
+def illustrate_in_grids(
+    pool: ThreadPoolExecutor, futures: list, grid: int, settings, preset
+) -> list[Future]:
+    """
+    Illustrate built cards that have no image, ``grid`` x ``grid`` per call.
+
+    Cards are grouped in input order; each group waits for its cards, then
+    makes one grid request (see ``image.generate_images``). Submit this
+    after the build tasks so groups only wait on work already started.
+
+    Args:
+        pool: Executor the cards are being built on
+        futures: Futures of built card dicts
+        grid: Panels per side
+        settings: Settings with the Gemini key and media directory
+        preset: Image preset for the tiles
+
+    Returns:
+        A future per card resolving to the card with its image
+    """
+    illustrated = [Future() for _ in futures]
+
+    def illustrate(indices: range) -> None:
+        cards = {}
+        for i in indices:
+            try:
+                cards[i] = futures[i].result()
+            except Exception as e:
+                illustrated[i].set_exception(e)
+        try:
+            pending = [i for i, card in cards.items() if not card["image"]]
+            paths = image.generate_images(
+                [cards[i]["english"] for i in pending],
+                [
+                    str(Path(settings.media_dir) / cards[i]["filenames"]["image"])
+                    for i in pending
+                ],
+                settings.gemini_api_key,
+                preset,
+                grid,
+            )
+        except Exception as e:
+            for i in cards:
+                illustrated[i].set_exception(e)
+            return
+        for i, path in zip(pending, paths):
+            cards[i] = {**cards[i], "image": path}
+        for i, card in cards.items():
+            illustrated[i].set_result(card)
+
+    per_call = grid * grid
+    for first in range(0, len(futures), per_call):
+        pool.submit(illustrate, range(first, min(first + per_call, len(futures))))
+    return illustrated
+
+
+def echo_media_size(media_files: list[str], audio_files: list[str], cards: int) -> None:
+    """Print average media bytes per card, to tune package size."""
+    total = sum(Path(f).stat().st_size for f in media_files if Path(f).exists())
+    audio_bytes = sum(Path(f).stat().st_size for f in audio_files if Path(f).exists())
+    click.echo(
+        f"Media per card: {total / cards / 1024:.1f} KB "
+        f"(audio {audio_bytes / cards / 1024:.1f} KB)"
+    )
+    placed = placement_stats()
+    linked = placed["reflink"] + placed["hardlink"]
+    copied = placed["copy_file_range"] + placed["copy"]
+    if linked or copied:
+        click.echo(
+            f"Media staged: {linked} linked, {copied} copied "
+            f"({placed['bytes_copied'] / 1024:.1f} KB)"
+        )
+
+
+def echo_provider_stats() -> None:
+    """Print the current adaptive concurrency limit for each provider."""
+    coalesced = coalesced_count()
+    if coalesced:
+        click.echo(f"Coalesced duplicate calls: {coalesced}")
+    stats = limiter_stats()
+    if not stats:
+        return
+    click.echo("Provider limits:")
+    for provider, s in stats.items():
+        p95 = f"{s['p95_latency']:.2f}s" if s["p95_latency"] is not None else "n/a"
+        click.echo(
+            f"  {provider}: limit={s['limit']} p95={p95} backoffs={s['decreases']}"
+        )
+
+
+def line_namespaces(sentences: list[str], sentences_file: str) -> list[str]:
+    """
+    ID namespace for each line of a sentences file.
+
+    A sentence's first line uses the default namespace, so it keeps the ID
+    it would get anywhere else; repeats are namespaced by file name and line
+    number, so each becomes its own card with its own media.
+    """
+    seen = set()
+    namespaces = []
+    for line, sentence in enumerate(sentences, start=1):
+        key = normalize_sentence(sentence)
+        if key in seen:
+            namespaces.append(f"{Path(sentences_file).name}:{line}")
+        else:
+            seen.add(key)
+            namespaces.append(DEFAULT_NAMESPACE)
+    return namespaces
+
+
+def store_card_media(card: dict, store_dir: Path) -> dict:
+    """Move a built card's media into the content-addressed store, renamed."""
+    stored = {
+        key: store_media(card[key], str(store_dir)) if card[key] else None
+        for key in ("audio", "image")
+    }
+    extra_audio = [store_media(p, str(store_dir)) for p in card["extra_audio"]]
+    filenames = dict(card["filenames"])
+    for key, path in stored.items():
+        if path:
+            filenames[key] = Path(path).name
+    filenames["extra_audio"] = [Path(p).name for p in extra_audio]
+    return {**card, **stored, "extra_audio": extra_audio, "filenames": filenames}
+
+
+def export_cards(
+    labels: list[str], futures: list, settings, dedupe_media: bool = False
+) -> Path:
+    """
+    Collect built cards into a single package as they finish.
+
+    Each future resolves to a card dict (sentence, english, unique_id,
+    filenames, audio, extra_audio, image). Failed cards are reported and
+    skipped; cards are added in input order. With ``dedupe_media`` the
+    media moves into the content-addressed store and each distinct file is
+    packaged once, however many cards use it.
+
+    Returns:
+        Path to the exported .apkg
+
+    Raises:
+        click.Abort: If no card could be built
+    """
+    decks = create_all_decks()
+    media_files = []
+    audio_files = []
+    failed = 0
+    for label, future in zip(labels, futures):
+        try:
+            card = future.result()
+        except Exception as e:
+            click.echo(f"  Failed: {label}: {e}", err=True)
+            failed += 1
+            continue
+        if dedupe_media:
+            card = store_card_media(card, Path(settings.media_dir) / STORE_DIRNAME)
+        note = create_note(
+            card["sentence"],
+            card["english"],
+            furigana.get_furigana(card["sentence"]),
+            card["filenames"]["image"] if card["image"] else None,
+            card["filenames"]["audio"],
+            card["unique_id"],
+            extra_audio_filenames=[Path(p).name for p in card["extra_audio"]],
+        )
+        decks[0].add_note(note)  # Notes go in the Sentences deck
+        card_audio = [f for f in [card["audio"], *card["extra_audio"]] if f]
+        audio_files += card_audio
+        media_files += card_audio + ([card["image"]] if card["image"] else [])
+        click.echo(f"  {card['sentence']} -> {card['english']}")
+
+    built = len(labels) - failed
+    if not built:
+        click.echo("Error: No cards were created", err=True)
+        raise click.Abort()
+
+    output_path = (
+        Path(settings.output_dir) / f"japanese_cards_{generate_unique_id()}.apkg"
+    )
+    export_package(decks, list(dict.fromkeys(media_files)), str(output_path))
+
+    click.echo(f"Cards: {built} created, {failed} failed")
+    echo_media_size(media_files, audio_files, built)
+    return output_path
+
+
 @cli.command(name="audio")
-@click.argument("sentence", metavar="<sentence>")
+@click.argument("sentence", metavar="<sentence>", required=False)
 @click.option("--output", help="Output file path")
+@click.option(
+    "--file",
+    "sentences_file",
+    type=click.Path(exists=True),
+    help="Generate audio for each line of a file (VOICEVOX batch synthesis)",
+)
 @click.option("--slow", is_flag=True, help="Generate slow-speed audio (gTTS only)")
 @click.option(
     "--use-gtts",
@@ -223,31 +813,136 @@ def ensure_voicevox_or_fallback(settings, use_gtts: bool) -> bool:
     default=None,
     help="VOICEVOX speed scale (default: 0.95)",
 )
-def audio_cmd(sentence, output, slow, use_gtts, speaker_id, speed):
+@click.option(
+    "--audio-preset",
+    type=click.Choice(list(ENCODING_PRESETS)),
+    default=None,
+    help="Audio encoding preset (default: AUDIO_PRESET or mp3)",
+)
+@click.option(
+    "--tts-backend",
+    type=click.Choice(TTS_BACKENDS),
+    default="voicevox",
+    show_default=True,
+    help="Speech synthesis backend",
+)
+@click.option(
+    "--enhance-speech",
+    is_flag=True,
+    help="Add natural pauses with OpenAI before synthesis (any backend)",
+)
+def audio_cmd(
+    sentence,
+    output,
+    sentences_file,
+    slow,
+    use_gtts,
+    speaker_id,
+    speed,
+    audio_preset,
+    tts_backend,
+    enhance_speech,
+):
     """Generate audio file for sentence."""
+    if not sentence and not sentences_file:
+        click.echo("Error: Provide a sentence or --file", err=True)
+        raise click.Abort()
+    if sentence and sentences_file:
+        click.echo("Error: Use either a sentence or --file, not both", err=True)
+        raise click.Abort()
+
     settings = Settings.load()
     settings.ensure_directories()
+    speaker = speaker_id if speaker_id is not None else settings.voicevox_speaker_id
+    speed = speed if speed is not None else 0.95
+    preset = resolve_audio_preset(settings, audio_preset)
+    extension = get_preset(preset).extension
+    backend = resolve_tts_backend(settings, tts_backend, use_gtts)
+
+    def synthesize(text: str, path: str) -> str:
+        if backend == "openai":
+            return audio.generate_audio_openai(
+                text, path, api_key=settings.openai_api_key, preset=preset
+            )
+        return audio.generate_audio(text, path, slow=slow, preset=preset)
+
+    if sentences_file:
+        with open(sentences_file, encoding="utf-8") as f:
+            sentences = [line.strip() for line in f if line.strip()]
+        if not sentences:
+            click.echo(f"Error: No sentences found in {sentences_file}", err=True)
+            raise click.Abort()
+        if enhance_speech:
+            sentences = enhance_speech_texts(sentences, settings)
+        outputs = [
+            str(
+                Path(settings.media_dir)
+                / f"anki_{generate_unique_id(text)}.{extension}"
+            )
+            for text in sentences
+        ]
+
+        if ensure_voicevox_or_fallback(settings, backend != "voicevox"):
+            try:
+                audio.generate_audio_voicevox_batch(
+                    sentences,
+                    outputs,
+                    base_url=settings.voicevox_url,
+                    speaker_id=speaker,
+                    speed=speed,
+                    preset=preset,
+                )
+            except Exception as e:
+                click.echo(f"Error: {e}", err=True)
+                raise click.Abort()
+        else:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(synthesize, sentences, outputs))
+
+        for path in outputs:
+            click.echo(f"Generated audio: {path}")
+        return
 
     if not output:
-        unique_id = generate_unique_id()
-        output = Path(settings.media_dir) / f"anki_{unique_id}.mp3"
+        unique_id = generate_unique_id(sentence)
+        output = Path(settings.media_dir) / f"anki_{unique_id}.{extension}"
+    if enhance_speech:
+        sentence = enhance_speech_texts([sentence], settings)[0]
 
-    if ensure_voicevox_or_fallback(settings, use_gtts):
+    if ensure_voicevox_or_fallback(settings, backend != "voicevox"):
         audio.generate_audio_voicevox(
             sentence,
             str(output),
             base_url=settings.voicevox_url,
-            speaker_id=speaker_id
-            if speaker_id is not None
-            else settings.voicevox_speaker_id,
-            speed=speed if speed is not None else 0.95,
+            speaker_id=speaker,
+            speed=speed,
+            preset=preset,
         )
     else:
-        audio.generate_audio(sentence, str(output), slow=slow)
+        synthesize(sentence, str(output))
 
     click.echo(f"Generated audio: {output}")
 
 
+@cli.command()
+@click.option(
+    "--speaker-id",
+    type=int,
+    default=None,
+    help="VOICEVOX speaker ID to preload (default: from settings or 13)",
+)
+def warmup(speaker_id):
+    """Start VOICEVOX and preload the speaker model."""
+    settings = Settings.load()
+    speaker = speaker_id if speaker_id is not None else settings.voicevox_speaker_id
+
+    click.echo("Warming up VOICEVOX...")
+    if not audio.warm_up_voicevox(settings.voicevox_url, speaker):
+        click.echo(f"Error: VOICEVOX is not ready at {settings.voicevox_url}", err=True)
+        raise click.Abort()
+    click.echo(f"VOICEVOX is ready (speaker {speaker} loaded)")
+
+
 @cli.command(name="image")
 @click.argument("sentence", metavar="<sentence>", required=False)
 @click.option(
@@ -258,7 +953,13 @@ def audio_cmd(sentence, output, slow, use_gtts, speaker_id, speed):
 )
 @click.option("--output", help="Output file path")
 @click.option("--prompt", help="Custom English prompt (skip translation)")
-def image_cmd(sentence, audio_path, output, prompt):
+@click.option(
+    "--image-preset",
+    type=click.Choice(list(IMAGE_PRESETS)),
+    default=None,
+    help="Image format and size preset (default: IMAGE_PRESET or jpeg)",
+)
+def image_cmd(sentence, audio_path, output, prompt, image_preset):
     """Generate image for sentence."""
     settings = Settings.load()
     settings.ensure_directories()
@@ -267,6 +968,8 @@ def image_cmd(sentence, audio_path, output, prompt):
         click.echo("Error: GOOGLE_GENAI_API_KEY not found in .env", err=True)
         raise click.Abort()
 
+    preset = resolve_image_preset(settings, image_preset)
+
     if audio_path:
         sentence = transcribe_with_error_handling(audio_path, settings)
     elif not sentence and not prompt:
@@ -276,13 +979,13 @@ def image_cmd(sentence, audio_path, output, prompt):
         raise click.Abort()
 
     if not output:
-        unique_id = generate_unique_id()
-        output = Path(settings.media_dir) / f"anki_{unique_id}.jpg"
+        unique_id = generate_unique_id(sentence or prompt)
+        output = Path(settings.media_dir) / f"anki_{unique_id}.{preset.extension}"
 
     if not prompt:
         prompt = translation.translate_to_english(sentence)
 
-    result = image.generate_image(prompt, str(output), settings.gemini_api_key)
+    result = image.generate_image(prompt, str(output), settings.gemini_api_key, preset)
     if result:
         click.echo(f"Generated image: {result}")
     else:
@@ -341,9 +1044,43 @@ def image_cmd(sentence, audio_path, output, prompt):
     default=None,
     help="VOICEVOX speed scale (default: 0.95)",
 )
+@click.option(
+    "--variant",
+    "variants",
+    multiple=True,
+    callback=parse_voice_variants,
+    help="VOICEVOX voice as SPEAKER:SPEED (repeatable; e.g. :0.95 --variant :0.7)",
+)
+@click.option(
+    "--audio-preset",
+    type=click.Choice(list(ENCODING_PRESETS)),
+    default=None,
+    help="Audio encoding preset (default: AUDIO_PRESET or mp3)",
+)
+@click.option(
+    "--image-preset",
+    type=click.Choice(list(IMAGE_PRESETS)),
+    default=None,
+    help="Image format and size preset (default: IMAGE_PRESET or jpeg)",
+)
 @click.option(
     "--ai-translation-model", default="gpt-4o-mini", help="OpenAI translation model"
 )
+@click.option(
+    "--allow-duplicate",
+    is_flag=True,
+    help="Create a card even if this audio already made one",
+)
+@click.option(
+    "--no-reuse-transcripts",
+    is_flag=True,
+    help="Send every clip to Whisper, even near-duplicates of earlier ones",
+)
+@click.option(
+    "--dedupe-media",
+    is_flag=True,
+    help="Name media by content hash so identical files are stored once",
+)
 def generate(
     sentence,
     audio_input,
@@ -359,7 +1096,13 @@ def generate(
     use_ai_translation,
     speaker_id,
     speed,
+    variants,
+    audio_preset,
+    image_preset,
     ai_translation_model,
+    allow_duplicate,
+    no_reuse_transcripts,
+    dedupe_media,
 ):
     """Generate complete Anki card from sentence."""
     settings = Settings.load()
@@ -374,9 +1117,19 @@ def generate(
         )
         raise click.Abort()
 
-    # Generate unique ID
-    unique_id = generate_unique_id()
-    filenames = generate_media_filenames(unique_id)
+    # Preload speakers while transcription and translation run, unless the
+    # card's audio comes from a file instead of synthesis
+    warmup = None
+    original_audio = use_original_audio and (audio_input or audio_zip)
+    if not (no_audio or use_gtts or audio_path or zip_path or original_audio):
+        warmup = start_warmup(
+            settings,
+            speaker_id,
+            resolve_voice_variants(variants, settings, speaker_id, speed),
+        )
+
+    preset = resolve_audio_preset(settings, audio_preset)
+    picture_preset = resolve_image_preset(settings, image_preset)
 
     # Handle audio ZIP extraction
     extracted_audio_path = None
@@ -388,25 +1141,45 @@ def generate(
         if extracted["image"] and not image_path:
             image_path = extracted["image"]
 
+    # Skip audio that already made a card, even if it was re-encoded
+    fingerprint = None
+    if audio_input:
+        fingerprint = transcription.fingerprint_file(audio_input)
+    if fingerprint is not None and not allow_duplicate:
+        match = get_fingerprint_index().match(fingerprint)
+        if match and match.get("card"):
+            click.echo(
+                f"Already created a card for this audio: {match['card']['sentence']}"
+            )
+            click.echo(f"  {match['card']['package']}")
+            click.echo("Use --allow-duplicate to create another.")
+            return
+
     # Transcribe if audio input provided
     if audio_input:
-        sentence = transcribe_with_error_handling(audio_input, settings)
+        sentence = transcribe_with_error_handling(
+            audio_input, settings, reuse=not no_reuse_transcripts
+        )
 
     click.echo(f"Processing: {sentence}")
 
+    # Media names and the note ID follow from the sentence and the files
+    # supplying its media, so two clips of one line don't share a card
+    sources = [p for p in (audio_input, audio_path, image_path, zip_path) if p]
+    unique_id = generate_unique_id(sentence, source_namespace(sources))
+    filenames = generate_media_filenames(
+        unique_id,
+        max(len(variants) - 1, 0),
+        get_preset(preset).extension,
+        picture_preset.extension,
+    )
+
     # Translation
     if use_ai_translation:
-        if not settings.openai_api_key:
-            click.echo(
-                "Error: OPENAI_API_KEY required for OpenAI translation", err=True
-            )
-            click.echo("Add your OpenAI API key to .env file.", err=True)
-            raise click.Abort()
-        english_text = translation.translate_to_english_openai(
-            sentence, api_key=settings.openai_api_key, model=ai_translation_model
-        )
-    else:
-        english_text = translation.translate_to_english(sentence)
+        require_openai_for_translation(settings)
+    english_text = translate_sentence(
+        sentence, settings, use_ai_translation, ai_translation_model
+    )
     click.echo(f"Translation: {english_text}")
 
     # Furigana
@@ -422,48 +1195,85 @@ def generate(
 
     # Audio handling
     final_audio_path = None
+    extra_audio_paths = []
     if not no_audio:
         if use_original_audio and audio_input:
-            # Use original audio from input
-            final_audio_path = copy_media_file(
-                audio_input, settings.media_dir, filenames["audio"]
-            )
+            # Use original audio from input, leveled and trimmed when possible
+            if audio.is_ffmpeg_available():
+                final_audio_path = audio.process_audio_file(
+                    audio_input,
+                    str(Path(settings.media_dir) / filenames["audio"]),
+                    preset=preset,
+                )
+            else:
+                final_audio_path = copy_media_file(
+                    audio_input, settings.media_dir, filenames["audio"]
+                )
             click.echo(f"Using original audio: {audio_input}")
         elif audio_path:
             # Use provided audio file
             final_audio_path = copy_media_file(
                 audio_path, settings.media_dir, filenames["audio"]
             )
+        elif variants:
+            # Generate every voice variant from one shared audio query
+            outputs = [
+                str(Path(settings.media_dir) / name)
+                for name in [filenames["audio"], *filenames["extra_audio"]]
+            ]
+            final_audio_path, *extra_audio_paths = synthesize_variants(
+                sentence,
+                outputs,
+                settings,
+                ensure_voicevox_or_fallback(settings, use_gtts, warmup),
+                resolve_voice_variants(variants, settings, speaker_id, speed),
+                preset,
+            )
         else:
             # Generate TTS audio
             audio_output = str(Path(settings.media_dir) / filenames["audio"])
-            if ensure_voicevox_or_fallback(settings, use_gtts):
-                final_audio_path = audio.generate_audio_voicevox(
-                    sentence,
-                    audio_output,
-                    base_url=settings.voicevox_url,
-                    speaker_id=speaker_id
-                    if speaker_id is not None
-                    else settings.voicevox_speaker_id,
-                    speed=speed if speed is not None else 0.95,
-                )
-            else:
-                final_audio_path = audio.generate_audio(sentence, audio_output)
+            final_audio_path = synthesize_sentence(
+                sentence,
+                audio_output,
+                settings,
+                ensure_voicevox_or_fallback(settings, use_gtts, warmup),
+                speaker_id,
+                speed,
+                preset,
+            )
 
     # Image
     final_image_path = None
     if not no_image:
         if image_path:
-            final_image_path = copy_media_file(
-                image_path, settings.media_dir, filenames["image"]
+            final_image_path = convert_image(
+                image_path,
+                str(Path(settings.media_dir) / filenames["image"]),
+                picture_preset,
             )
         elif settings.gemini_api_key:
             final_image_path = image.generate_image(
                 english_text,
                 str(Path(settings.media_dir) / filenames["image"]),
                 settings.gemini_api_key,
+                picture_preset,
             )
 
+    if dedupe_media:
+        card = store_card_media(
+            {
+                "filenames": filenames,
+                "audio": final_audio_path,
+                "extra_audio": extra_audio_paths,
+                "image": final_image_path,
+            },
+            Path(settings.media_dir) / STORE_DIRNAME,
+        )
+        filenames = card["filenames"]
+        final_audio_path = card["audio"]
+        extra_audio_paths = card["extra_audio"]
+        final_image_path = card["image"]
+
     # Create Anki card
     decks = create_all_decks()
     note = create_note(
@@ -473,14 +1283,658 @@ def generate(
         filenames["image"] if final_image_path else None,
         filenames["audio"],
         unique_id,
+        extra_audio_filenames=[Path(p).name for p in extra_audio_paths],
     )
     decks[0].add_note(note)  # Notes go in the Sentences deck
 
     # Export
-    media_files = [f for f in [final_audio_path, final_image_path] if f]
+    media_files = list(
+        dict.fromkeys(
+            f for f in [final_audio_path, *extra_audio_paths, final_image_path] if f
+        )
+    )
     output_path = Path(settings.output_dir) / f"japanese_card_{unique_id}.apkg"
     export_package(decks, media_files, str(output_path))
+    if fingerprint is not None:
+        get_fingerprint_index().add(
+            fingerprint,
+            card={"sentence": sentence, "package": str(output_path)},
+        )
+
+    click.echo(f"Success! Created: {output_path}")
+
+
+@cli.command()
+@click.argument("sentences_file", type=click.Path(exists=True), metavar="<file>")
+@click.option("--output-dir", type=click.Path(), help="Output directory for .apkg")
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Cards processed at once (provider limits adapt below this)",
+)
+@click.option("--no-image", is_flag=True, help="Skip image generation")
+@click.option("--no-audio", is_flag=True, help="Skip audio generation")
+@click.option(
+    "--use-gtts",
+    is_flag=True,
+    help="Use gTTS instead of VOICEVOX",
+)
+@click.option(
+    "--use-ai-translation", is_flag=True, help="Use OpenAI Chat for translation"
+)
+@click.option(
+    "--speaker-id",
+    type=int,
+    default=None,
+    help="VOICEVOX speaker ID (default: from settings or 13)",
+)
+@click.option(
+    "--speed",
+    type=float,
+    default=None,
+    help="VOICEVOX speed scale (default: 0.95)",
+)
+@click.option(
+    "--variant",
+    "variants",
+    multiple=True,
+    callback=parse_voice_variants,
+    help="VOICEVOX voice as SPEAKER:SPEED (repeatable; e.g. :0.95 --variant :0.7)",
+)
+@click.option(
+    "--audio-preset",
+    type=click.Choice(list(ENCODING_PRESETS)),
+    default=None,
+    help="Audio encoding preset (default: AUDIO_PRESET or mp3)",
+)
+@click.option(
+    "--image-preset",
+    type=click.Choice(list(IMAGE_PRESETS)),
+    default=None,
+    help="Image format and size preset (default: IMAGE_PRESET or jpeg)",
+)
+@click.option(
+    "--tts-backend",
+    type=click.Choice(TTS_BACKENDS),
+    default="voicevox",
+    show_default=True,
+    help="Speech synthesis backend",
+)
+@click.option(
+    "--enhance-speech",
+    is_flag=True,
+    help="Add natural pauses with OpenAI before synthesis (any backend)",
+)
+@click.option(
+    "--ai-translation-model", default="gpt-4o-mini", help="OpenAI translation model"
+)
+@click.option(
+    "--image-grid",
+    type=click.IntRange(2, 3),
+    default=None,
+    help="Illustrate N x N cards per Gemini call (2 or 3; smaller images)",
+)
+@click.option(
+    "--no-reuse-transcripts",
+    is_flag=True,
+    help="Send every clip to Whisper, even near-duplicates of earlier ones",
+)
+@click.option(
+    "--dedupe-media",
+    is_flag=True,
+    help="Name media by content hash so identical files are stored once",
+)
+def batch(
+    sentences_file,
+    output_dir,
+    jobs,
+    no_image,
+    no_audio,
+    use_gtts,
+    use_ai_translation,
+    speaker_id,
+    speed,
+    variants,
+    audio_preset,
+    image_preset,
+    tts_backend,
+    enhance_speech,
+    ai_translation_model,
+    image_grid,
+    no_reuse_transcripts,
+    dedupe_media,
+):
+    """
+    Generate one package of cards from a sentence file or a ZIP of clips.
+
+    A text file holds one sentence per line. A ZIP holds one card per file
+    stem: its audio clip, screenshot, and a .txt with the sentence
+    (transcribed from the clip when missing).
+    """
+    settings = Settings.load()
+    if output_dir:
+        settings.output_dir = output_dir
+    settings.ensure_directories()
+
+    bundles = []
+    archive = None
+    if zipfile.is_zipfile(sentences_file):
+        archive = zipfile.ZipFile(sentences_file)
+        bundles = list(iter_bundles(archive))
+        sentences = []
+        if not bundles:
+            click.echo(f"Error: No audio or text bundles in {sentences_file}", err=True)
+            raise click.Abort()
+        if not settings.openai_api_key and any(b.text is None for b in bundles):
+            click.echo("Error: OPENAI_API_KEY required for transcription", err=True)
+            click.echo("Add text files next to the clips or an OpenAI key.", err=True)
+            raise click.Abort()
+    else:
+        with open(sentences_file, encoding="utf-8") as f:
+            sentences = [line.strip() for line in f if line.strip()]
+        if not sentences:
+            click.echo(f"Error: No sentences found in {sentences_file}", err=True)
+            raise click.Abort()
+
+    if use_ai_translation:
+        require_openai_for_translation(settings)
+    backend = resolve_tts_backend(settings, tts_backend, use_gtts)
+    # Bundles bring their own clips; only those without one are voiced
+    needs_tts = not no_audio and (not bundles or any(b.audio is None for b in bundles))
+    on_voicevox = needs_tts and backend == "voicevox"
+    voice_variants = resolve_voice_variants(variants, settings, speaker_id, speed)
+    warmup = start_warmup(settings, speaker_id, voice_variants) if on_voicevox else None
+    use_voicevox = on_voicevox and ensure_voicevox_or_fallback(settings, False, warmup)
+
+    labels = sentences or [bundle.stem for bundle in bundles]
+    noun = "sentence" if len(sentences) == 1 else "sentences"
+    if bundles:
+        noun = "bundle" if len(bundles) == 1 else "bundles"
+    click.echo(f"Processing {len(labels)} {noun}")
+    preset = resolve_audio_preset(settings, audio_preset)
+    extension = get_preset(preset).extension
+    picture_preset = resolve_image_preset(settings, image_preset)
+    # Grid mode illustrates cards in groups once they are built
+    grid = None if no_image or not settings.gemini_api_key else image_grid
+    speech_texts = dict(zip(sentences, sentences))
+    if enhance_speech and needs_tts:
+        if bundles:
+            # Bundle sentences are only known per card; enhance them there
+            require_openai_for_enhancement(settings)
+        else:
+            speech_texts.update(
+                zip(sentences, enhance_speech_texts(sentences, settings))
+            )
+
+    def voice(sentence: str, filenames: dict) -> tuple[str | None, list[str]]:
+        speech_text = speech_texts.get(sentence)
+        if speech_text is None:
+            speech_text = sentence
+            if enhance_speech:
+                speech_text = audio.enhance_text_for_speech(
+                    sentence, settings.openai_api_key
+                )
+        if on_voicevox and voice_variants:
+            audio_path, *extra_audio = synthesize_variants(
+                speech_text,
+                [
+                    str(Path(settings.media_dir) / name)
+                    for name in [filenames["audio"], *filenames["extra_audio"]]
+                ],
+                settings,
+                use_voicevox,
+                voice_variants,
+                preset,
+            )
+            return audio_path, extra_audio
+        return (
+            synthesize_sentence(
+                speech_text,
+                str(Path(settings.media_dir) / filenames["audio"]),
+                settings,
+                use_voicevox,
+                speaker_id,
+                speed,
+                preset,
+                backend,
+            ),
+            [],
+        )
+
+    def picture(english_text: str, filenames: dict) -> str | None:
+        if no_image or not settings.gemini_api_key or grid:
+            return None
+        return image.generate_image(
+            english_text,
+            str(Path(settings.media_dir) / filenames["image"]),
+            settings.gemini_api_key,
+            picture_preset,
+        )
+
+    def build(sentence: str, namespace: str) -> dict:
+        unique_id = generate_unique_id(sentence, namespace)
+        filenames = generate_media_filenames(
+            unique_id, max(len(variants) - 1, 0), extension, picture_preset.extension
+        )
+        english_text = translate_sentence(
+            sentence, settings, use_ai_translation, ai_translation_model
+        )
+        audio_path = None
+        extra_audio = []
+        if not no_audio:
+            audio_path, extra_audio = voice(sentence, filenames)
+        return {
+            "sentence": sentence,
+            "english": english_text,
+            "unique_id": unique_id,
+            "filenames": filenames,
+            "audio": audio_path,
+            "extra_audio": extra_audio,
+            "image": picture(english_text, filenames),
+        }
+
+    def build_bundle(bundle: Bundle) -> dict:
+        # Bundles sharing a sentence stay separate cards, one per clip
+        namespace = f"{Path(sentences_file).name}/{bundle.stem}"
+        media_dir = Path(settings.media_dir)
+
+        # Members stream straight into the media folder under card names
+        audio_path = None
+        if bundle.text:
+            sentence = read_member_text(archive, bundle.text)
+        else:
+            # Transcribe the clip first, then rename it once the ID is known
+            provisional = generate_unique_id(bundle.audio, namespace)
+            suffix = Path(bundle.audio).suffix.lower()
+            audio_path = extract_member(
+                archive, bundle.audio, str(media_dir / f"anki_{provisional}{suffix}")
+            )
+            sentence = transcription.transcribe_audio(
+                audio_path, settings.openai_api_key, reuse=not no_reuse_transcripts
+            )
+        if not sentence:
+            raise ValueError("empty sentence")
+
+        unique_id = generate_unique_id(sentence, namespace)
+        filenames = generate_media_filenames(
+            unique_id, max(len(variants) - 1, 0), extension, picture_preset.extension
+        )
+        extra_audio = []
+        if bundle.audio:
+            suffix = Path(bundle.audio).suffix.lower()
+            filenames = {**filenames, "audio": f"anki_{unique_id}{suffix}"}
+            filenames["extra_audio"] = []
+            dest = media_dir / filenames["audio"]
+            if audio_path:
+                audio_path = str(Path(audio_path).replace(dest))
+            else:
+                audio_path = extract_member(archive, bundle.audio, str(dest))
+
+        english_text = translate_sentence(
+            sentence, settings, use_ai_translation, ai_translation_model
+        )
+        if no_audio:
+            audio_path = None
+        elif not audio_path:
+            audio_path, extra_audio = voice(sentence, filenames)
+
+        if bundle.image:
+            # Screenshots are fitted to the preset, in place when they already fit
+            suffix = Path(bundle.image).suffix.lower()
+            extracted = extract_member(
+                archive, bundle.image, str(media_dir / f"anki_{unique_id}{suffix}")
+            )
+            image_path = image_processing.convert_image_file(
+                extracted, str(media_dir / filenames["image"]), picture_preset
+            )
+            if extracted != image_path:
+                Path(extracted).unlink()
+        else:
+            image_path = picture(english_text, filenames)
+        return {
+            "sentence": sentence,
+            "english": english_text,
+            "unique_id": unique_id,
+            "filenames": filenames,
+            "audio": audio_path,
+            "extra_audio": extra_audio,
+            "image": image_path,
+        }
+
+    start = time.monotonic()
+    try:
+        with (
+            image_processing.image_pool(),
+            ThreadPoolExecutor(max_workers=jobs) as pool,
+        ):
+            if bundles:
+                futures = [pool.submit(build_bundle, bundle) for bundle in bundles]
+            else:
+                futures = [
+                    pool.submit(build, sentence, namespace)
+                    for sentence, namespace in zip(
+                        sentences, line_namespaces(sentences, sentences_file)
+                    )
+                ]
+            if grid:
+                futures = illustrate_in_grids(
+                    pool, futures, grid, settings, picture_preset
+                )
+            output_path = export_cards(labels, futures, settings, dedupe_media)
+    finally:
+        if archive:
+            archive.close()
 
+    click.echo(f"Elapsed: {time.monotonic() - start:.1f}s")
+    echo_provider_stats()
+    click.echo(f"Success! Created: {output_path}")
+
+
+@cli.command(name="mine-audio")
+@click.argument("audio_path", type=click.Path(exists=True), metavar="<audio_file>")
+@click.option(
+    "--output-dir", type=click.Path(), help="Output directory for .apkg files"
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Cards processed at once (provider limits adapt below this)",
+)
+@click.option("--language", default="ja", help="Language code (default: ja)")
+@click.option(
+    "--pad",
+    type=click.FloatRange(min=0),
+    default=0.2,
+    show_default=True,
+    help="Seconds of audio kept before and after each sentence",
+)
+@click.option(
+    "--min-duration",
+    type=click.FloatRange(min=0),
+    default=0.5,
+    show_default=True,
+    help="Skip sentences shorter than this many seconds",
+)
+@click.option("--no-image", is_flag=True, help="Skip image generation")
+@click.option(
+    "--use-ai-translation", is_flag=True, help="Use OpenAI Chat for translation"
+)
+@click.option(
+    "--image-preset",
+    type=click.Choice(list(IMAGE_PRESETS)),
+    default=None,
+    help="Image format and size preset (default: IMAGE_PRESET or jpeg)",
+)
+@click.option(
+    "--ai-translation-model", default="gpt-4o-mini", help="OpenAI translation model"
+)
+@click.option(
+    "--image-grid",
+    type=click.IntRange(2, 3),
+    default=None,
+    help="Illustrate N x N cards per Gemini call (2 or 3; smaller images)",
+)
+@click.option(
+    "--dedupe-media",
+    is_flag=True,
+    help="Name media by content hash so identical files are stored once",
+)
+def mine_audio(
+    audio_path,
+    output_dir,
+    jobs,
+    language,
+    pad,
+    min_duration,
+    no_image,
+    use_ai_translation,
+    image_preset,
+    ai_translation_model,
+    image_grid,
+    dedupe_media,
+):
+    """Make one card per spoken sentence of a long recording."""
+    settings = Settings.load()
+    if output_dir:
+        settings.output_dir = output_dir
+    settings.ensure_directories()
+
+    if not settings.openai_api_key:
+        click.echo("Error: OPENAI_API_KEY required for transcription", err=True)
+        click.echo("Add your OpenAI API key to .env file.", err=True)
+        raise click.Abort()
+    if not audio.is_ffmpeg_available():
+        click.echo("Error: ffmpeg is required to cut sentence clips", err=True)
+        raise click.Abort()
+    picture_preset = resolve_image_preset(settings, image_preset)
+    grid = None if no_image or not settings.gemini_api_key else image_grid
+
+    start = time.monotonic()
+    click.echo(f"Transcribing: {audio_path}")
+    try:
+        segments = transcription.transcribe_segments(
+            audio_path, settings.openai_api_key, language
+        )
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    segments = [s for s in segments if s.end - s.start >= min_duration]
+    if not segments:
+        click.echo("Error: No sentences found in the recording", err=True)
+        raise click.Abort()
+
+    noun = "sentence" if len(segments) == 1 else "sentences"
+    click.echo(f"Processing {len(segments)} {noun}")
+    extension = clips.clip_extension(audio_path)
+    copy = extension is not None
+    extension = extension or clips.FALLBACK_EXTENSION
+
+    def build(segment) -> dict:
+        unique_id = generate_unique_id(
+            segment.text, f"{Path(audio_path).name}@{segment.start:.3f}"
+        )
+        filenames = generate_media_filenames(
+            unique_id,
+            audio_extension=extension,
+            image_extension=picture_preset.extension,
+        )
+        audio_file = clips.cut_clip(
+            audio_path,
+            segment.start - pad,
+            segment.end + pad,
+            str(Path(settings.media_dir) / filenames["audio"]),
+            copy=copy,
+        )
+        english_text = translate_sentence(
+            segment.text, settings, use_ai_translation, ai_translation_model
+        )
+        image_path = None
+        if not no_image and settings.gemini_api_key and not grid:
+            image_path = image.generate_image(
+                english_text,
+                str(Path(settings.media_dir) / filenames["image"]),
+                settings.gemini_api_key,
+                picture_preset,
+            )
+        return {
+            "sentence": segment.text,
+            "english": english_text,
+            "unique_id": unique_id,
+            "filenames": filenames,
+            "audio": audio_file,
+            "extra_audio": [],
+            "image": image_path,
+        }
+
+    with image_processing.image_pool(), ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(build, segment) for segment in segments]
+        if grid:
+            futures = illustrate_in_grids(pool, futures, grid, settings, picture_preset)
+        output_path = export_cards(
+            [s.text for s in segments], futures, settings, dedupe_media
+        )
+
+    click.echo(f"Elapsed: {time.monotonic() - start:.1f}s")
+    echo_provider_stats()
+    click.echo(f"Success! Created: {output_path}")
+
+
+@cli.command(name="mine-video")
+@click.argument("video_path", type=click.Path(exists=True), metavar="<video_file>")
+@click.option(
+    "--subs",
+    "subs_path",
+    required=True,
+    type=click.Path(exists=True),
+    help="Subtitle file for the video (SRT, WebVTT, ASS/SSA)",
+)
+@click.option(
+    "--output-dir", type=click.Path(), help="Output directory for .apkg files"
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Cards processed at once (provider limits adapt below this)",
+)
+@click.option(
+    "--pad",
+    type=click.FloatRange(min=0),
+    default=0.1,
+    show_default=True,
+    help="Seconds of audio kept before and after each line",
+)
+@click.option(
+    "--min-duration",
+    type=click.FloatRange(min=0),
+    default=0.5,
+    show_default=True,
+    help="Skip lines shorter than this many seconds",
+)
+@click.option("--no-image", is_flag=True, help="Skip screenshots")
+@click.option(
+    "--image-preset",
+    type=click.Choice(list(IMAGE_PRESETS)),
+    default=None,
+    help="Screenshot format and size preset (default: IMAGE_PRESET or jpeg)",
+)
+@click.option(
+    "--use-ai-translation", is_flag=True, help="Use OpenAI Chat for translation"
+)
+@click.option(
+    "--ai-translation-model", default="gpt-4o-mini", help="OpenAI translation model"
+)
+@click.option(
+    "--dedupe-media",
+    is_flag=True,
+    help="Name media by content hash so identical files are stored once",
+)
+def mine_video(
+    video_path,
+    subs_path,
+    output_dir,
+    jobs,
+    pad,
+    min_duration,
+    no_image,
+    image_preset,
+    use_ai_translation,
+    ai_translation_model,
+    dedupe_media,
+):
+    """Make one card per subtitle line, with its audio clip and a screenshot."""
+    settings = Settings.load()
+    if output_dir:
+        settings.output_dir = output_dir
+    settings.ensure_directories()
+
+    if not audio.is_ffmpeg_available():
+        click.echo("Error: ffmpeg is required to cut clips and screenshots", err=True)
+        raise click.Abort()
+    if use_ai_translation:
+        require_openai_for_translation(settings)
+    picture_preset = resolve_image_preset(settings, image_preset)
+
+    start = time.monotonic()
+    try:
+        cues = subtitles.load_subtitles(subs_path)
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+    cues = [cue for cue in cues if cue.end - cue.start >= min_duration]
+    if not cues:
+        click.echo("Error: No subtitle lines long enough to mine", err=True)
+        raise click.Abort()
+
+    noun = "line" if len(cues) == 1 else "lines"
+    click.echo(f"Processing {len(cues)} subtitle {noun}")
+    extension = clips.clip_extension(video_path)
+    copy = extension is not None
+    extension = extension or clips.FALLBACK_EXTENSION
+
+    unique_ids = [
+        generate_unique_id(cue.text, f"{Path(video_path).name}@{cue.start:.3f}")
+        for cue in cues
+    ]
+    filenames = [
+        generate_media_filenames(
+            unique_id,
+            audio_extension=extension,
+            image_extension=picture_preset.extension,
+        )
+        for unique_id in unique_ids
+    ]
+    media_dir = Path(settings.media_dir)
+    audio_paths = [str(media_dir / names["audio"]) for names in filenames]
+    image_paths = [
+        None if no_image else str(media_dir / names["image"]) for names in filenames
+    ]
+
+    with image_processing.image_pool(), ThreadPoolExecutor(max_workers=jobs) as pool:
+        # Clips and screenshots come from a few batched ffmpeg runs, queued
+        # ahead of the cards so no card waits on a run that hasn't started
+        runs = []
+        for first in range(0, len(cues), clips.CUES_PER_RUN):
+            window = slice(first, first + clips.CUES_PER_RUN)
+            run = pool.submit(
+                clips.extract_cue_media,
+                video_path,
+                cues[window],
+                audio_paths[window],
+                image_paths[window],
+                copy=copy,
+                pad=pad,
+                image_preset=picture_preset,
+            )
+            runs += [run] * len(cues[window])
+
+        def build(i: int) -> dict:
+            english_text = translate_sentence(
+                cues[i].text, settings, use_ai_translation, ai_translation_model
+            )
+            runs[i].result()
+            return {
+                "sentence": cues[i].text,
+                "english": english_text,
+                "unique_id": unique_ids[i],
+                "filenames": filenames[i],
+                "audio": audio_paths[i],
+                "extra_audio": [],
+                "image": image_paths[i],
+            }
+
+        futures = [pool.submit(build, i) for i in range(len(cues))]
+        output_path = export_cards(
+            [cue.text for cue in cues], futures, settings, dedupe_media
+        )
+
+    click.echo(f"Elapsed: {time.monotonic() - start:.1f}s")
+    echo_provider_stats()
     click.echo(f"Success! Created: {output_path}")
 
 
@@ -490,7 +1944,12 @@ def generate(
     "--output-dir", type=click.Path(), help="Output directory for .apkg files"
 )
 @click.option("--force", is_flag=True, help="Re-process even if output already exists")
-def process(path, output_dir, force):
+@click.option(
+    "--dedupe-media",
+    is_flag=True,
+    help="Name media by content hash so identical files are stored once",
+)
+def process(path, output_dir, force, dedupe_media):
     """Re-export existing .apkg files with updated model and deck."""
     settings = Settings.load()
     if output_dir:
@@ -541,12 +2000,23 @@ def process(path, output_dir, force):
 
         # Extract media to media dir
         media_files = extract_media(str(apkg_file), settings.media_dir)
+        renames = {}
+        if dedupe_media:
+            store_dir = Path(settings.media_dir) / STORE_DIRNAME
+            stored = [store_media(f, str(store_dir)) for f in media_files]
+            renames = {
+                Path(old).name: Path(new).name for old, new in zip(media_files, stored)
+            }
+            media_files = list(dict.fromkeys(stored))
 
         # Create all decks (Sentences + component subdecks)
         decks = create_all_decks()
 
         for note in contents.notes:
-            new_note = create_note_from_fields(note.fields)
+            fields = note.fields
+            if renames:
+                fields = [rename_references(f, renames) for f in fields]
+            new_note = create_note_from_fields(fields)
             decks[0].add_note(new_note)  # Notes go in the Sentences deck
 
         export_package(decks, media_files, str(output_path))
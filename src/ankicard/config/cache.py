@@ -1,12 +1,19 @@
-"""Cache for tracking processed .apkg files."""
+"""Cache for tracking processed .apkg files and keys for generated artifacts."""
 
+import hashlib
 import json
 import os
+import threading
 from pathlib import Path
 
 
 CACHE_DIR = Path.home() / ".ankicard"
 CACHE_FILE = CACHE_DIR / "processed_cache.json"
+AUDIO_QUERY_DIR = CACHE_DIR / "audio_queries"
+ENHANCED_TEXT_DIR = CACHE_DIR / "enhanced_text"
+FINGERPRINT_FILE = CACHE_DIR / "fingerprints.jsonl"
+
+_fingerprint_lock = threading.Lock()
 
 
 def _load_cache() -> dict:
@@ -51,3 +58,109 @@ def clear_cache() -> None:
     """Remove all cache entries."""
     if CACHE_FILE.exists():
         CACHE_FILE.unlink()
+
+
+def artifact_key(kind: str, *parts) -> str:
+    """
+    Build a stable cache key for a generated artifact.
+
+    Args:
+        kind: Artifact kind (e.g. "translation", "tts", "image")
+        *parts: JSON-serializable inputs that determine the artifact
+
+    Returns:
+        Hex SHA-256 digest of the kind and inputs
+    """
+    payload = json.dumps([kind, *parts], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_entry(directory: Path, key: str):
+    try:
+        return json.loads((directory / f"{key}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _save_entry(directory: Path, key: str, value) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{key}.json"
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def load_audio_query(key: str) -> dict | None:
+    """Load a cached VOICEVOX audio query, or None if it is not cached."""
+    return _load_entry(AUDIO_QUERY_DIR, key)
+
+
+def save_audio_query(key: str, query: dict) -> None:
+    """Cache a VOICEVOX audio query under its artifact key."""
+    _save_entry(AUDIO_QUERY_DIR, key, query)
+
+
+def load_enhanced_text(key: str) -> str | None:
+    """Load cached speech-enhanced text, or None if it is not cached."""
+    return _load_entry(ENHANCED_TEXT_DIR, key)
+
+
+def save_enhanced_text(key: str, text: str) -> None:
+    """Cache speech-enhanced text under its artifact key."""
+    _save_entry(ENHANCED_TEXT_DIR, key, text)
+
+
+def load_fingerprint_entries() -> list[dict]:
+    """
+    Load the audio fingerprint index.
+
+    The file is append-only; a later line with the same ``id`` replaces an
+    earlier one. Unreadable lines are skipped. When superseded or unreadable
+    lines are found, the file is compacted to one line per entry.
+    """
+    entries = {}
+    lines = 0
+    with _fingerprint_lock:
+        try:
+            with open(FINGERPRINT_FILE, encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                        entries[entry["id"]] = entry
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            return []
+        if lines > len(entries):
+            _rewrite_fingerprint_entries(list(entries.values()))
+    return list(entries.values())
+
+
+def _rewrite_fingerprint_entries(entries: list[dict]) -> None:
+    tmp_path = FINGERPRINT_FILE.with_name(f".{FINGERPRINT_FILE.name}.{os.getpid()}")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, FINGERPRINT_FILE)
+    except OSError:
+        # Compaction is only a saving; the appended file stays valid
+        tmp_path.unlink(missing_ok=True)
+
+
+def append_fingerprint_entry(entry: dict) -> None:
+    """Append (or supersede) an entry in the audio fingerprint index."""
+    with _fingerprint_lock:
+        FINGERPRINT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(FINGERPRINT_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
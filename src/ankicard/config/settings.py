@@ -15,6 +15,8 @@ class Settings:
     deck_name: str = "Immersion Kit"
     voicevox_url: str = "http://127.0.0.1:50021"
     voicevox_speaker_id: int = 13
+    audio_preset: str = "mp3"
+    image_preset: str = "jpeg"
 
     @classmethod
     def load(cls) -> "Settings":
@@ -26,6 +28,8 @@ class Settings:
             gemini_api_key=os.getenv("GOOGLE_GENAI_API_KEY"),
             voicevox_url=os.getenv("VOICEVOX_URL", "http://127.0.0.1:50021"),
             voicevox_speaker_id=int(os.getenv("VOICEVOX_SPEAKER_ID", "13")),
+            audio_preset=os.getenv("AUDIO_PRESET", "mp3"),
+            image_preset=os.getenv("IMAGE_PRESET", "jpeg"),
         )
 
     def ensure_directories(self):
@@ -1,16 +1,52 @@
+import copy
+import hashlib
+import io
+import json
 import os
 import shutil
 import subprocess
 import tempfile
+import threading
 import time
+import wave
+import zipfile
+from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO
 
 import requests
 from gtts import gTTS
 from openai import OpenAI
 
+from ..config.cache import (
+    artifact_key,
+    load_audio_query,
+    load_enhanced_text,
+    save_audio_query,
+    save_enhanced_text,
+)
+from .audio_processing import process_wav
+from .concurrency import coalesce, coalesce_file, get_limiter
+from .encoding import DEFAULT_PRESET, get_preset
+from .container import ContainerClient
+from .health import HealthMonitor
+from ..media.placement import replacing, write_file
+
+VOICEVOX_CONTAINER = "voicevox"
+VOICEVOX_IMAGE = "voicevox/voicevox_engine:cpu-latest"
+VOICEVOX_PORTS = {"50021/tcp": ("127.0.0.1", "50021")}
+
+_voicevox_health: dict[str, HealthMonitor] = {}
+_voicevox_health_lock = threading.Lock()
+_voicevox_versions: dict[str, str] = {}
+
 
 def is_docker_running() -> bool:
     """Check if Docker daemon is running."""
+    client = ContainerClient.discover()
+    if client is not None:
+        return client.ping()
+
     try:
         result = subprocess.run(
             ["docker", "info"],
@@ -25,6 +61,10 @@ def is_docker_running() -> bool:
 
 def detect_container_runtime() -> str:
     """Detect if 'docker' is actually podman. Returns 'podman' or 'docker'."""
+    client = ContainerClient.discover()
+    if client is not None:
+        return client.runtime()
+
     try:
         result = subprocess.run(
             ["docker", "--version"],
@@ -53,6 +93,29 @@ def is_voicevox_available(base_url: str = "http://127.0.0.1:50021") -> bool:
         return False
 
 
+def get_voicevox_health(base_url: str = "http://127.0.0.1:50021") -> HealthMonitor:
+    """
+    Get the shared health monitor for a VOICEVOX engine.
+
+    The monitor caches the engine state so callers do not probe on every
+    card, and opens a circuit after consecutive synthesis failures so cards
+    can switch to gTTS immediately.
+    """
+    with _voicevox_health_lock:
+        if base_url not in _voicevox_health:
+            _voicevox_health[base_url] = HealthMonitor(
+                lambda: is_voicevox_available(base_url)
+            )
+        return _voicevox_health[base_url]
+
+
+def reset_voicevox_health() -> None:
+    """Forget cached VOICEVOX health state."""
+    with _voicevox_health_lock:
+        _voicevox_health.clear()
+        _voicevox_versions.clear()
+
+
 def start_voicevox_docker(
     base_url: str = "http://127.0.0.1:50021",
     timeout: int = 60,
@@ -61,7 +124,9 @@ def start_voicevox_docker(
     Attempt to start the VOICEVOX Docker container.
 
     Tries to start an existing stopped container first, then falls back
-    to creating a new one. Polls the health endpoint until ready.
+    to creating a new one. Talks to the Docker/Podman API socket directly
+    when one is found, and uses the docker CLI otherwise. Polls the health
+    endpoint with exponential backoff until ready.
 
     Args:
         base_url: VOICEVOX engine URL for health checking
@@ -70,13 +135,23 @@ def start_voicevox_docker(
     Returns:
         True if engine is ready, False if start failed
     """
+    client = ContainerClient.discover()
+    if client is not None:
+        if not client.ping():
+            return False
+        if not client.ensure_running(
+            VOICEVOX_CONTAINER, VOICEVOX_IMAGE, VOICEVOX_PORTS
+        ):
+            return False
+        return wait_for_voicevox(base_url, timeout)
+
     # Check Docker daemon is running
     if not is_docker_running():
         return False
 
     # Try starting existing container
     result = subprocess.run(
-        ["docker", "start", "voicevox"],
+        ["docker", "start", VOICEVOX_CONTAINER],
         capture_output=True,
         text=True,
     )
@@ -89,12 +164,12 @@ def start_voicevox_docker(
                 "run",
                 "-d",
                 "--name",
-                "voicevox",
+                VOICEVOX_CONTAINER,
                 "-p",
                 "127.0.0.1:50021:50021",
                 "--restart",
                 "unless-stopped",
-                "voicevox/voicevox_engine:cpu-latest",
+                VOICEVOX_IMAGE,
             ],
             capture_output=True,
             text=True,
@@ -102,38 +177,159 @@ def start_voicevox_docker(
         if result.returncode != 0:
             return False
 
-    # Poll until engine is ready
+    return wait_for_voicevox(base_url, timeout)
+
+
+def wait_for_voicevox(
+    base_url: str = "http://127.0.0.1:50021",
+    timeout: float = 60,
+    initial_delay: float = 0.1,
+    max_delay: float = 2.0,
+) -> bool:
+    """
+    Poll the engine until it answers, backing off exponentially.
+
+    Args:
+        base_url: VOICEVOX engine URL
+        timeout: Maximum seconds to wait
+        initial_delay: First wait between polls
+        max_delay: Longest wait between polls
+
+    Returns:
+        True if the engine became ready before the deadline
+    """
     deadline = time.monotonic() + timeout
+    delay = initial_delay
     while time.monotonic() < deadline:
         if is_voicevox_available(base_url):
             return True
-        time.sleep(2)
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
 
     return False
 
 
+def initialize_voicevox_speaker(
+    base_url: str = "http://127.0.0.1:50021", speaker_id: int = 13
+) -> bool:
+    """
+    Load a speaker's voice model so the first synthesis doesn't pay for it.
+
+    Args:
+        base_url: VOICEVOX engine URL
+        speaker_id: VOICEVOX speaker ID to preload
+
+    Returns:
+        True if the engine initialized the speaker
+    """
+    try:
+        response = requests.post(
+            f"{base_url}/initialize_speaker",
+            params={"speaker": speaker_id, "skip_reinit": "true"},
+            timeout=120,
+        )
+        return response.status_code == 204
+    except requests.RequestException:
+        return False
+
+
+def warm_up_voicevox(
+    base_url: str = "http://127.0.0.1:50021", speaker_id: int = 13
+) -> bool:
+    """
+    Make sure the engine is running and the speaker model is loaded.
+
+    Starts the container if the engine isn't reachable, then initializes
+    the speaker.
+
+    Args:
+        base_url: VOICEVOX engine URL
+        speaker_id: VOICEVOX speaker ID to preload
+
+    Returns:
+        True if VOICEVOX is ready to synthesize with this speaker
+    """
+    health = get_voicevox_health(base_url)
+    if not health.is_available():
+        if not start_voicevox_docker(base_url=base_url):
+            return False
+        health.record_success()
+    return initialize_voicevox_speaker(base_url, speaker_id)
+
+
+def preload_voicevox_speakers(
+    base_url: str = "http://127.0.0.1:50021",
+    speaker_ids: Sequence[int] = (13,),
+) -> bool:
+    """
+    Load speaker models on an engine that is already running.
+
+    Unlike ``warm_up_voicevox``, never starts or pulls the container.
+
+    Args:
+        base_url: VOICEVOX engine URL
+        speaker_ids: VOICEVOX speaker IDs to preload
+
+    Returns:
+        True if the engine is up and initialized every speaker
+    """
+    if not get_voicevox_health(base_url).is_available():
+        return False
+    return all(
+        [
+            initialize_voicevox_speaker(base_url, speaker_id)
+            for speaker_id in dict.fromkeys(speaker_ids)
+        ]
+    )
+
+
+def start_voicevox_warmup(
+    base_url: str = "http://127.0.0.1:50021",
+    speaker_ids: Sequence[int] = (13,),
+) -> Future:
+    """
+    Run ``preload_voicevox_speakers`` in a background thread.
+
+    Returns:
+        Future resolving to the preload result
+    """
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(preload_voicevox_speakers(base_url, speaker_ids))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="voicevox-warmup", daemon=True).start()
+    return future
+
+
 def generate_audio_voicevox(
     text: str,
     output_path: str,
     base_url: str = "http://127.0.0.1:50021",
     speaker_id: int = 13,
     speed: float = 0.95,
+    preset: str = DEFAULT_PRESET,
 ) -> str:
     """
     Generate TTS audio file using VOICEVOX engine.
 
     Uses a two-step synthesis process: audio query creation followed by
-    WAV synthesis, then converts to MP3 for Anki compatibility.
+    WAV synthesis. The WAV is then cleaned up and encoded with
+    ``encode_wav`` in the preset's format (MP3 or Opus).
 
     Args:
         text: Japanese text to synthesize
-        output_path: Path to save MP3 file
+        output_path: Path to save the audio file (use the preset's extension)
         base_url: VOICEVOX engine URL
         speaker_id: VOICEVOX speaker ID (default: 13, 青山龍星)
         speed: Speed scale (default: 0.95 for learner-friendly pacing)
+        preset: Encoding preset name (see ``encoding.ENCODING_PRESETS``)
 
     Returns:
-        Path to generated MP3 audio file
+        Path to generated audio file
 
     Raises:
         Exception: If audio generation fails
@@ -141,108 +337,585 @@ def generate_audio_voicevox(
     if not is_ffmpeg_available():
         raise Exception("ffmpeg is not installed. Install it with: brew install ffmpeg")
 
+    return coalesce_file(
+        artifact_key("tts", "voicevox", base_url, speaker_id, speed, preset, text),
+        output_path,
+        lambda path: _synthesize_voicevox(
+            text, path, base_url, speaker_id, speed, preset
+        ),
+    )
+
+
+def _synthesize_voicevox(
+    text: str,
+    output_path: str,
+    base_url: str,
+    speaker_id: int,
+    speed: float,
+    preset: str = DEFAULT_PRESET,
+) -> str:
     try:
-        dirname = os.path.dirname(output_path)
-        if dirname:
-            os.makedirs(dirname, exist_ok=True)
-
-        # Step 1: Create audio query
-        query_response = requests.post(
-            f"{base_url}/audio_query",
-            params={"speaker": speaker_id, "text": text},
-            timeout=30,
-        )
-        query_response.raise_for_status()
-        audio_query = query_response.json()
-
-        # Apply learner-friendly settings
-        audio_query["speedScale"] = speed
-        audio_query["intonationScale"] = 1.2
-        audio_query["prePhonemeLength"] = 0.3
-        audio_query["postPhonemeLength"] = 0.5
-
-        # Step 2: Synthesize audio (returns WAV bytes)
-        synth_response = requests.post(
-            f"{base_url}/synthesis",
-            params={"speaker": speaker_id},
-            json=audio_query,
-            timeout=60,
-        )
-        synth_response.raise_for_status()
+        with get_limiter("voicevox").slot():
+            # Step 1: Create audio query
+            audio_query = apply_learner_settings(
+                get_audio_query(text, base_url, speaker_id), speed
+            )
+
+            # Step 2: Synthesize audio (returns WAV bytes)
+            synth_response = requests.post(
+                f"{base_url}/synthesis",
+                params={"speaker": speaker_id},
+                json=audio_query,
+                timeout=60,
+            )
+            synth_response.raise_for_status()
+        get_voicevox_health(base_url).record_success()
+
+        # Step 3: Encode the WAV in the preset's format
+        return encode_wav(synth_response.content, output_path, preset=preset)
+    except requests.RequestException as e:
+        get_voicevox_health(base_url).record_failure()
+        raise Exception(f"VOICEVOX TTS failed: {e}") from e
+    except Exception as e:
+        raise Exception(f"VOICEVOX TTS failed: {e}") from e
+
 
-        # Step 3: Convert WAV to MP3 via ffmpeg
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            tmp.write(synth_response.content)
-            tmp_wav_path = tmp.name
+def create_audio_query(text: str, base_url: str, speaker_id: int) -> dict:
+    """Run the engine's text analysis and return the audio query JSON."""
+    query_response = requests.post(
+        f"{base_url}/audio_query",
+        params={"speaker": speaker_id, "text": text},
+        timeout=30,
+    )
+    query_response.raise_for_status()
+    return query_response.json()
+
+
+def get_voicevox_version(base_url: str = "http://127.0.0.1:50021") -> str | None:
+    """Return the engine version, remembered per URL, or None if unknown."""
+    with _voicevox_health_lock:
+        if base_url in _voicevox_versions:
+            return _voicevox_versions[base_url]
+    try:
+        response = requests.get(f"{base_url}/version", timeout=2)
+        response.raise_for_status()
+        version = response.json()
+    except (requests.RequestException, ValueError):
+        return None
+    if not isinstance(version, str):
+        return None
+    with _voicevox_health_lock:
+        _voicevox_versions[base_url] = version
+    return version
+
+
+def get_audio_query(text: str, base_url: str, speaker_id: int) -> dict:
+    """
+    Get the audio query for a sentence, reusing the on-disk cache.
 
+    Queries are cached by text, speaker and engine version, so voicing a
+    sentence again at another speed only needs ``/synthesis``. Caching is
+    skipped when the engine version cannot be read.
+
+    Args:
+        text: Japanese text to analyze
+        base_url: VOICEVOX engine URL
+        speaker_id: VOICEVOX speaker ID
+
+    Returns:
+        Audio query JSON without learner overrides applied
+    """
+    version = get_voicevox_version(base_url)
+    if version is None:
+        return create_audio_query(text, base_url, speaker_id)
+
+    key = artifact_key("audio_query", text, speaker_id, version)
+    cached = load_audio_query(key)
+    if cached is not None:
+        return cached
+    audio_query = create_audio_query(text, base_url, speaker_id)
+    save_audio_query(key, audio_query)
+    return audio_query
+
+
+def apply_learner_settings(audio_query: dict, speed: float) -> dict:
+    """Apply learner-friendly pacing to an audio query."""
+    audio_query["speedScale"] = speed
+    audio_query["intonationScale"] = 1.2
+    audio_query["prePhonemeLength"] = 0.3
+    audio_query["postPhonemeLength"] = 0.5
+    return audio_query
+
+
+def encode_wav(
+    wav_bytes: bytes,
+    output_path: str,
+    process: bool = True,
+    preset: str = DEFAULT_PRESET,
+    input_suffix: str = ".wav",
+) -> str:
+    """
+    Encode WAV bytes to the output format with ffmpeg.
+
+    Args:
+        wav_bytes: WAV file contents
+        output_path: Destination file; its extension selects the container
+        process: Downmix, resample, trim silence and normalize loudness
+            in-process first (skipped for data that isn't PCM WAV)
+        preset: Encoding preset name (see ``encoding.ENCODING_PRESETS``)
+        input_suffix: Suffix for the temporary input file when the data is
+            not WAV (e.g. ".mp3" from gTTS)
+
+    Returns:
+        Path to the encoded file
+
+    Raises:
+        RuntimeError: If ffmpeg fails
+    """
+    dirname = os.path.dirname(output_path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+
+    if process:
         try:
+            wav_bytes = process_wav(wav_bytes)
+        except (wave.Error, EOFError):
+            pass
+
+    ffmpeg_args = get_preset(preset).ffmpeg_args
+
+    with tempfile.NamedTemporaryFile(suffix=input_suffix, delete=False) as tmp:
+        tmp.write(wav_bytes)
+        tmp_wav_path = tmp.name
+
+    try:
+        with replacing(output_path) as encoded_path:
             result = subprocess.run(
                 [
                     "ffmpeg",
                     "-y",
                     "-i",
                     tmp_wav_path,
-                    output_path,
+                    *ffmpeg_args,
+                    encoded_path,
                 ],
                 capture_output=True,
                 text=True,
             )
             if result.returncode != 0:
                 raise RuntimeError(f"ffmpeg conversion failed: {result.stderr}")
-        finally:
-            os.unlink(tmp_wav_path)
+    finally:
+        os.unlink(tmp_wav_path)
+
+    return output_path
+
+
+def decode_to_wav(data: bytes) -> bytes:
+    """Decode audio bytes in any ffmpeg-readable format to WAV, via pipes."""
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", "pipe:0", "-f", "wav", "-"],
+        input=data,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg decode failed: {result.stderr.decode(errors='replace')}"
+        )
+    return result.stdout
+
 
-        return output_path
+def write_audio_bytes(data: bytes, output_path: str) -> str:
+    """Write already-encoded audio bytes to ``output_path``."""
+    return write_file(output_path, data)
+
+
+def process_audio_file(
+    input_path: str, output_path: str, preset: str = DEFAULT_PRESET
+) -> str:
+    """
+    Clean up a user-supplied audio file and encode it to ``output_path``.
+
+    The input is decoded to WAV on ffmpeg's stdout, processed in memory
+    (mono, resample, silence trim, loudness), and encoded once.
+
+    Args:
+        input_path: Audio file in any format ffmpeg can read
+        output_path: Destination file; its extension selects the format
+        preset: Encoding preset name (see ``encoding.ENCODING_PRESETS``)
+
+    Returns:
+        Path to the encoded file
+
+    Raises:
+        Exception: If decoding or encoding fails
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-v", "error", "-i", input_path, "-f", "wav", "-"],
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg decode failed: {result.stderr.decode(errors='replace')}"
+            )
+        return encode_wav(result.stdout, output_path, preset=preset)
+    except Exception as e:
+        raise Exception(f"Audio processing failed: {e}") from e
+
+
+def _spool_response(response: requests.Response) -> IO[bytes]:
+    """Copy a streamed response body to an anonymous temporary file."""
+    spool = tempfile.TemporaryFile()
+    try:
+        for chunk in response.iter_content(chunk_size=1 << 16):
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def generate_audio_voicevox_batch(
+    texts: list[str],
+    output_paths: list[str],
+    base_url: str = "http://127.0.0.1:50021",
+    speaker_id: int = 13,
+    speed: float = 0.95,
+    batch_size: int = 20,
+    preset: str = DEFAULT_PRESET,
+) -> list[str]:
+    """
+    Generate TTS audio for many sentences through VOICEVOX /multi_synthesis.
+
+    Audio queries are built concurrently, then sent ``batch_size`` at a time
+    to ``/multi_synthesis``, which returns a ZIP of WAVs. The ZIP is streamed
+    to a temporary file rather than held in memory, and each WAV is read
+    from it and encoded as it comes out.
+
+    Args:
+        texts: Japanese sentences to synthesize
+        output_paths: Output file for each sentence, in the same order
+        base_url: VOICEVOX engine URL
+        speaker_id: VOICEVOX speaker ID (default: 13, 青山龍星)
+        speed: Speed scale (default: 0.95 for learner-friendly pacing)
+        batch_size: Sentences per /multi_synthesis request
+        preset: Encoding preset name (see ``encoding.ENCODING_PRESETS``)
+
+    Returns:
+        Paths to generated audio files, in input order
+
+    Raises:
+        ValueError: If texts and output_paths differ in length
+        Exception: If audio generation fails
+    """
+    if len(texts) != len(output_paths):
+        raise ValueError("texts and output_paths must have the same length")
+    if not is_ffmpeg_available():
+        raise Exception("ffmpeg is not installed. Install it with: brew install ffmpeg")
+
+    limiter = get_limiter("voicevox")
+    health = get_voicevox_health(base_url)
+
+    def build_query(text: str) -> dict:
+        with limiter.slot():
+            return apply_learner_settings(
+                get_audio_query(text, base_url, speaker_id), speed
+            )
+
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=limiter.maximum) as pool:
+            queries = list(pool.map(build_query, texts))
+
+            for start in range(0, len(texts), batch_size):
+                chunk = queries[start : start + batch_size]
+                with limiter.slot():
+                    response = requests.post(
+                        f"{base_url}/multi_synthesis",
+                        params={"speaker": speaker_id},
+                        json=chunk,
+                        timeout=60 + 10 * len(chunk),
+                        stream=True,
+                    )
+                    with response:
+                        response.raise_for_status()
+                        spool = _spool_response(response)
+                health.record_success()
+
+                encodes = []
+                with spool, zipfile.ZipFile(spool) as zf:
+                    members = sorted(
+                        n for n in zf.namelist() if n.lower().endswith(".wav")
+                    )
+                    if len(members) != len(chunk):
+                        raise RuntimeError(
+                            f"expected {len(chunk)} WAVs, engine returned "
+                            f"{len(members)}"
+                        )
+                    for member, path in zip(
+                        members, output_paths[start : start + batch_size]
+                    ):
+                        with zf.open(member) as wav:
+                            encodes.append(
+                                pool.submit(encode_wav, wav.read(), path, preset=preset)
+                            )
+                results += [f.result() for f in encodes]
+        return results
+    except requests.RequestException as e:
+        health.record_failure()
+        raise Exception(f"VOICEVOX TTS failed: {e}") from e
+    except Exception as e:
+        raise Exception(f"VOICEVOX TTS failed: {e}") from e
+
+
+def generate_audio_voicevox_variants(
+    text: str,
+    output_paths: list[str],
+    variants: list[tuple[int, float]],
+    base_url: str = "http://127.0.0.1:50021",
+    preset: str = DEFAULT_PRESET,
+) -> list[str]:
+    """
+    Generate several voicings of one sentence with VOICEVOX.
+
+    Each speaker's audio query is fetched once and shared by all of its
+    speeds; the syntheses and encodes then run in parallel.
+
+    Args:
+        text: Japanese text to convert
+        output_paths: Output file for each variant, in the same order
+        variants: (speaker_id, speed) pairs, e.g. [(13, 0.95), (13, 0.7)]
+        base_url: VOICEVOX engine URL
+        preset: Encoding preset name (see ``encoding.ENCODING_PRESETS``)
+
+    Returns:
+        Paths to generated audio files, in variant order
+
+    Raises:
+        ValueError: If variants and output_paths differ in length
+        Exception: If audio generation fails
+    """
+    if len(variants) != len(output_paths):
+        raise ValueError("variants and output_paths must have the same length")
+    if not is_ffmpeg_available():
+        raise Exception("ffmpeg is not installed. Install it with: brew install ffmpeg")
+
+    limiter = get_limiter("voicevox")
+    health = get_voicevox_health(base_url)
+    speakers = list(dict.fromkeys(speaker_id for speaker_id, _ in variants))
+
+    def query_for(speaker_id: int) -> dict:
+        with limiter.slot():
+            return get_audio_query(text, base_url, speaker_id)
+
+    def synthesize(variant: tuple[int, float], output_path: str) -> str:
+        speaker_id, speed = variant
+        audio_query = apply_learner_settings(copy.deepcopy(queries[speaker_id]), speed)
+        with limiter.slot():
+            response = requests.post(
+                f"{base_url}/synthesis",
+                params={"speaker": speaker_id},
+                json=audio_query,
+                timeout=60,
+            )
+            response.raise_for_status()
+        health.record_success()
+        return encode_wav(response.content, output_path, preset=preset)
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(variants)) as pool:
+            queries = dict(zip(speakers, pool.map(query_for, speakers)))
+            return list(pool.map(synthesize, variants, output_paths))
+    except requests.RequestException as e:
+        health.record_failure()
+        raise Exception(f"VOICEVOX TTS failed: {e}") from e
     except Exception as e:
         raise Exception(f"VOICEVOX TTS failed: {e}") from e
 
 
-def enhance_text_for_speech(text: str, api_key: str) -> str:
+ENHANCE_MODEL = "gpt-4o-mini"
+
+ENHANCE_PROMPT = "You are an expert in Japanese phonetics and text-to-speech optimization. Your task is to add natural pauses and phrasing to Japanese text to make it sound more natural when read aloud by a TTS system. Add Japanese punctuation marks (、。) where a native speaker would naturally pause. Do NOT change any of the original Japanese characters - only add punctuation for natural phrasing. Return ONLY the enhanced Japanese text with no explanations."
+
+ENHANCE_BATCH_INSTRUCTIONS = 'The input is a JSON object {"sentences": [...]}. Enhance each sentence independently and reply with a JSON object {"sentences": [...]} holding the enhanced sentences in the same order.'
+
+# Characters the enhancer may add; everything else must come back unchanged
+_PAUSE_MARKS = str.maketrans("", "", "、。，,．. 　")
+
+
+def _enhance_key(text: str, model: str) -> str:
+    prompt_hash = hashlib.sha256(ENHANCE_PROMPT.encode("utf-8")).hexdigest()[:16]
+    return artifact_key("enhance", text, model, prompt_hash)
+
+
+def _accept_enhancement(text: str, enhanced) -> str | None:
+    """Return the enhanced text if it only adds pauses to the original."""
+    if not isinstance(enhanced, str):
+        return None
+    enhanced = enhanced.strip()
+    if enhanced.translate(_PAUSE_MARKS) != text.translate(_PAUSE_MARKS):
+        return None
+    return enhanced
+
+
+def enhance_text_for_speech(text: str, api_key: str, model: str = ENHANCE_MODEL) -> str:
     """
     Enhance Japanese text for more natural TTS output.
 
     Uses ChatGPT to add natural pauses and phrasing to Japanese text
     to make it sound more natural when read aloud by a TTS system.
+    Results are cached on disk by text, model and prompt, so the same
+    sentence is only sent once whichever TTS engine reads it.
 
     Args:
         text: Japanese text to enhance
         api_key: OpenAI API key
+        model: Chat model to use
 
     Returns:
         Enhanced text optimized for TTS, or original text if enhancement fails
     """
+    key = _enhance_key(text, model)
+    cached = load_enhanced_text(key)
+    if cached is not None:
+        return cached
+    return coalesce(key, lambda: _enhance_one(text, api_key, model, key))
+
+
+def _enhance_one(text: str, api_key: str, model: str, key: str) -> str:
     try:
         client = OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert in Japanese phonetics and text-to-speech optimization. Your task is to add natural pauses and phrasing to Japanese text to make it sound more natural when read aloud by a TTS system. Add Japanese punctuation marks (、。) where a native speaker would naturally pause. Do NOT change any of the original Japanese characters - only add punctuation for natural phrasing. Return ONLY the enhanced Japanese text with no explanations.",
-                },
-                {"role": "user", "content": text},
-            ],
-            temperature=0.2,
-        )
-        enhanced = response.choices[0].message.content
-        if enhanced is None:
-            return text
-        return enhanced.strip()
+        with get_limiter("openai_chat").slot():
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": ENHANCE_PROMPT},
+                    {"role": "user", "content": text},
+                ],
+                temperature=0.2,
+            )
+        enhanced = _accept_enhancement(text, response.choices[0].message.content)
     except Exception:
         # Fall back to original text if enhancement fails
         return text
+    if enhanced is None:
+        return text
+    save_enhanced_text(key, enhanced)
+    return enhanced
+
+
+def enhance_texts_for_speech(
+    texts: list[str],
+    api_key: str,
+    model: str = ENHANCE_MODEL,
+    batch_size: int = 50,
+) -> list[str]:
+    """
+    Enhance many sentences for speech with one chat request per batch.
+
+    Cached sentences are answered from disk; the rest are sent together as
+    a JSON list and the reply is matched back by position. Any sentence the
+    model dropped or altered beyond adding pauses keeps its original text
+    (and is not cached).
+
+    Args:
+        texts: Japanese sentences to enhance
+        api_key: OpenAI API key
+        model: Chat model to use
+        batch_size: Maximum sentences per request
+
+    Returns:
+        Enhanced sentences in input order
+    """
+    results = {}
+    pending = []
+    for text in dict.fromkeys(texts):
+        cached = load_enhanced_text(_enhance_key(text, model))
+        if cached is not None:
+            results[text] = cached
+        else:
+            pending.append(text)
+
+    if pending:
+        client = OpenAI(api_key=api_key)
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start : start + batch_size]
+            for text, enhanced in zip(chunk, _enhance_chunk(client, chunk, model)):
+                accepted = _accept_enhancement(text, enhanced)
+                if accepted is None:
+                    results[text] = text
+                else:
+                    save_enhanced_text(_enhance_key(text, model), accepted)
+                    results[text] = accepted
+
+    return [results[text] for text in texts]
+
+
+def _enhance_chunk(client: OpenAI, chunk: list[str], model: str) -> list:
+    """Enhance one batch; on any error or a malformed reply, return no edits."""
+    try:
+        with get_limiter("openai_chat").slot():
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": f"{ENHANCE_PROMPT} {ENHANCE_BATCH_INSTRUCTIONS}",
+                    },
+                    {
+                        "role": "user",
+                        "content": json.dumps({"sentences": chunk}, ensure_ascii=False),
+                    },
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.2,
+            )
+        sentences = json.loads(response.choices[0].message.content)["sentences"]
+    except Exception:
+        return [None] * len(chunk)
+    if not isinstance(sentences, list) or len(sentences) != len(chunk):
+        return [None] * len(chunk)
+    return sentences
 
 
 def generate_audio(
-    text: str, output_path: str, lang: str = "ja", slow: bool = False
+    text: str,
+    output_path: str,
+    lang: str = "ja",
+    slow: bool = False,
+    preset: str = DEFAULT_PRESET,
 ) -> str:
-    """Generate TTS audio file using gTTS."""
-    dirname = os.path.dirname(output_path)
-    if dirname:
-        os.makedirs(dirname, exist_ok=True)
-    tts = gTTS(text=text, lang=lang, slow=slow)
-    tts.save(output_path)
-    return output_path
+    """
+    Generate TTS audio file using gTTS.
+
+    The MP3 from gTTS is kept in memory. With ffmpeg installed it is decoded
+    and goes through the same post-processing and preset encode as VOICEVOX;
+    without ffmpeg it is written as-is (default preset only).
+    """
+    return coalesce_file(
+        artifact_key("tts", "gtts", lang, slow, preset, text),
+        output_path,
+        lambda path: _synthesize_gtts(text, path, lang, slow, preset),
+    )
+
+
+def _synthesize_gtts(
+    text: str,
+    output_path: str,
+    lang: str,
+    slow: bool,
+    preset: str = DEFAULT_PRESET,
+) -> str:
+    buffer = io.BytesIO()
+    with get_limiter("gtts").slot():
+        gTTS(text=text, lang=lang, slow=slow).write_to_fp(buffer)
+
+    if is_ffmpeg_available():
+        return encode_wav(decode_to_wav(buffer.getvalue()), output_path, preset=preset)
+    if get_preset(preset).name != DEFAULT_PRESET:
+        raise Exception(f"ffmpeg is required for the {preset} audio preset")
+    return write_audio_bytes(buffer.getvalue(), output_path)
 
 
 def generate_audio_openai(
@@ -253,18 +926,24 @@ def generate_audio_openai(
     voice: str = "alloy",
     speed: float = 1.0,
     enhance: bool = False,
+    preset: str = DEFAULT_PRESET,
 ) -> str:
     """
     Generate TTS audio file using OpenAI TTS API.
 
+    Audio is read into memory. With ffmpeg installed it is requested as WAV
+    and goes through the same post-processing and preset encode as VOICEVOX;
+    otherwise the MP3 response is written as-is.
+
     Args:
         text: Japanese text to synthesize
-        output_path: Path to save MP3 file
+        output_path: Path to save the audio file (use the preset's extension)
         api_key: OpenAI API key
         model: TTS model ("tts-1" or "tts-1-hd")
         voice: Voice to use (alloy, echo, fable, onyx, nova, shimmer)
         speed: Playback speed (0.25 to 4.0)
         enhance: Enhance text for natural speech (default: False)
+        preset: Encoding preset name (see ``encoding.ENCODING_PRESETS``)
 
     Returns:
         Path to generated audio file
@@ -276,21 +955,46 @@ def generate_audio_openai(
     if not api_key:
         raise ValueError("OpenAI API key required for TTS generation")
 
-    try:
-        dirname = os.path.dirname(output_path)
-        if dirname:
-            os.makedirs(dirname, exist_ok=True)
+    return coalesce_file(
+        artifact_key("tts", "openai", model, voice, speed, enhance, preset, text),
+        output_path,
+        lambda path: _synthesize_openai(
+            text, path, api_key, model, voice, speed, enhance, preset
+        ),
+    )
+
 
+def _synthesize_openai(
+    text: str,
+    output_path: str,
+    api_key: str,
+    model: str,
+    voice: str,
+    speed: float,
+    enhance: bool,
+    preset: str = DEFAULT_PRESET,
+) -> str:
+    try:
         # Enhance text for better pronunciation if requested
         speech_text = enhance_text_for_speech(text, api_key) if enhance else text
 
         client = OpenAI(api_key=api_key)
-
-        with client.audio.speech.with_streaming_response.create(
-            model=model, voice=voice, input=speech_text, speed=speed
-        ) as response:
-            response.stream_to_file(output_path)
-
-        return output_path
+        encode = is_ffmpeg_available()
+        if not encode and get_preset(preset).name != DEFAULT_PRESET:
+            raise RuntimeError(f"ffmpeg is required for the {preset} audio preset")
+
+        with get_limiter("openai_tts").slot():
+            with client.audio.speech.with_streaming_response.create(
+                model=model,
+                voice=voice,
+                input=speech_text,
+                speed=speed,
+                response_format="wav" if encode else "mp3",
+            ) as response:
+                data = response.read()
+
+        if encode:
+            return encode_wav(data, output_path, preset=preset)
+        return write_audio_bytes(data, output_path)
     except Exception as e:
         raise Exception(f"OpenAI TTS failed: {e}") from e
@@ -0,0 +1,403 @@
+"""In-process WAV post-processing with NumPy: mono, resample, trim, normalize."""
+
+import io
+import math
+import wave
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# PCM sample widths (bytes) to the NumPy type used to read them
+_PCM_TYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+# Resampling filter: sinc zero crossings kept per side, and the Kaiser window
+# shape (beta 8.6 gives about 80 dB of stopband attenuation)
+_SINC_ZEROS = 16
+_KAISER_BETA = 8.6
+
+# Output samples per filter matrix product, to bound memory on long audio
+_RESAMPLE_BLOCK = 16384
+
+
+def read_wav(data: bytes) -> tuple[np.ndarray, int]:
+    """
+    Decode PCM WAV bytes.
+
+    Args:
+        data: WAV file contents (8, 16, 24 or 32-bit integer PCM)
+
+    Returns:
+        Tuple of (float32 samples shaped (frames, channels) in [-1, 1], rate)
+
+    Raises:
+        wave.Error: If the data is not a PCM WAV file
+    """
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 3:
+        # 24-bit: widen each little-endian sample to int32
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = (b[:, 0] << 8 | b[:, 1] << 16 | b[:, 2] << 24) >> 8
+        samples = ints.astype(np.float32) / (1 << 23)
+    elif width in _PCM_TYPES:
+        ints = np.frombuffer(raw, dtype=_PCM_TYPES[width])
+        if width == 1:
+            samples = (ints.astype(np.float32) - 128) / 128
+        else:
+            samples = ints.astype(np.float32) / float(1 << (8 * width - 1))
+    else:
+        raise wave.Error(f"unsupported sample width: {width}")
+
+    return samples.reshape(-1, channels), rate
+
+
+def write_wav(samples: np.ndarray, rate: int) -> bytes:
+    """Encode float samples shaped (frames, channels) as 16-bit PCM WAV."""
+    if samples.ndim == 1:
+        samples = samples[:, np.newaxis]
+    ints = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(ints.tobytes())
+    return buffer.getvalue()
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """Downmix (frames, channels) samples to a 1-D mono signal."""
+    if samples.ndim == 1:
+        return samples
+    return samples.mean(axis=1, dtype=np.float32)
+
+
+@lru_cache(maxsize=16)
+def _resample_filter(up: int, down: int) -> tuple[np.ndarray, int]:
+    """
+    Polyphase windowed-sinc filter bank for resampling by ``up / down``.
+
+    Row ``p`` holds the weights for an output sample that falls ``p / up``
+    of the way past an input sample, over the ``2 * half`` input samples
+    around it. The cutoff sits at the lower of the two Nyquist frequencies,
+    so downsampling removes what the new rate cannot represent.
+
+    Returns:
+        Tuple of (float32 weights shaped (up, 2 * half), half)
+    """
+    scale = min(1.0, up / down)
+    half = math.ceil(_SINC_ZEROS / scale)
+    distance = np.arange(up)[:, np.newaxis] / up - np.arange(-half + 1, half + 1)
+    window = np.i0(_KAISER_BETA * np.sqrt(np.clip(1 - (distance / half) ** 2, 0, 1)))
+    weights = scale * np.sinc(scale * distance) * window
+    weights /= weights.sum(axis=1, keepdims=True)  # unity gain at DC
+    return weights.astype(np.float32), half
+
+
+def resample(samples: np.ndarray, rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample a mono signal with a band-limited polyphase filter.
+
+    Each output sample is a Kaiser-windowed sinc interpolation of the input
+    around its position, low-pass filtered below the lower Nyquist
+    frequency, so downsampling does not alias. Output samples sharing a
+    filter phase are computed together as one matrix product over strided
+    input windows.
+
+    Args:
+        samples: Mono samples
+        rate: Input sample rate
+        target_rate: Output sample rate
+
+    Returns:
+        float32 samples at ``target_rate``
+    """
+    if rate == target_rate or len(samples) == 0:
+        return samples
+    common = math.gcd(rate, target_rate)
+    up, down = target_rate // common, rate // common
+    weights, half = _resample_filter(up, down)
+
+    length = round(len(samples) * up / down)
+    padded = np.zeros(len(samples) + 2 * half, dtype=np.float32)
+    padded[half - 1 : half - 1 + len(samples)] = samples
+    # windows[i] covers input samples i - half + 1 .. i + half
+    windows = sliding_window_view(padded, 2 * half)
+
+    output = np.empty(length, dtype=np.float32)
+    for first in range(min(up, length)):
+        # Outputs first, first + up, ... share a phase, and their input
+        # positions advance by exactly ``down`` samples
+        phase = weights[first * down % up]
+        rows = windows[first * down // up :: down]
+        targets = output[first::up]
+        for start in range(0, len(targets), _RESAMPLE_BLOCK):
+            block = rows[start : min(start + _RESAMPLE_BLOCK, len(targets))]
+            targets[start : start + len(block)] = np.ascontiguousarray(block) @ phase
+    return output
+
+
+def frame_rms(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """RMS of consecutive non-overlapping frames (the last frame zero-padded)."""
+    frames = -(-len(samples) // frame_length)
+    padded = np.zeros(frames * frame_length, dtype=np.float32)
+    padded[: len(samples)] = samples
+    return np.sqrt(np.mean(padded.reshape(frames, frame_length) ** 2, axis=1))
+
+
+def trim_silence(
+    samples: np.ndarray,
+    rate: int,
+    threshold_db: float = -45.0,
+    frame_ms: float = 10.0,
+    keep_ms: float = 100.0,
+) -> np.ndarray:
+    """
+    Trim leading and trailing silence from a mono signal.
+
+    Args:
+        samples: Mono samples in [-1, 1]
+        rate: Sample rate
+        threshold_db: Frames quieter than this (dBFS RMS) count as silence
+        frame_ms: Analysis frame length
+        keep_ms: Silence kept before the first and after the last loud frame
+
+    Returns:
+        Trimmed samples (unchanged if the whole signal is silent)
+    """
+    frame_length = max(1, int(rate * frame_ms / 1000))
+    loud = np.flatnonzero(frame_rms(samples, frame_length) > 10 ** (threshold_db / 20))
+    if len(loud) == 0:
+        return samples
+    keep = int(rate * keep_ms / 1000)
+    start = max(0, loud[0] * frame_length - keep)
+    end = min(len(samples), (loud[-1] + 1) * frame_length + keep)
+    return samples[start:end]
+
+
+def normalize_loudness(
+    samples: np.ndarray,
+    rate: int,
+    target_db: float = -20.0,
+    peak_db: float = -1.0,
+    threshold_db: float = -45.0,
+    frame_ms: float = 10.0,
+) -> np.ndarray:
+    """
+    Scale a mono signal so its speech RMS reaches ``target_db`` dBFS.
+
+    Loudness is measured over frames above ``threshold_db`` so pauses don't
+    pull the level down; the gain is then capped to keep peaks under
+    ``peak_db``.
+    """
+    frame_length = max(1, int(rate * frame_ms / 1000))
+    rms = frame_rms(samples, frame_length)
+    active = rms[rms > 10 ** (threshold_db / 20)]
+    if len(active) == 0:
+        return samples
+    loudness = np.sqrt(np.mean(active**2))
+    gain = 10 ** (target_db / 20) / loudness
+    peak = np.max(np.abs(samples))
+    gain = min(gain, 10 ** (peak_db / 20) / peak)
+    return (samples * gain).astype(np.float32)
+
+
+def split_at_silence(
+    samples: np.ndarray,
+    rate: int,
+    max_seconds: float,
+    search_seconds: float = 30.0,
+    frame_ms: float = 20.0,
+) -> list[np.ndarray]:
+    """
+    Split a mono signal into pieces of at most ``max_seconds``.
+
+    Each cut is placed at the quietest frame within the last
+    ``search_seconds`` (at most half the limit) before the limit, so pieces
+    end in a pause rather than mid-word.
+
+    Args:
+        samples: Mono samples in [-1, 1]
+        rate: Sample rate
+        max_seconds: Maximum piece length
+        search_seconds: How far back from the limit to look for a pause
+        frame_ms: Analysis frame length
+
+    Returns:
+        Consecutive pieces covering the whole signal
+    """
+    frame_length = max(1, int(rate * frame_ms / 1000))
+    max_frames = max(1, int(max_seconds * rate) // frame_length)
+    # Never search more than the back half, so pieces stay at least half-length
+    search_frames = min(
+        max(1, max_frames // 2), max(1, int(search_seconds * rate) // frame_length)
+    )
+    rms = frame_rms(samples, frame_length)
+
+    pieces = []
+    start = 0  # in frames
+    while (len(rms) - start) > max_frames:
+        window = rms[start + max_frames - search_frames : start + max_frames]
+        cut = start + max_frames - search_frames + int(np.argmin(window)) + 1
+        pieces.append(samples[start * frame_length : cut * frame_length])
+        start = cut
+    pieces.append(samples[start * frame_length :])
+    return pieces
+
+
+def frame_zcr(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Zero-crossing rate (crossings per sample) of consecutive frames."""
+    frames = -(-len(samples) // frame_length)
+    padded = np.zeros(frames * frame_length, dtype=np.float32)
+    padded[: len(samples)] = samples
+    signs = np.signbit(padded.reshape(frames, frame_length))
+    return np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+
+def detect_speech(
+    samples: np.ndarray,
+    rate: int,
+    frame_ms: float = 30.0,
+    threshold_db: float = -45.0,
+    noise_margin_db: float = 12.0,
+    fricative_zcr: float = 0.3,
+    min_speech_ms: float = 150.0,
+    min_silence_ms: float = 300.0,
+    pad_ms: float = 100.0,
+) -> list[tuple[int, int]]:
+    """
+    Find speech in a mono signal with an energy and zero-crossing VAD.
+
+    A frame is voiced when its RMS clears both ``threshold_db`` and the
+    noise floor (10th-percentile frame RMS) plus ``noise_margin_db``. Quieter
+    frames (down to 6 dB below that) still count when their zero-crossing
+    rate is above ``fricative_zcr``, which keeps unvoiced consonants such
+    as "s" and "sh". Pauses shorter than ``min_silence_ms`` are bridged and
+    bursts shorter than ``min_speech_ms`` dropped.
+
+    Args:
+        samples: Mono samples in [-1, 1]
+        rate: Sample rate
+        frame_ms: Analysis frame length
+        threshold_db: Absolute minimum speech level (dBFS RMS)
+        noise_margin_db: How far above the noise floor speech must be
+        fricative_zcr: Zero-crossing rate marking quiet unvoiced speech
+        min_speech_ms: Shortest burst kept as speech
+        min_silence_ms: Shortest pause that separates utterances
+        pad_ms: Context kept before and after each utterance
+
+    Returns:
+        List of (start, end) sample ranges, in order
+    """
+    if len(samples) == 0:
+        return []
+    frame_length = max(1, int(rate * frame_ms / 1000))
+    rms = frame_rms(samples, frame_length)
+    # Noise floor plus margin, but never above the loudest frame minus the
+    # margin, so recordings with little silence still register speech
+    margin = 10 ** (noise_margin_db / 20)
+    threshold = max(
+        10 ** (threshold_db / 20),
+        min(np.percentile(rms, 10) * margin, rms.max() / margin),
+    )
+    speech = (rms > threshold) | (
+        (rms > threshold / 2) & (frame_zcr(samples, frame_length) > fricative_zcr)
+    )
+
+    # Run boundaries: starts where speech begins, ends where it stops
+    edges = np.diff(np.concatenate([[False], speech, [False]]).astype(np.int8))
+    runs = list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+    min_gap = min_silence_ms / frame_ms
+    merged = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    pad = int(rate * pad_ms / 1000)
+    return [
+        (
+            max(0, start * frame_length - pad),
+            min(len(samples), end * frame_length + pad),
+        )
+        for start, end in merged
+        if end - start >= min_speech_ms / frame_ms
+    ]
+
+
+def vad_chunks(
+    samples: np.ndarray, rate: int, max_seconds: float = 30.0, **vad_options
+) -> list[tuple[int, int]]:
+    """
+    Group detected speech into chunks of at most ``max_seconds``.
+
+    Consecutive utterances are packed into one chunk while it fits; silence
+    outside utterances is left out. An utterance longer than the limit is
+    cut at its quietest points with ``split_at_silence``.
+
+    Args:
+        samples: Mono samples in [-1, 1]
+        rate: Sample rate
+        max_seconds: Maximum chunk length
+        **vad_options: Passed to ``detect_speech``
+
+    Returns:
+        List of (start, end) sample ranges, in order
+    """
+    limit = int(max_seconds * rate)
+    chunks = []
+    for start, end in detect_speech(samples, rate, **vad_options):
+        if end - start > limit:
+            for piece in split_at_silence(samples[start:end], rate, max_seconds):
+                chunks.append((start, start + len(piece)))
+                start += len(piece)
+        elif chunks and end - chunks[-1][0] <= limit:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
+
+
+def process_wav(
+    data: bytes,
+    target_rate: int | None = 24000,
+    trim: bool = True,
+    normalize: bool = True,
+) -> bytes:
+    """
+    Clean up WAV audio before encoding.
+
+    Downmixes to mono, resamples to ``target_rate``, trims leading and
+    trailing silence, and normalizes loudness, all on the decoded buffer so
+    the result can go straight to the single encode.
+
+    Args:
+        data: WAV file contents
+        target_rate: Output sample rate, or None to keep the input rate
+        trim: Trim leading and trailing silence
+        normalize: Normalize speech loudness
+
+    Returns:
+        Processed 16-bit mono WAV bytes
+
+    Raises:
+        wave.Error: If the data is not a PCM WAV file
+    """
+    samples, rate = read_wav(data)
+    mono = to_mono(samples)
+    if target_rate:
+        mono = resample(mono, rate, target_rate)
+        rate = target_rate
+    if trim:
+        mono = trim_silence(mono, rate)
+    if normalize:
+        mono = normalize_loudness(mono, rate)
+    return write_wav(mono, rate)
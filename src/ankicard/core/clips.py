@@ -0,0 +1,231 @@
+"""Cut sentence clips and screenshots out of long recordings with ffmpeg."""
+
+import shutil
+import subprocess
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+
+from ..media.placement import replacing
+from .image_processing import ImagePreset, convert_image_file, get_image_preset
+from .transcription import Segment, probe_format
+
+
+# Source container to the clip extension that holds its audio stream unchanged
+CLIP_EXTENSIONS = {
+    "mp3": "mp3",
+    "wav": "wav",
+    "flac": "flac",
+    "ogg": "ogg",
+    "m4a": "m4a",
+    "mp4": "m4a",
+    "aac": "m4a",
+}
+
+# Audio codec, as ffprobe names it, to a clip extension that holds it as-is;
+# used for containers such as MKV and WebM whose audio could be anything
+CODEC_EXTENSIONS = {
+    "mp3": "mp3",
+    "aac": "m4a",
+    "alac": "m4a",
+    "flac": "flac",
+    "vorbis": "ogg",
+    "opus": "ogg",
+    "pcm_s16le": "wav",
+}
+
+# Used when the source's audio can't be copied into a clip container
+FALLBACK_EXTENSION = "mp3"
+FALLBACK_CODEC_ARGS = ("-c:a", "libmp3lame", "-q:a", "4")
+
+# Screenshots leave ffmpeg as lossless PNG frames, already shrunk to fit the
+# image preset, and are encoded to the preset's format by image_processing
+FRAME_ARGS = ("-frames:v", "1", "-c:v", "png")
+
+# Cues extracted per ffmpeg run; each opens one or two seeked inputs
+CUES_PER_RUN = 16
+
+
+def clip_extension(source_path: str) -> str | None:
+    """
+    Pick the clip file extension for a source recording.
+
+    Args:
+        source_path: Audio or video file the clips are cut from
+
+    Known audio containers map straight to a clip container; for others
+    (MKV, WebM, AVI, ...) the choice follows the audio codec reported by
+    ffprobe.
+
+    Args:
+        source_path: Audio or video file the clips are cut from
+
+    Returns:
+        An extension whose container can hold the source's audio stream
+        as-is, or None if clips must be re-encoded (as
+        ``FALLBACK_EXTENSION``)
+    """
+    extension = CLIP_EXTENSIONS.get(probe_format(source_path))
+    if extension is None:
+        extension = CODEC_EXTENSIONS.get(_audio_codec(source_path))
+    return extension
+
+
+def _audio_codec(source_path: str) -> str | None:
+    if not shutil.which("ffprobe"):
+        return None
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=codec_name",
+            "-of",
+            "csv=p=0",
+            source_path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def cut_clip(
+    source_path: str,
+    start: float,
+    end: float,
+    output_path: str,
+    copy: bool = True,
+) -> str:
+    """
+    Cut ``[start, end)`` seconds of a recording's audio into its own file.
+
+    With ``copy`` the audio packets are copied without re-encoding (cuts
+    land on the nearest packet, a few tens of milliseconds at most);
+    otherwise the clip is encoded as MP3.
+
+    Args:
+        source_path: Audio or video file to cut from
+        start: Clip start in seconds
+        end: Clip end in seconds
+        output_path: Destination file
+        copy: Stream-copy the audio instead of re-encoding
+
+    Returns:
+        Path to the clip
+
+    Raises:
+        Exception: If ffmpeg fails
+    """
+    codec_args = ("-c:a", "copy") if copy else FALLBACK_CODEC_ARGS
+    try:
+        with replacing(output_path) as clip_path:
+            _run_ffmpeg(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-v",
+                    "error",
+                    "-ss",
+                    f"{max(0.0, start):.3f}",
+                    "-i",
+                    source_path,
+                    "-t",
+                    f"{max(0.0, end - start):.3f}",
+                    "-vn",
+                    "-map",
+                    "0:a:0",
+                    *codec_args,
+                    clip_path,
+                ]
+            )
+        return output_path
+    except Exception as e:
+        raise Exception(f"Clip extraction failed: {e}") from e
+
+
+def extract_cue_media(
+    source_path: str,
+    cues: list[Segment],
+    audio_paths: list[str],
+    image_paths: list[str | None] | None = None,
+    copy: bool = True,
+    pad: float = 0.0,
+    cues_per_run: int = CUES_PER_RUN,
+    image_preset: ImagePreset | None = None,
+) -> None:
+    """
+    Cut each cue's audio clip and a screenshot from a video in few passes.
+
+    Every clip and frame is a separate ffmpeg input seeked with ``-ss``
+    before ``-i``, so ffmpeg jumps to the nearest keyframe instead of
+    decoding the video up to each cue, and ``cues_per_run`` cues share one
+    process so the source is probed and ffmpeg started once per batch
+    rather than once per file. Screenshots are taken at the middle of the
+    cue and fitted to ``image_preset``.
+
+    Args:
+        source_path: Video (or audio) file to cut from
+        cues: Timed cues to extract
+        audio_paths: Clip destination for each cue
+        image_paths: Screenshot destination for each cue (None entries, or
+            None overall, skip screenshots)
+        copy: Stream-copy the audio instead of re-encoding it as MP3
+        pad: Extra audio kept before and after each cue, in seconds
+        cues_per_run: Cues extracted per ffmpeg process
+        image_preset: Screenshot format and size (default: the default preset)
+
+    Raises:
+        Exception: If ffmpeg fails
+    """
+    codec_args = ("-c:a", "copy") if copy else FALLBACK_CODEC_ARGS
+    image_paths = image_paths or [None] * len(cues)
+    jobs = list(zip(cues, audio_paths, image_paths))
+    preset = image_preset or get_image_preset()
+    size = preset.max_size
+    # Fit the longest side to the preset, never enlarging
+    scale = (
+        f"scale='min(iw,{size})':'min(ih,{size})':force_original_aspect_ratio=decrease"
+    )
+
+    for first in range(0, len(jobs), cues_per_run):
+        inputs = ["ffmpeg", "-y", "-v", "error"]
+        outputs = []
+        index = 0  # Each output reads its own seeked input
+        frames = []
+        try:
+            # Outputs go to temporary files that replace the targets together
+            with ExitStack() as stack:
+                frame_dir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+                for cue, audio_path, image_path in jobs[first : first + cues_per_run]:
+                    start = max(0.0, cue.start - pad)
+                    end = cue.end + pad
+                    inputs += ["-ss", f"{start:.3f}", "-t", f"{end - start:.3f}"]
+                    inputs += ["-i", source_path]
+                    clip_path = stack.enter_context(replacing(audio_path))
+                    outputs += ["-map", f"{index}:a:0", *codec_args, clip_path]
+                    index += 1
+                    if image_path:
+                        middle = (cue.start + cue.end) / 2
+                        inputs += ["-ss", f"{middle:.3f}", "-i", source_path]
+                        frame_path = str(frame_dir / f"frame{index}.png")
+                        outputs += ["-map", f"{index}:v:0", *FRAME_ARGS]
+                        outputs += ["-vf", scale, frame_path]
+                        frames.append((frame_path, image_path))
+                        index += 1
+                _run_ffmpeg(inputs + outputs)
+                for frame_path, image_path in frames:
+                    convert_image_file(frame_path, image_path, preset)
+        except Exception as e:
+            raise Exception(f"Clip extraction failed: {e}") from e
+
+
+def _run_ffmpeg(cmd: list[str]) -> None:
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode(errors="replace").strip())
@@ -0,0 +1,284 @@
+"""Adaptive per-provider concurrency limits and in-flight request coalescing."""
+
+import os
+import socket
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import Any
+
+import requests
+
+from ..media.placement import place_file
+
+
+# Initial, minimum, and maximum concurrent calls for each provider
+PROVIDER_LIMITS = {
+    "voicevox": (2, 1, 8),
+    "gemini": (2, 1, 4),
+    "whisper": (4, 1, 8),
+    "google_translate": (4, 1, 16),
+    "openai_chat": (4, 1, 16),
+    "gtts": (4, 1, 16),
+    "openai_tts": (4, 1, 16),
+}
+
+_limiters: dict[str, "AdaptiveLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """
+    Check whether an exception signals provider overload (HTTP 429 or timeout).
+
+    Walks the exception chain, since provider wrappers re-raise errors as
+    ``Exception(...) from e``.
+
+    Args:
+        exc: Exception raised by a provider call
+
+    Returns:
+        True if the call was rate limited or timed out
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (requests.Timeout, TimeoutError, socket.timeout)):
+            return True
+        name = type(exc).__name__
+        if "Timeout" in name or "RateLimit" in name:
+            return True
+        response = getattr(exc, "response", None)
+        for status in (
+            getattr(exc, "status_code", None),
+            getattr(exc, "code", None),
+            getattr(response, "status_code", None),
+        ):
+            if status == 429:
+                return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by additive increase, multiplicative decrease.
+
+    Every ``window`` successful calls, the p95 latency of that window is
+    compared against the best p95 seen so far. While it stays within
+    ``latency_tolerance`` of that baseline the limit grows by ``increase``.
+    A rate-limit or timeout error multiplies the limit by ``decrease``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = 8,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        window: int = 10,
+        latency_tolerance: float = 1.5,
+    ):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._baseline_p95: float | None = None
+        self._last_p95: float | None = None
+        self._decreases = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight."""
+        return max(self.minimum, int(self._limit))
+
+    def acquire(self) -> None:
+        """Block until a slot is free under the current limit."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """
+        Free a slot and feed the call outcome back into the limit.
+
+        Args:
+            latency: Seconds the call took
+            overloaded: True if the provider rate limited or timed out
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if overloaded:
+                self._limit = max(float(self.minimum), self._limit * self.decrease)
+                self._latencies.clear()
+                self._baseline_p95 = None
+                self._decreases += 1
+            else:
+                self._latencies.append(latency)
+                if len(self._latencies) >= self.window:
+                    self._adjust()
+            self._cond.notify_all()
+
+    def _adjust(self) -> None:
+        """Grow the limit if p95 latency of the last window is stable."""
+        ordered = sorted(self._latencies)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        self._last_p95 = p95
+        self._latencies.clear()
+        if self._baseline_p95 is None or p95 < self._baseline_p95:
+            self._baseline_p95 = p95
+        if p95 <= self._baseline_p95 * self.latency_tolerance:
+            self._limit = min(float(self.maximum), self._limit + self.increase)
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot for the duration of one provider call."""
+        self.acquire()
+        start = time.monotonic()
+        overloaded = False
+        try:
+            yield
+        except BaseException as e:
+            overloaded = is_overload_error(e)
+            raise
+        finally:
+            self.release(time.monotonic() - start, overloaded)
+
+    def stats(self) -> dict:
+        """Snapshot of the limiter state for reporting."""
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "p95_latency": self._last_p95,
+                "decreases": self._decreases,
+            }
+
+
+def get_limiter(provider: str) -> AdaptiveLimiter:
+    """Get the shared limiter for a provider, creating it on first use."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            initial, minimum, maximum = PROVIDER_LIMITS.get(provider, (2, 1, 8))
+            _limiters[provider] = AdaptiveLimiter(
+                provider, initial=initial, minimum=minimum, maximum=maximum
+            )
+        return _limiters[provider]
+
+
+def limiter_stats() -> dict[str, dict]:
+    """Stats for every provider limiter used so far."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in sorted(limiters.items())}
+
+
+def reset_limiters() -> None:
+    """Discard all limiters (used between batches and in tests)."""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one upstream call.
+
+    The first caller for a key runs the work; callers arriving while it is
+    in flight wait and receive the same result (or exception). Once the call
+    finishes the key is forgotten, so later calls run again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, "_Call"] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` for ``key``, or wait for the identical call in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class _Call:
+    """State of one in-flight call shared by coalesced callers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+_flight = SingleFlight()
+
+
+def coalesce(key: str, fn: Callable[[], Any]) -> Any:
+    """Run ``fn`` once for all concurrent callers with the same key."""
+    return _flight.do(key, fn)
+
+
+def coalesce_file(
+    key: str, output_path: str, produce: Callable[[str], str | None]
+) -> str | None:
+    """
+    Coalesce work that writes its result to a file.
+
+    The leading caller writes to its own ``output_path``; waiting callers
+    receive the same file at their own path (linked when possible).
+
+    Args:
+        key: Cache key identifying the work
+        output_path: Where this caller wants the file
+        produce: Function writing the file to the given path, returning the
+            path or None on failure
+
+    Returns:
+        ``output_path`` if a file was produced, otherwise None
+    """
+    produced = _flight.do(key, lambda: produce(output_path))
+    if produced is None:
+        return None
+    if os.path.abspath(produced) != os.path.abspath(output_path):
+        dirname = os.path.dirname(output_path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        place_file(produced, output_path)
+    return output_path
+
+
+def coalesced_count() -> int:
+    """Number of calls served by another in-flight call so far."""
+    return _flight.coalesced
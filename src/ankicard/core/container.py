@@ -0,0 +1,195 @@
+"""Lightweight Docker/Podman Engine API client over the local Unix socket."""
+
+import http.client
+import json
+import os
+import socket
+from pathlib import Path
+from urllib.parse import quote, urlencode
+
+
+API_VERSION = "v1.41"
+
+# Errors that mean the daemon could not be reached or answered badly
+CLIENT_ERRORS = (OSError, http.client.HTTPException, ValueError)
+
+
+def find_socket() -> str | None:
+    """
+    Locate the Docker or Podman API socket.
+
+    Checks ``DOCKER_HOST`` and ``CONTAINER_HOST`` first, then the standard
+    Docker, Docker Desktop, Colima, and rootless/rootful Podman locations.
+
+    Returns:
+        Path to the socket, or None if no socket exists
+    """
+    candidates = []
+    for var in ("DOCKER_HOST", "CONTAINER_HOST"):
+        value = os.environ.get(var, "")
+        if value.startswith("unix://"):
+            candidates.append(value[len("unix://") :])
+
+    home = Path.home()
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    candidates += [
+        "/var/run/docker.sock",
+        str(home / ".docker" / "run" / "docker.sock"),
+        str(home / ".colima" / "default" / "docker.sock"),
+        os.path.join(runtime_dir, "podman", "podman.sock"),
+        "/run/podman/podman.sock",
+    ]
+
+    for path in candidates:
+        if path and Path(path).is_socket():
+            return path
+    return None
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float | None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class ContainerClient:
+    """
+    Minimal client for the Docker Engine API (also served by Podman).
+
+    Covers only what the VOICEVOX container needs: ping, runtime detection,
+    inspect, create, start, and image pull.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    @classmethod
+    def discover(cls) -> "ContainerClient | None":
+        """Create a client for the local socket, or None if there is none."""
+        path = find_socket()
+        return cls(path) if path else None
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: dict | None = None,
+        timeout: float | None = None,
+    ) -> tuple[int, bytes]:
+        conn = _UnixHTTPConnection(
+            self.socket_path, timeout if timeout is not None else self.timeout
+        )
+        try:
+            headers = {}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body).encode("utf-8")
+                headers["Content-Type"] = "application/json"
+            conn.request(method, f"/{API_VERSION}{path}", body=payload, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    def ping(self) -> bool:
+        """Check that the daemon answers."""
+        try:
+            status, _ = self._request("GET", "/_ping")
+            return status == 200
+        except CLIENT_ERRORS:
+            return False
+
+    def runtime(self) -> str:
+        """Return 'podman' or 'docker' based on the daemon's version info."""
+        try:
+            status, data = self._request("GET", "/version")
+            if status != 200:
+                return "docker"
+            info = json.loads(data)
+        except CLIENT_ERRORS:
+            return "docker"
+        names = [c.get("Name", "") for c in info.get("Components") or []]
+        names.append(info.get("Platform", {}).get("Name", ""))
+        if any("podman" in name.lower() for name in names):
+            return "podman"
+        return "docker"
+
+    def container_status(self, name: str) -> str | None:
+        """Return the container's status (e.g. 'running'), or None if missing."""
+        status, data = self._request("GET", f"/containers/{quote(name)}/json")
+        if status == 404:
+            return None
+        if status != 200:
+            raise OSError(f"Inspect {name} failed with HTTP {status}")
+        return json.loads(data).get("State", {}).get("Status")
+
+    def start_container(self, name: str) -> bool:
+        """Start a container; True if it is now running."""
+        status, _ = self._request("POST", f"/containers/{quote(name)}/start")
+        return status in (204, 304)
+
+    def pull_image(self, image: str) -> bool:
+        """Pull an image, waiting for the download to finish."""
+        repo, _, tag = image.partition(":")
+        query = urlencode({"fromImage": repo, "tag": tag or "latest"})
+        status, _ = self._request("POST", f"/images/create?{query}", timeout=600)
+        return status == 200
+
+    def create_container(
+        self,
+        name: str,
+        image: str,
+        ports: dict[str, tuple[str, str]],
+        restart_policy: str = "unless-stopped",
+    ) -> bool:
+        """
+        Create a container, pulling its image if needed.
+
+        Args:
+            name: Container name
+            image: Image reference (e.g. "repo/image:tag")
+            ports: Map of container port ("50021/tcp") to (host IP, host port)
+            restart_policy: Docker restart policy name
+
+        Returns:
+            True if the container was created
+        """
+        body = {
+            "Image": image,
+            "ExposedPorts": {port: {} for port in ports},
+            "HostConfig": {
+                "PortBindings": {
+                    port: [{"HostIp": ip, "HostPort": host_port}]
+                    for port, (ip, host_port) in ports.items()
+                },
+                "RestartPolicy": {"Name": restart_policy},
+            },
+        }
+        path = f"/containers/create?{urlencode({'name': name})}"
+        status, _ = self._request("POST", path, body)
+        if status == 404 and self.pull_image(image):
+            status, _ = self._request("POST", path, body)
+        return status == 201
+
+    def ensure_running(
+        self, name: str, image: str, ports: dict[str, tuple[str, str]]
+    ) -> bool:
+        """Start the named container, creating it first if it does not exist."""
+        try:
+            current = self.container_status(name)
+            if current == "running":
+                return True
+            if current is None and not self.create_container(name, image, ports):
+                return False
+            return self.start_container(name)
+        except CLIENT_ERRORS:
+            return False
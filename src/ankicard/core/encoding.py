@@ -0,0 +1,63 @@
+"""Named ffmpeg encoding presets for card audio."""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class EncodingPreset:
+    """An output container plus the ffmpeg arguments that produce it."""
+
+    name: str
+    extension: str
+    ffmpeg_args: tuple[str, ...] = ()
+    description: str = ""
+
+
+DEFAULT_PRESET = "mp3"
+
+ENCODING_PRESETS = {
+    preset.name: preset
+    for preset in [
+        EncodingPreset("mp3", "mp3", (), "MP3 at ffmpeg's default settings"),
+        EncodingPreset(
+            "speech-64k-mono",
+            "mp3",
+            ("-ac", "1", "-ar", "24000", "-c:a", "libmp3lame", "-b:a", "64k"),
+            "64 kbps mono MP3",
+        ),
+        EncodingPreset(
+            "speech-32k-mono",
+            "mp3",
+            ("-ac", "1", "-ar", "24000", "-c:a", "libmp3lame", "-b:a", "32k"),
+            "32 kbps mono MP3",
+        ),
+        EncodingPreset(
+            "opus-24k",
+            "ogg",
+            ("-ac", "1", "-c:a", "libopus", "-b:a", "24k", "-application", "voip"),
+            "24 kbps mono Opus in Ogg (Anki 2.1.50+ and AnkiMobile/AnkiDroid)",
+        ),
+    ]
+}
+
+
+def get_preset(name: str | None = None) -> EncodingPreset:
+    """
+    Look up an encoding preset by name.
+
+    Args:
+        name: Preset name, or None for the default
+
+    Returns:
+        The matching EncodingPreset
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    name = name or DEFAULT_PRESET
+    if name not in ENCODING_PRESETS:
+        raise ValueError(
+            f"Unknown audio preset {name!r}; choose from: "
+            + ", ".join(ENCODING_PRESETS)
+        )
+    return ENCODING_PRESETS[name]
@@ -0,0 +1,325 @@
+"""Compact spectral fingerprints for spotting re-encoded duplicate audio."""
+
+import base64
+import hashlib
+import threading
+
+import numpy as np
+
+from ..config import cache
+from .audio_processing import trim_silence
+
+
+# Long, heavily overlapping frames (256 ms every 16 ms at 16 kHz) keep the
+# bits stable under noise and codec changes
+FRAME_LENGTH = 4096
+HOP_LENGTH = 256
+
+# Frames windowed and transformed at once; bounds the spectrum's working
+# memory to a few MB however long the audio is
+BLOCK_FRAMES = 256
+
+# 33 log-spaced bands between these frequencies give 32 bits per frame
+BAND_COUNT = 33
+MIN_FREQ = 300.0
+MAX_FREQ = 2000.0
+
+# Clips quieter than this (dBFS RMS after trimming), or whose band energies
+# barely change from frame to frame (median step in log10 units), carry too
+# little to identify them: silence and steady tones give near-constant words
+# that would match each other
+MIN_LEVEL_DB = -50.0
+MIN_FLUX = 0.02
+
+# Similarity (1 - bit error rate) at or above which two clips count as the same
+MATCH_THRESHOLD = 0.85
+
+# Alignment search, in frames (16 ms each at 16 kHz), to absorb trimming
+MAX_SHIFT = 32
+
+# Clips whose lengths differ by more than this ratio are never compared
+MAX_LENGTH_RATIO = 1.25
+
+# A stored clip is only compared in full when at least this many frames of
+# the query have its word, or one a bit flip away, within MAX_SHIFT frames
+MIN_VOTES = 3
+
+# Frames of each clip entered in the inverted index (about 16 s); aligned
+# copies share words within the first frames as much as anywhere else
+MAX_INDEXED_FRAMES = 1024
+
+# Postings added since the last merge are kept in a small side segment
+# until they reach this share of the main one
+MERGE_FRACTION = 0.25
+
+# XOR masks for a word and its 32 one-bit neighbours
+_PROBES = np.concatenate(
+    [[0], np.left_shift(np.uint32(1), np.arange(32, dtype=np.uint32))]
+).astype(np.uint32)
+
+
+def compute_fingerprint(samples: np.ndarray, rate: int) -> np.ndarray:
+    """
+    Fingerprint mono audio as one 32-bit word per 16 ms frame.
+
+    Leading and trailing silence is trimmed first. Each bit is the sign of
+    the energy difference between neighbouring bands, differenced against
+    the previous frame, so it survives re-encoding, resampling and level
+    changes.
+
+    Args:
+        samples: Mono samples in [-1, 1]
+        rate: Sample rate
+
+    Returns:
+        uint32 array with one word per frame (empty for very short,
+        near-silent or near-constant audio)
+    """
+    samples = trim_silence(samples, rate)
+    if len(samples) < FRAME_LENGTH + HOP_LENGTH:
+        return np.zeros(0, dtype=np.uint32)
+    rms = np.sqrt(np.mean(np.square(samples, dtype=np.float64)))
+    if rms < 10 ** (MIN_LEVEL_DB / 20):
+        return np.zeros(0, dtype=np.uint32)
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_LENGTH)[
+        ::HOP_LENGTH
+    ]
+    window = np.hanning(FRAME_LENGTH)
+    freqs = np.fft.rfftfreq(FRAME_LENGTH, 1 / rate)
+    edges = np.geomspace(MIN_FREQ, MAX_FREQ, BAND_COUNT + 1)
+    bands = ((freqs[:, None] >= edges[:-1]) & (freqs[:, None] < edges[1:])).astype(
+        np.float64
+    )
+    energy = np.concatenate(
+        [
+            np.abs(np.fft.rfft(frames[start : start + BLOCK_FRAMES] * window)) ** 2
+            @ bands
+            for start in range(0, len(frames), BLOCK_FRAMES)
+        ]
+    )
+    flux = np.median(np.abs(np.diff(np.log10(energy + 1e-12), axis=0)))
+    if flux < MIN_FLUX:
+        return np.zeros(0, dtype=np.uint32)
+
+    diff = energy[:, :-1] - energy[:, 1:]
+    bits = (diff[1:] - diff[:-1]) > 0
+    weights = np.left_shift(np.uint32(1), np.arange(32, dtype=np.uint32))
+    return (bits.astype(np.uint32) * weights).sum(axis=1, dtype=np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray, max_shift: int = MAX_SHIFT) -> float:
+    """
+    Compare two fingerprints at their best alignment.
+
+    Args:
+        a: Fingerprint from ``compute_fingerprint``
+        b: Fingerprint from ``compute_fingerprint``
+        max_shift: Largest offset tried, in frames
+
+    Returns:
+        1 minus the lowest bit error rate over offsets where the clips
+        overlap by at least 80% of the longer one (0.0 if none do)
+    """
+    longest = max(len(a), len(b))
+    if not len(a) or not len(b) or longest > MAX_LENGTH_RATIO * min(len(a), len(b)):
+        return 0.0
+    # Row k pairs a[i] with b[i - shift_k]; all offsets are scored at once
+    shifts = np.arange(-max_shift, max_shift + 1)
+    index = np.arange(len(a))[None, :] - shifts[:, None]
+    valid = (index >= 0) & (index < len(b))
+    overlap = valid.sum(axis=1)
+    aligned = b[np.clip(index, 0, len(b) - 1)]
+    errors = np.where(valid, np.bitwise_count(a[None, :] ^ aligned), 0).sum(axis=1)
+    usable = overlap >= 0.8 * longest
+    if not usable.any():
+        return 0.0
+    return float(1.0 - (errors[usable] / (32 * overlap[usable])).min())
+
+
+def encode_fingerprint(fingerprint: np.ndarray) -> str:
+    """Serialize a fingerprint for the JSON index."""
+    return base64.b64encode(fingerprint.astype("<u4").tobytes()).decode("ascii")
+
+
+def decode_fingerprint(data: str) -> np.ndarray:
+    """Inverse of ``encode_fingerprint``."""
+    return np.frombuffer(base64.b64decode(data), dtype="<u4").astype(np.uint32)
+
+
+def _segment(words: np.ndarray, owners: np.ndarray, frames: np.ndarray) -> tuple:
+    order = np.argsort(words, kind="stable")
+    return words[order], owners[order], frames[order]
+
+
+def _merge(segments: list[tuple]) -> tuple:
+    if not segments:
+        return _segment(
+            np.zeros(0, np.uint32), np.zeros(0, np.int32), np.zeros(0, np.int32)
+        )
+    return _segment(*(np.concatenate(column) for column in zip(*segments)))
+
+
+class _Postings:
+    """
+    Inverted index from fingerprint words to (clip, frame) postings.
+
+    Postings live in parallel NumPy arrays sorted by word, about 12 bytes
+    each. New clips go to a side segment that is sorted on demand and
+    merged into the main one once it grows past ``MERGE_FRACTION`` of it.
+    """
+
+    def __init__(self):
+        self._main = _merge([])
+        self._pending: list[tuple] = []
+        self._pending_size = 0
+        self._side = None
+
+    def add(self, owner: int, fingerprint: np.ndarray) -> None:
+        words = fingerprint[:MAX_INDEXED_FRAMES].astype(np.uint32)
+        self._pending.append(
+            (
+                words,
+                np.full(len(words), owner, dtype=np.int32),
+                np.arange(len(words), dtype=np.int32),
+            )
+        )
+        self._pending_size += len(words)
+        self._side = None
+        if self._pending_size > MERGE_FRACTION * len(self._main[0]):
+            self._main = _merge([self._main, *self._pending])
+            self._pending.clear()
+            self._pending_size = 0
+
+    def lookup(
+        self, words: np.ndarray, frames: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find postings of ``words`` within ``MAX_SHIFT`` of ``frames``.
+
+        Returns:
+            The owning clips and the query frames they were found for
+        """
+        if self._side is None:
+            self._side = _merge(self._pending)
+        owners, found = [], []
+        for stored_words, stored_owners, stored_frames in (self._main, self._side):
+            start = np.searchsorted(stored_words, words, side="left")
+            counts = np.searchsorted(stored_words, words, side="right") - start
+            # Expand each [start, start + count) range into posting indices
+            offsets = np.cumsum(counts) - counts
+            hits = np.repeat(start - offsets, counts) + np.arange(counts.sum())
+            query = np.repeat(frames, counts)
+            near = np.abs(stored_frames[hits] - query) <= MAX_SHIFT
+            owners.append(stored_owners[hits[near]])
+            found.append(query[near])
+        return np.concatenate(owners), np.concatenate(found)
+
+
+class FingerprintIndex:
+    """
+    Near-duplicate lookup over the fingerprints of audio seen before.
+
+    Entries carry whatever was derived from the audio (transcripts, the
+    card made from it) so a re-encoded copy can reuse them. The index is
+    kept in memory, with an inverted index from fingerprint words to the
+    clips and frames they occur in, and persisted through ``config.cache``.
+    """
+
+    def __init__(self, threshold: float = MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._entries = {}
+        # Entry ids by their position in the postings
+        self._ids: list[str] = []
+        self._postings = _Postings()
+        for entry in cache.load_fingerprint_entries():
+            self._store(decode_fingerprint(entry["fingerprint"]), entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, fingerprint: np.ndarray, entry: dict) -> None:
+        if entry["id"] not in self._entries:
+            self._postings.add(len(self._ids), fingerprint)
+            self._ids.append(entry["id"])
+        self._entries[entry["id"]] = (fingerprint, entry)
+
+    def candidates(self, fingerprint: np.ndarray) -> list[str]:
+        """
+        IDs of stored clips that could be near-duplicates of ``fingerprint``.
+
+        Even at the threshold's bit error rate, a few percent of a
+        duplicate's words come through intact or one bit off, at frames
+        within ``MAX_SHIFT`` of the original, while unrelated clips rarely
+        share words at such positions. Looking words up in the inverted
+        index keeps a match to a handful of full comparisons instead of one
+        per stored clip. Only the first ``MAX_INDEXED_FRAMES`` frames of
+        each clip are indexed.
+        """
+        query = fingerprint[: MAX_INDEXED_FRAMES + MAX_SHIFT]
+        if not len(query):
+            return []
+        words = (query[:, np.newaxis] ^ _PROBES).ravel()
+        frames = np.repeat(np.arange(len(query), dtype=np.int32), len(_PROBES))
+        with self._lock:
+            owners, found = self._postings.lookup(words, frames)
+            # A clip gets one vote per query frame, however many words hit
+            pairs = np.unique(owners.astype(np.int64) * len(query) + found)
+            votes = np.bincount(pairs // len(query))
+            return [self._ids[owner] for owner in np.flatnonzero(votes >= MIN_VOTES)]
+
+    def match(self, fingerprint: np.ndarray) -> dict | None:
+        """Return the most similar entry at or above the threshold, or None."""
+        best, best_score = None, self.threshold
+        ids = self.candidates(fingerprint)
+        with self._lock:
+            candidates = [self._entries[entry_id] for entry_id in ids]
+        for stored, entry in candidates:
+            score = similarity(fingerprint, stored)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def add(self, fingerprint: np.ndarray, **fields) -> dict:
+        """
+        Record fields for this audio, merging into its near-duplicate if any.
+
+        Dict-valued fields (e.g. ``transcripts``) are merged key by key;
+        other fields replace the stored value.
+
+        Returns:
+            The stored entry
+        """
+        existing = self.match(fingerprint)
+        with self._lock:
+            if existing is None:
+                entry = {
+                    "id": hashlib.sha256(fingerprint.tobytes()).hexdigest()[:16],
+                    "fingerprint": encode_fingerprint(fingerprint),
+                }
+                stored = fingerprint
+            else:
+                entry = dict(existing)
+                stored = self._entries[entry["id"]][0]
+            for name, value in fields.items():
+                if isinstance(value, dict):
+                    entry[name] = {**entry.get(name, {}), **value}
+                else:
+                    entry[name] = value
+            self._store(stored, entry)
+        cache.append_fingerprint_entry(entry)
+        return entry
+
+
+_indexes: dict[str, FingerprintIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_fingerprint_index() -> FingerprintIndex:
+    """Shared index for the current fingerprint file, loaded on first use."""
+    with _indexes_lock:
+        key = str(cache.FINGERPRINT_FILE)
+        if key not in _indexes:
+            _indexes[key] = FingerprintIndex()
+        return _indexes[key]
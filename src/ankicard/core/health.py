@@ -0,0 +1,144 @@
+"""Circuit breaker and cached health state for local services."""
+
+import threading
+import time
+from collections.abc import Callable
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing service until it has had time to recover.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    ``allow()`` returns False. Once ``reset_timeout`` seconds have passed a
+    single trial call is allowed (half-open); its success closes the circuit
+    and its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open", or "half_open"."""
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Check whether a call may go through right now."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """
+        Give up a half-open trial without recording an outcome.
+
+        For calls that failed outside the guarded service (a missing encoder,
+        a bad output file), so the next caller can run the trial instead.
+        Does nothing once the trial has already been recorded.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+
+class HealthMonitor:
+    """
+    Cache the result of a health probe and guard calls with a circuit breaker.
+
+    ``is_available()`` only probes when the cached state is older than
+    ``ttl`` seconds, and never while the circuit is open.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        ttl: float = 30.0,
+        breaker: CircuitBreaker | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._probe = probe
+        self.ttl = ttl
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self._clock = clock
+        self._available: bool | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """Return the cached engine state, probing if it is stale."""
+        with self._lock:
+            fresh = self._clock() - self._checked_at < self.ttl
+            if self._available is not None and fresh and self.breaker.state == CLOSED:
+                return self._available
+        if not self.breaker.allow():
+            return False
+        try:
+            available = self._probe()
+        except BaseException:
+            self.breaker.release()
+            raise
+        if available:
+            self.record_success()
+        else:
+            self.breaker.record_failure()
+            with self._lock:
+                self._available = False
+                self._checked_at = self._clock()
+        return available
+
+    def record_success(self) -> None:
+        """Mark the service healthy after a successful call or probe."""
+        self.breaker.record_success()
+        with self._lock:
+            self._available = True
+            self._checked_at = self._clock()
+
+    def record_failure(self) -> None:
+        """Mark a failed call or probe."""
+        self.breaker.record_failure()
+        with self._lock:
+            self._available = self.breaker.state == CLOSED
+            self._checked_at = self._clock()
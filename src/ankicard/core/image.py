@@ -1,43 +1,287 @@
 from google import genai
 from google.genai import types
-import os
+import io
+
+import numpy as np
+from PIL import Image
+
+from ..config.cache import artifact_key
+from .concurrency import coalesce_file, get_limiter
+from .image_processing import ImagePreset, get_image_preset, save_image
+
+
+IMAGE_MODEL = "gemini-2.5-flash-image"
+
+# Panels per side of a grid request (2x2 tiles are ~512 px, 3x3 ~340 px)
+GRID_SIZES = (2, 3)
+
+STYLE_GUIDANCE = (
+    "Choose an art style that fits the mood and subject of the "
+    "sentence — for example, anime for everyday life, watercolor "
+    "for nature, pixel art for games, noir for mystery, etc. "
+    "Use your judgment."
+)
 
 
 def generate_image(
-    prompt: str, output_path: str, api_key: str | None = None
+    prompt: str,
+    output_path: str,
+    api_key: str | None = None,
+    preset: ImagePreset | None = None,
 ) -> str | None:
-    """Generates an image using Google Gemini."""
+    """
+    Generates an image using Google Gemini.
+
+    The response is written as-is when it already fits ``preset``;
+    otherwise it is resized and re-encoded (see ``transcode_image``).
+    """
     if not api_key:
         return None
 
-    client = genai.Client(api_key=api_key)
+    preset = preset or get_image_preset()
+    return coalesce_file(
+        artifact_key("image", "gemini", prompt, preset.name),
+        output_path,
+        lambda path: _generate_gemini_image(prompt, path, api_key, preset),
+    )
+
 
+def _generate_gemini_image(
+    prompt: str, output_path: str, api_key: str, preset: ImagePreset
+) -> str | None:
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-image",
-            contents=(
-                f"Create an illustration for a language learning flashcard that "
-                f"visually represents: {prompt}\n\n"
-                f"Choose an art style that fits the mood and subject of the "
-                f"sentence — for example, anime for everyday life, watercolor "
-                f"for nature, pixel art for games, noir for mystery, etc. "
-                f"Use your judgment.\n\n"
-                f"Small amounts of text are fine if natural to the scene "
-                f"(signs, labels, speech bubbles), but do not write out the "
-                f"full sentence or caption."
-            ),
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE"],
-            ),
+        data = _request_image(
+            f"Create an illustration for a language learning flashcard that "
+            f"visually represents: {prompt}\n\n"
+            f"{STYLE_GUIDANCE}\n\n"
+            f"Small amounts of text are fine if natural to the scene "
+            f"(signs, labels, speech bubbles), but do not write out the "
+            f"full sentence or caption.",
+            api_key,
         )
-        if response.parts:
-            for part in response.parts:
-                if part.inline_data is not None:
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    part.as_image().save(output_path)
-                    return output_path
+        if data is not None:
+            return save_image(data, output_path, preset)
         print("Image generation failed: no image in response")
         return None
     except Exception as e:
         print(f"Image generation failed: {e}")
         return None
+
+
+def _request_image(
+    contents: str, api_key: str, image_config: types.ImageConfig | None = None
+) -> bytes | None:
+    """Ask Gemini for an image; the encoded bytes, or None if none came back."""
+    client = genai.Client(api_key=api_key)
+    with get_limiter("gemini").slot():
+        response = client.models.generate_content(
+            model=IMAGE_MODEL,
+            contents=contents,
+            config=types.GenerateContentConfig(
+                response_modalities=["IMAGE"],
+                image_config=image_config,
+            ),
+        )
+    for part in response.parts or []:
+        if part.inline_data is not None:
+            return part.inline_data.data
+    return None
+
+
+def grid_size(count: int) -> int:
+    """Smallest grid (panels per side) that holds ``count`` illustrations."""
+    for size in GRID_SIZES:
+        if size * size >= count:
+            return size
+    raise ValueError(f"At most {GRID_SIZES[-1] ** 2} illustrations fit in one grid")
+
+
+def validate_grid(
+    pixels: np.ndarray,
+    size: int,
+    min_tile: int = 128,
+    aspect_tolerance: float = 0.1,
+    seam_ratio: float = 2.0,
+    min_seam: float = 12.0,
+) -> bool:
+    """
+    Check that an image is a ``size`` x ``size`` grid of separate panels.
+
+    The image must be about square, with tiles at least ``min_tile`` pixels,
+    and there must be a full-length edge at every expected panel boundary:
+    near each one, the mean brightness difference between neighbouring
+    pixel columns (or rows) must be ``seam_ratio`` times the image's median
+    and at least ``min_seam`` (on a 0-255 scale). A single picture, or a
+    grid of another size, has no edge where the boundaries should be.
+
+    Args:
+        pixels: Image as an (height, width[, channels]) array
+        size: Panels per side
+        min_tile: Smallest acceptable tile side in pixels
+        aspect_tolerance: Allowed deviation of width / height from 1
+        seam_ratio: Boundary edge strength relative to the median
+        min_seam: Minimum boundary edge strength
+
+    Returns:
+        True if the layout is usable
+    """
+    height, width = pixels.shape[:2]
+    if min(height, width) < size * min_tile:
+        return False
+    if abs(width / height - 1) > aspect_tolerance:
+        return False
+
+    gray = pixels.astype(np.float32)
+    if gray.ndim == 3:
+        gray = gray[..., :3].mean(axis=2)
+
+    for axis, length in ((1, width), (0, height)):
+        # Mean difference between each pair of adjacent columns (or rows)
+        steps = np.abs(np.diff(gray, axis=axis)).mean(axis=1 - axis)
+        threshold = max(seam_ratio * float(np.median(steps)), min_seam)
+        window = max(2, length // 50)  # Panels rarely split exactly evenly
+        for k in range(1, size):
+            boundary = round(k * length / size)
+            if steps[boundary - window : boundary + window].max() < threshold:
+                return False
+    return True
+
+
+def slice_grid(pixels: np.ndarray, size: int, inset: float = 0.03) -> list[np.ndarray]:
+    """
+    Cut a grid image into its panels, in reading order.
+
+    Each tile loses ``inset`` of its side at every edge, which drops the
+    gutters and borders models draw between panels.
+
+    Args:
+        pixels: Image as an (height, width[, channels]) array
+        size: Panels per side
+        inset: Fraction trimmed from each tile edge
+
+    Returns:
+        ``size * size`` tiles (views into ``pixels``)
+    """
+    height, width = pixels.shape[:2]
+    rows = [round(k * height / size) for k in range(size + 1)]
+    cols = [round(k * width / size) for k in range(size + 1)]
+    tiles = []
+    for top, bottom in zip(rows, rows[1:]):
+        dy = int((bottom - top) * inset)
+        for left, right in zip(cols, cols[1:]):
+            dx = int((right - left) * inset)
+            tiles.append(pixels[top + dy : bottom - dy, left + dx : right - dx])
+    return tiles
+
+
+def _grid_contents(prompts: list[str], size: int) -> str:
+    panels = "\n".join(
+        f"{n}. {prompt}" for n, prompt in enumerate(prompts, start=1)
+    ) + "".join(
+        f"\n{n}. (leave this panel plain white)"
+        for n in range(len(prompts) + 1, size * size + 1)
+    )
+    return (
+        f"Create a {size}x{size} grid of {size * size} equal square panels for "
+        f"language learning flashcards, separated by thin white lines. Panels "
+        f"are numbered left to right, top to bottom, and each one is a "
+        f"separate illustration that visually represents its sentence:\n\n"
+        f"{panels}\n\n"
+        f"{STYLE_GUIDANCE} Panels may use different styles.\n\n"
+        f"Small amounts of text are fine if natural to a scene (signs, "
+        f"labels, speech bubbles), but do not write out the sentences, "
+        f"captions, or panel numbers."
+    )
+
+
+def generate_image_grid(
+    prompts: list[str],
+    output_paths: list[str],
+    api_key: str,
+    preset: ImagePreset | None = None,
+) -> list[str]:
+    """
+    Illustrate several sentences with one Gemini call.
+
+    Asks for a 2x2 or 3x3 grid (the smallest that fits), checks the layout
+    with ``validate_grid``, and saves each panel as its own image.
+
+    Args:
+        prompts: Up to nine sentences to illustrate
+        output_paths: Image destination for each prompt
+        api_key: Google GenAI API key
+        preset: Image format and size (default preset if None)
+
+    Returns:
+        ``output_paths``
+
+    Raises:
+        ValueError: If no image came back or it is not a usable grid
+        Exception: If the API call fails
+    """
+    preset = preset or get_image_preset()
+    size = grid_size(len(prompts))
+    data = _request_image(
+        _grid_contents(prompts, size),
+        api_key,
+        types.ImageConfig(aspect_ratio="1:1"),
+    )
+    if data is None:
+        raise ValueError("no image in response")
+    with Image.open(io.BytesIO(data)) as img:
+        pixels = np.asarray(img.convert("RGB"))
+    if not validate_grid(pixels, size):
+        raise ValueError(f"response is not a {size}x{size} grid")
+
+    for tile, output_path in zip(slice_grid(pixels, size), output_paths):
+        buffer = io.BytesIO()
+        Image.fromarray(tile).save(buffer, "PNG", compress_level=1)
+        save_image(buffer.getvalue(), output_path, preset)
+    return output_paths
+
+
+def generate_images(
+    prompts: list[str],
+    output_paths: list[str],
+    api_key: str | None = None,
+    preset: ImagePreset | None = None,
+    grid: int = 2,
+) -> list[str | None]:
+    """
+    Illustrate many sentences, ``grid`` x ``grid`` per Gemini call.
+
+    Trades some image quality (smaller tiles, one shared request) for up to
+    ``grid ** 2`` times fewer calls. A group whose grid call fails or comes
+    back malformed falls back to one ``generate_image`` call per sentence.
+
+    Args:
+        prompts: Sentences to illustrate
+        output_paths: Image destination for each prompt
+        api_key: Google GenAI API key
+        preset: Image format and size (default preset if None)
+        grid: Panels per side, 2 or 3
+
+    Returns:
+        Path of each image, or None where generation failed
+    """
+    if not api_key:
+        return [None] * len(prompts)
+    if grid not in GRID_SIZES:
+        raise ValueError(f"Grid size must be one of {GRID_SIZES}")
+
+    per_call = grid * grid
+    results = []
+    for first in range(0, len(prompts), per_call):
+        group = prompts[first : first + per_call]
+        paths = output_paths[first : first + per_call]
+        if len(group) > 1:
+            try:
+                results += generate_image_grid(group, paths, api_key, preset)
+                continue
+            except Exception as e:
+                print(f"Image grid failed, generating one by one: {e}")
+        results += [
+            generate_image(prompt, path, api_key, preset)
+            for prompt, path in zip(group, paths)
+        ]
+    return results
@@ -0,0 +1,187 @@
+"""Resize and re-encode card images with Pillow, in a process pool for batches."""
+
+import io
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from ..media.placement import place_file, write_file
+
+
+@dataclass(frozen=True)
+class ImagePreset:
+    """An image format, size limit, and encoder quality for card images."""
+
+    name: str
+    extension: str
+    format: str
+    max_size: int
+    quality: int
+    description: str = ""
+
+
+DEFAULT_IMAGE_PRESET = "jpeg"
+
+IMAGE_PRESETS = {
+    preset.name: preset
+    for preset in [
+        ImagePreset("jpeg", "jpg", "JPEG", 800, 80, "JPEG, at most 800 px"),
+        ImagePreset("jpeg-small", "jpg", "JPEG", 480, 75, "JPEG, at most 480 px"),
+        ImagePreset("webp", "webp", "WEBP", 800, 75, "WebP, at most 800 px"),
+        ImagePreset("webp-small", "webp", "WEBP", 480, 70, "WebP, at most 480 px"),
+    ]
+}
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_image_preset(name: str | None = None) -> ImagePreset:
+    """
+    Look up an image preset by name.
+
+    Args:
+        name: Preset name, or None for the default
+
+    Returns:
+        The matching ImagePreset
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    name = name or DEFAULT_IMAGE_PRESET
+    if name not in IMAGE_PRESETS:
+        raise ValueError(
+            f"Unknown image preset {name!r}; choose from: " + ", ".join(IMAGE_PRESETS)
+        )
+    return IMAGE_PRESETS[name]
+
+
+def meets_preset(data: bytes, preset: ImagePreset) -> bool:
+    """Check whether encoded image bytes are already in the preset's format and size."""
+    with Image.open(io.BytesIO(data)) as img:
+        return img.format == preset.format and max(img.size) <= preset.max_size
+
+
+def transcode_image(data: bytes, preset: ImagePreset) -> bytes:
+    """
+    Fit an encoded image to a preset.
+
+    Images already in the preset's format and within its size are returned
+    as-is, so nothing is decoded or re-encoded. Others are rotated upright
+    from their EXIF orientation, shrunk so the longest side is at most
+    ``preset.max_size`` (never enlarged), and encoded at ``preset.quality``.
+    Transparency is kept in WebP and flattened onto white for JPEG.
+
+    Args:
+        data: Encoded image (any format Pillow reads)
+        preset: Target format, size, and quality
+
+    Returns:
+        The encoded image bytes
+    """
+    if meets_preset(data, preset):
+        return data
+
+    with Image.open(io.BytesIO(data)) as img:
+        # JPEG sources can decode straight at a reduced scale
+        img.draft("RGB", (preset.max_size, preset.max_size))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(
+            (preset.max_size, preset.max_size),
+            Image.Resampling.LANCZOS,
+            reducing_gap=3.0,
+        )
+        has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+        if has_alpha and preset.format == "WEBP":
+            img = img.convert("RGBA")
+        elif has_alpha:
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            img = img.convert("RGB")
+
+        options = {"quality": preset.quality}
+        if preset.format == "JPEG":
+            options |= {"optimize": True, "progressive": True}
+        else:
+            options |= {"method": 4}
+        buffer = io.BytesIO()
+        img.save(buffer, preset.format, **options)
+    return buffer.getvalue()
+
+
+@contextmanager
+def image_pool(workers: int | None = None):
+    """
+    Run image transcodes started inside the block in a process pool.
+
+    Decoding, resizing, and encoding are CPU-bound, so batch threads hand
+    them to worker processes instead of contending for the GIL. Workers are
+    started on the first transcode, so batches that only pass images
+    through never pay for them.
+
+    Args:
+        workers: Worker processes (default: CPU count)
+    """
+    global _pool
+    pool = ProcessPoolExecutor(max_workers=workers)
+    _pool = pool
+    try:
+        yield pool
+    finally:
+        _pool = None
+        pool.shutdown()
+
+
+def _transcode(data: bytes, preset: ImagePreset) -> bytes:
+    pool = _pool
+    if pool is None:
+        return transcode_image(data, preset)
+    return pool.submit(transcode_image, data, preset).result()
+
+
+def save_image(data: bytes, output_path: str, preset: ImagePreset) -> str:
+    """
+    Write encoded image bytes fitted to a preset.
+
+    Args:
+        data: Encoded image, e.g. a provider's response
+        output_path: Destination file
+        preset: Target format, size, and quality
+
+    Returns:
+        Path to the image
+    """
+    return write_file(output_path, _transcode(data, preset))
+
+
+def convert_image_file(source_path: str, output_path: str, preset: ImagePreset) -> str:
+    """
+    Place an image file at ``output_path`` fitted to a preset.
+
+    A source that already fits is cloned or copied without decoding;
+    otherwise it is transcoded. The source is left in place.
+
+    Args:
+        source_path: Existing image file
+        output_path: Destination file
+        preset: Target format, size, and quality
+
+    Returns:
+        Path to the image
+
+    Raises:
+        Exception: If the source is not a readable image
+    """
+    try:
+        data = Path(source_path).read_bytes()
+        if meets_preset(data, preset):
+            place_file(source_path, output_path)
+            return output_path
+        return save_image(data, output_path, preset)
+    except Exception as e:
+        raise Exception(f"Image conversion failed: {e}") from e
@@ -0,0 +1,154 @@
+"""Parse SRT, WebVTT, and ASS/SSA subtitle files into timed cues."""
+
+import re
+from pathlib import Path
+
+from .transcription import Segment
+
+
+# 00:01:02,345 (SRT) or 00:01:02.345 / 01:02.345 (WebVTT)
+_SRT_TIME = r"(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})"
+_SRT_TIMING = re.compile(rf"{_SRT_TIME}\s*-->\s*{_SRT_TIME}")
+
+# 0:01:02.34 (ASS centiseconds)
+_ASS_TIME = re.compile(r"(\d+):(\d{2}):(\d{2})[.:](\d{1,3})")
+
+_HTML_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+_ASS_OVERRIDE = re.compile(r"\{[^}]*\}")
+# ASS drawing mode ({\p1}) renders vector shapes, not dialogue
+_ASS_DRAWING = re.compile(r"\{[^}]*\\p[1-9]")
+
+
+def _seconds(hours, minutes, seconds, fraction) -> float:
+    return (
+        int(hours or 0) * 3600
+        + int(minutes) * 60
+        + int(seconds)
+        + int(fraction) / 10 ** len(fraction)
+    )
+
+
+def _join_lines(lines: list[str]) -> str:
+    """Join wrapped subtitle lines, without spaces between Japanese lines."""
+    text = ""
+    for line in (line.strip() for line in lines):
+        if not line:
+            continue
+        if text and (text[-1].isascii() or line[0].isascii()):
+            text += " "
+        text += line
+    return text
+
+
+def parse_srt(content: str) -> list[Segment]:
+    """
+    Parse SubRip (SRT) or WebVTT subtitles.
+
+    Cue numbers, WebVTT headers and cue settings are ignored; formatting
+    tags such as ``<i>`` are stripped and wrapped lines joined.
+
+    Args:
+        content: Subtitle file contents
+
+    Returns:
+        Cues with text, in file order
+    """
+    cues = []
+    for block in re.split(r"\n\s*\n", content.replace("\r\n", "\n")):
+        lines = block.strip("\n").split("\n")
+        for i, line in enumerate(lines):
+            timing = _SRT_TIMING.search(line)
+            if timing:
+                text = _join_lines([_HTML_TAG.sub("", t) for t in lines[i + 1 :]])
+                if text:
+                    g = timing.groups()
+                    cues.append(Segment(_seconds(*g[:4]), _seconds(*g[4:]), text))
+                break
+    return cues
+
+
+def parse_ass(content: str) -> list[Segment]:
+    """
+    Parse Advanced SubStation Alpha (ASS/SSA) subtitles.
+
+    Reads ``Dialogue`` lines from the ``[Events]`` section using its
+    ``Format`` line. Override tags are stripped, ``\\N`` line breaks
+    joined, and vector drawings skipped.
+
+    Args:
+        content: Subtitle file contents
+
+    Returns:
+        Cues with text, in file order
+    """
+    cues = []
+    fields = None
+    in_events = False
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith("["):
+            in_events = line.lower() == "[events]"
+            continue
+        if not in_events or ":" not in line:
+            continue
+        kind, _, value = line.partition(":")
+        if kind == "Format":
+            fields = [name.strip().lower() for name in value.split(",")]
+        elif kind == "Dialogue" and fields:
+            values = dict(zip(fields, value.strip().split(",", len(fields) - 1)))
+            raw = values.get("text", "")
+            start = _ASS_TIME.match(values.get("start", "").strip())
+            end = _ASS_TIME.match(values.get("end", "").strip())
+            if not (start and end) or _ASS_DRAWING.search(raw):
+                continue
+            raw = _ASS_OVERRIDE.sub("", raw).replace("\\h", " ")
+            text = _join_lines(raw.replace("\\n", "\\N").split("\\N"))
+            if text:
+                cues.append(
+                    Segment(_seconds(*start.groups()), _seconds(*end.groups()), text)
+                )
+    return cues
+
+
+def read_subtitle_text(path: str) -> str:
+    """
+    Read a subtitle file, detecting UTF-8, UTF-16, or Shift JIS encoding.
+
+    Args:
+        path: Path to the subtitle file
+
+    Returns:
+        The decoded contents
+    """
+    data = Path(path).read_bytes()
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return data.decode("utf-16")
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp932", errors="replace")
+
+
+def load_subtitles(path: str) -> list[Segment]:
+    """
+    Load the dialogue cues of an SRT, WebVTT, or ASS/SSA file.
+
+    Cues are sorted by start time and exact duplicates (the same line
+    repeated on several ASS layers) are dropped.
+
+    Args:
+        path: Path to the subtitle file
+
+    Returns:
+        Cues in playback order
+
+    Raises:
+        ValueError: If the file has no recognizable cues
+    """
+    content = read_subtitle_text(path)
+    is_ass = Path(path).suffix.lower() in (".ass", ".ssa") or "[Events]" in content
+    cues = parse_ass(content) if is_ass else parse_srt(content)
+    cues = sorted(set(cues), key=lambda cue: (cue.start, cue.end, cue.text))
+    if not cues:
+        raise ValueError(f"No subtitle cues found in {path}")
+    return cues
@@ -1,14 +1,81 @@
 """Audio transcription using OpenAI Whisper API."""
 
+import shutil
+import subprocess
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
 from openai import OpenAI
 from pathlib import Path
 
+from ..config.cache import artifact_key, file_digest
+from .audio import is_ffmpeg_available
+from .audio_processing import read_wav, to_mono, vad_chunks, write_wav
+from .concurrency import coalesce, get_limiter
+from .fingerprint import compute_fingerprint, get_fingerprint_index
+
+
+# Whisper rejects uploads over 25 MB
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+# Recordings longer than this are cut into utterance chunks of CHUNK_SECONDS
+# (Whisper's own context window) and transcribed in parallel
+LONG_AUDIO_SECONDS = 60
+CHUNK_SECONDS = 30
+
+# Short clips are packed into one request, separated by silence
+CLIP_GAP_SECONDS = 1.0
+MAX_PACK_SECONDS = 600
+AMBIGUOUS_OVERLAP = 0.25
+
+UPLOAD_SAMPLE_RATE = 16000
+UPLOAD_OPUS_ARGS = ("-c:a", "libopus", "-b:a", "24k", "-application", "voip")
+
+# Containers Whisper accepts, by the names it expects as file extensions
+WHISPER_FORMATS = {"flac", "m4a", "mp3", "mp4", "ogg", "wav", "webm"}
+
+# ISO base media brands (the ftyp box) of audio-only and audio/video files;
+# other brands in the same box format are images (HEIC, AVIF) and the like
+M4A_BRANDS = {b"M4A ", b"M4B ", b"M4P ", b"F4A ", b"F4B "}
+MP4_BRANDS = {
+    *(b"isom", b"iso2", b"iso4", b"iso5", b"iso6", b"mp41", b"mp42", b"mp71"),
+    *(b"avc1", b"dash", b"M4V ", b"M4VH", b"M4VP", b"F4V ", b"F4P ", b"qt  "),
+    *(b"3gp4", b"3gp5", b"3gp6", b"3g2a", b"mmp4", b"MSNV", b"XAVC"),
+}
+IMAGE_BRANDS = {b"mif1", b"msf1", b"heic", b"heix", b"hevc", b"avif", b"avis"}
+
+
+@dataclass(frozen=True)
+class UploadPart:
+    """One Whisper upload and where it starts in the source recording."""
+
+    name: str
+    data: bytes
+    offset: float = 0.0
+
+    @property
+    def file(self) -> tuple[str, bytes]:
+        """The (filename, contents) pair the OpenAI client uploads."""
+        return self.name, self.data
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A timed piece of transcript, in seconds from the start of the source."""
+
+    start: float
+    end: float
+    text: str
+
 
 def transcribe_audio(
     audio_path: str,
     api_key: str | None = None,
     language: str = "ja",
     response_format: str = "text",
+    reuse: bool = True,
 ) -> str:
     """
     Transcribe audio file using OpenAI Whisper API.
@@ -18,6 +85,8 @@ def transcribe_audio(
         api_key: OpenAI API key
         language: ISO-639-1 language code (default: ja for Japanese)
         response_format: Response format (text, json, srt, verbose_json, vtt)
+        reuse: Return the stored transcript of a near-duplicate clip instead
+            of calling Whisper
 
     Returns:
         Transcribed text string
@@ -34,32 +103,484 @@ def transcribe_audio(
     if not audio_file_path.exists():
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
+    key = artifact_key(
+        "transcription", file_digest(audio_path), language, response_format, reuse
+    )
+    return coalesce(
+        key,
+        lambda: _transcribe_whisper(
+            audio_path, api_key, language, response_format, reuse
+        ),
+    )
+
+
+def _transcribe_whisper(
+    audio_path: str, api_key: str, language: str, response_format: str, reuse: bool
+) -> str:
     client = OpenAI(api_key=api_key)
 
     try:
-        with open(audio_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language=language,
-                response_format=response_format,
-            )
+        # Re-encoded copies of audio seen before reuse its transcript
+        decoded = decode_mono(audio_path) if is_ffmpeg_available() else None
+        fingerprint = _fingerprint_decoded(*decoded) if decoded else None
+        field = f"{language}:{response_format}"
+        if fingerprint is not None and reuse:
+            match = get_fingerprint_index().match(fingerprint)
+            if match and field in match.get("transcripts", {}):
+                return match["transcripts"][field]
+
+        transcripts = _transcribe_parts(
+            client, prepare_upload(audio_path, decoded), language, response_format
+        )
 
         # Handle different response formats
         if response_format == "text":
-            return transcript.strip()
+            texts = [transcript.strip() for transcript in transcripts]
         else:
-            return transcript.text.strip()
+            texts = [transcript.text.strip() for transcript in transcripts]
+
+        text = "\n".join(text for text in texts if text)
+        if fingerprint is not None:
+            get_fingerprint_index().add(fingerprint, transcripts={field: text})
+        return text
 
     except Exception as e:
         raise Exception(f"Transcription failed: {e}")
 
 
+def fingerprint_file(audio_path: str) -> np.ndarray | None:
+    """
+    Fingerprint a file's audio for near-duplicate lookup.
+
+    Returns:
+        The fingerprint, or None without ffmpeg, on decode errors, or for
+        audio too short or too long to fingerprint
+    """
+    if not is_ffmpeg_available():
+        return None
+    try:
+        return _fingerprint_decoded(*decode_mono(audio_path))
+    except RuntimeError:
+        return None
+
+
+def _fingerprint_decoded(samples: np.ndarray, rate: int) -> np.ndarray | None:
+    # Duplicate lookup is for sentence clips; long recordings are skipped
+    # rather than holding and indexing minutes of frames
+    if len(samples) > LONG_AUDIO_SECONDS * rate:
+        return None
+    fingerprint = compute_fingerprint(samples, rate)
+    return fingerprint if len(fingerprint) else None
+
+
+def transcribe_segments(
+    audio_path: str, api_key: str | None = None, language: str = "ja"
+) -> list[Segment]:
+    """
+    Transcribe audio into timed segments using Whisper ``verbose_json``.
+
+    Long recordings are transcribed chunk by chunk in parallel; each
+    chunk's segment times are shifted by the chunk's offset so they refer
+    to the original recording.
+
+    Args:
+        audio_path: Path to audio or video file
+        api_key: OpenAI API key
+        language: ISO-639-1 language code (default: ja for Japanese)
+
+    Returns:
+        Segments in playback order
+
+    Raises:
+        ValueError: If API key is missing
+        FileNotFoundError: If the audio file does not exist
+        Exception: If transcription fails
+    """
+    if not api_key:
+        raise ValueError("OpenAI API key required for transcription")
+    if not Path(audio_path).exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    key = artifact_key("segments", file_digest(audio_path), language)
+    return coalesce(key, lambda: _segments_whisper(audio_path, api_key, language))
+
+
+def _segments_whisper(audio_path: str, api_key: str, language: str) -> list[Segment]:
+    client = OpenAI(api_key=api_key)
+
+    try:
+        parts = prepare_upload(audio_path)
+        transcripts = _transcribe_parts(client, parts, language, "verbose_json")
+        return [
+            Segment(
+                part.offset + segment.start,
+                part.offset + segment.end,
+                segment.text.strip(),
+            )
+            for part, transcript in zip(parts, transcripts)
+            for segment in transcript.segments or []
+            if segment.text.strip()
+        ]
+    except Exception as e:
+        raise Exception(f"Transcription failed: {e}") from e
+
+
+def _transcribe_parts(
+    client: OpenAI, parts: list[UploadPart], language: str, response_format: str
+) -> list:
+    """Send each part to Whisper, in parallel when there are several."""
+
+    def transcribe(part: UploadPart):
+        with get_limiter("whisper").slot():
+            return client.audio.transcriptions.create(
+                model="whisper-1",
+                file=part.file,
+                language=language,
+                response_format=response_format,
+            )
+
+    if len(parts) == 1:
+        return [transcribe(parts[0])]
+    workers = min(len(parts), get_limiter("whisper").maximum)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(transcribe, parts))
+
+
+def detect_format(header: bytes) -> str | None:
+    """
+    Identify an audio or video container from its first bytes.
+
+    Args:
+        header: At least the first 16 bytes of the file
+
+    Returns:
+        Container name (wav, mp3, aac, ogg, flac, m4a, mp4, webm, mkv),
+        or None if it is not recognised
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:3] == b"ID3":
+        return "mp3"
+    if len(header) >= 2 and header[0] == 0xFF:
+        if header[1] & 0xF6 == 0xF0:
+            return "aac"  # ADTS
+        if header[1] & 0xE0 == 0xE0:
+            return "mp3"  # MPEG audio frame sync
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[4:8] == b"ftyp":
+        return _ftyp_format(header)
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm" if b"webm" in header[:64] else "mkv"
+    return None
+
+
+def _ftyp_format(header: bytes) -> str | None:
+    """Classify an ISO base media file by the brands in its ftyp box."""
+    major = header[8:12]
+    # Compatible brands follow the minor version, up to the end of the box
+    end = min(int.from_bytes(header[:4], "big"), len(header))
+    brands = {header[i : i + 4] for i in range(16, end - 3, 4)} | {major}
+    if brands & IMAGE_BRANDS:
+        return None
+    if major in M4A_BRANDS:
+        return "m4a"
+    if major in MP4_BRANDS:
+        return "mp4"
+    if brands & M4A_BRANDS:
+        return "m4a"
+    if brands & MP4_BRANDS:
+        return "mp4"
+    return None
+
+
+def probe_format(audio_path: str) -> str | None:
+    """Identify a file's container from its magic bytes, ignoring the extension."""
+    try:
+        with open(audio_path, "rb") as f:
+            return detect_format(f.read(64))
+    except OSError:
+        return None
+
+
+def prepare_upload(
+    audio_path: str, decoded: tuple[np.ndarray, int] | None = None
+) -> list[UploadPart]:
+    """
+    Turn an audio or video file into compact Whisper uploads.
+
+    With ffmpeg, only the audio stream is decoded and downmixed to 16 kHz
+    mono. Recordings over ``LONG_AUDIO_SECONDS`` are cut by voice activity
+    into chunks of at most ``CHUNK_SECONDS`` (dropping the silence between
+    them), and every part is encoded as 24 kbps Opus. Without ffmpeg the
+    file is sent as-is, named after its real container so Whisper decodes
+    it correctly.
+
+    Args:
+        audio_path: Path to the audio or video file
+        decoded: Already decoded (mono samples, rate), to skip decoding
+
+    Returns:
+        Upload parts in playback order
+
+    Raises:
+        ValueError: If the file is too large to send without ffmpeg
+        RuntimeError: If ffmpeg fails
+    """
+    if decoded or is_ffmpeg_available():
+        mono, rate = decoded or decode_mono(audio_path)
+        if len(mono) <= LONG_AUDIO_SECONDS * rate:
+            spans = [(0, len(mono))]
+        else:
+            spans = vad_chunks(mono, rate, CHUNK_SECONDS) or [(0, len(mono))]
+        return [
+            UploadPart(
+                f"part{i}.ogg",
+                _encode_opus(write_wav(mono[start:end], rate)),
+                start / rate,
+            )
+            for i, (start, end) in enumerate(spans)
+        ]
+
+    with open(audio_path, "rb") as f:
+        data = f.read()
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ValueError(
+            f"{audio_path} is {len(data) / 1024 / 1024:.1f} MB; Whisper accepts "
+            "up to 25 MB. Install ffmpeg to compress and split it automatically."
+        )
+    name = Path(audio_path).name
+    container = detect_format(data[:64])
+    if container in WHISPER_FORMATS:
+        name = f"{Path(audio_path).stem}.{container}"
+    return [UploadPart(name, data)]
+
+
+def decode_mono(audio_path: str) -> tuple[np.ndarray, int]:
+    """
+    Decode a file's audio track to 16 kHz mono samples with ffmpeg.
+
+    Returns:
+        Tuple of (float32 mono samples, sample rate)
+
+    Raises:
+        RuntimeError: If ffmpeg fails
+    """
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-i",
+            audio_path,
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(UPLOAD_SAMPLE_RATE),
+            "-f",
+            "wav",
+            "-",
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg decode failed: {result.stderr.decode(errors='replace')}"
+        )
+    samples, rate = read_wav(result.stdout)
+    return to_mono(samples), rate
+
+
+def transcribe_clips(
+    audio_paths: list[str],
+    api_key: str | None = None,
+    language: str = "ja",
+    gap: float = CLIP_GAP_SECONDS,
+    reuse: bool = True,
+) -> list[str]:
+    """
+    Transcribe many short clips with as few Whisper requests as possible.
+
+    Clips are decoded, joined with ``gap`` seconds of silence into packs of
+    up to ``MAX_PACK_SECONDS``, and each pack is sent as one ``verbose_json``
+    request. Segments are mapped back to clips by their timestamps. A clip
+    whose segments straddle a neighbour, or that got no segment at all, is
+    transcribed on its own instead, as is every clip when ffmpeg is missing.
+
+    Args:
+        audio_paths: Clip files, in order
+        api_key: OpenAI API key
+        language: ISO-639-1 language code (default: ja for Japanese)
+        gap: Silence inserted between clips, in seconds
+        reuse: Let clips sent on their own reuse a near-duplicate's transcript
+
+    Returns:
+        One transcript per clip, in input order
+
+    Raises:
+        ValueError: If API key is missing
+        FileNotFoundError: If a clip does not exist
+        Exception: If transcription fails
+    """
+    if not api_key:
+        raise ValueError("OpenAI API key required for transcription")
+    for path in audio_paths:
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Audio file not found: {path}")
+
+    results: list[str | None] = [None] * len(audio_paths)
+    workers = get_limiter("whisper").maximum
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if len(audio_paths) > 1 and is_ffmpeg_available():
+            client = OpenAI(api_key=api_key)
+            decoded = list(pool.map(_try_decode, audio_paths))
+            packs = _pack_clips(decoded, gap)
+            for pack, texts in zip(
+                packs,
+                pool.map(
+                    lambda pack: _transcribe_pack(
+                        client, [decoded[i] for i in pack], gap, language
+                    ),
+                    packs,
+                ),
+            ):
+                for index, text in zip(pack, texts):
+                    results[index] = text
+
+        missing = [i for i, text in enumerate(results) if text is None]
+        for index, text in zip(
+            missing,
+            pool.map(
+                lambda i: transcribe_audio(
+                    audio_paths[i], api_key, language, reuse=reuse
+                ),
+                missing,
+            ),
+        ):
+            results[index] = text
+    return results
+
+
+def _try_decode(audio_path: str) -> np.ndarray | None:
+    try:
+        samples, _ = decode_mono(audio_path)
+    except Exception:
+        return None  # transcribed on its own later
+    return samples
+
+
+def _pack_clips(decoded: list[np.ndarray | None], gap: float) -> list[list[int]]:
+    """Group decoded clip indices into packs of at most MAX_PACK_SECONDS."""
+    packs = []
+    length = 0.0
+    for index, samples in enumerate(decoded):
+        if samples is None:
+            continue
+        seconds = len(samples) / UPLOAD_SAMPLE_RATE + gap
+        if packs and length + seconds <= MAX_PACK_SECONDS:
+            packs[-1].append(index)
+            length += seconds
+        else:
+            packs.append([index])
+            length = seconds
+    return packs
+
+
+def _transcribe_pack(
+    client: OpenAI, clips: list[np.ndarray], gap: float, language: str
+) -> list[str | None]:
+    """Transcribe clips joined by silence; None marks clips to redo alone."""
+    silence = np.zeros(int(gap * UPLOAD_SAMPLE_RATE), dtype=np.float32)
+    pieces = []
+    spans = []
+    position = 0
+    for samples in clips:
+        pieces += [samples, silence]
+        spans.append(
+            (
+                position / UPLOAD_SAMPLE_RATE,
+                (position + len(samples)) / UPLOAD_SAMPLE_RATE,
+            )
+        )
+        position += len(samples) + len(silence)
+
+    part = UploadPart(
+        "pack.ogg", _encode_opus(write_wav(np.concatenate(pieces), UPLOAD_SAMPLE_RATE))
+    )
+    try:
+        [transcript] = _transcribe_parts(client, [part], language, "verbose_json")
+    except Exception:
+        return [None] * len(clips)
+    return assign_segments(transcript.segments or [], spans, gap)
+
+
+def assign_segments(
+    segments: list, spans: list[tuple[float, float]], gap: float
+) -> list[str | None]:
+    """
+    Map timed transcript segments back to the clips they came from.
+
+    Each clip owns its span plus half the gap on either side. A segment
+    overlapping more than one clip by over ``AMBIGUOUS_OVERLAP`` seconds
+    makes all of those clips ambiguous.
+
+    Args:
+        segments: Whisper segments with ``start``, ``end`` and ``text``
+        spans: (start, end) seconds of each clip in the packed audio
+        gap: Silence between clips, in seconds
+
+    Returns:
+        Text per clip, or None where the mapping is ambiguous or empty
+    """
+    owned = [(start - gap / 2, end + gap / 2) for start, end in spans]
+    texts = [[] for _ in spans]
+    ambiguous = set()
+    for segment in segments:
+        if not segment.text.strip():
+            continue
+        hits = [
+            i
+            for i, (start, end) in enumerate(owned)
+            if min(segment.end, end) - max(segment.start, start) > AMBIGUOUS_OVERLAP
+        ]
+        if not hits:
+            middle = (segment.start + segment.end) / 2
+            hits = [i for i, (start, end) in enumerate(owned) if start <= middle < end]
+        if len(hits) == 1:
+            texts[hits[0]].append(segment.text)
+        else:
+            ambiguous.update(hits)
+    return [
+        None if i in ambiguous or not parts else "".join(parts).strip()
+        for i, parts in enumerate(texts)
+    ]
+
+
+def _encode_opus(wav_bytes: bytes) -> bytes:
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", "pipe:0", *UPLOAD_OPUS_ARGS, "-f", "ogg", "-"],
+        input=wav_bytes,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg encode failed: {result.stderr.decode(errors='replace')}"
+        )
+    return result.stdout
+
+
 def validate_audio_file(audio_path: str) -> bool:
     """
-    Validate that file exists and has supported audio extension.
+    Validate that file exists and is a supported audio or video file.
 
-    Supported formats: mp3, mp4, mpeg, mpga, m4a, wav, webm
+    Supported formats: mp3, mp4, mpeg, mpga, m4a, wav, webm, plus any file
+    whose magic bytes identify a known container (e.g. a .mov recording
+    or an Ogg file), whatever its extension. An ISO media file whose brand
+    is not audio or video (a HEIC or AVIF image) is rejected even with an
+    audio extension.
 
     Args:
         audio_path: Path to audio file
@@ -73,4 +594,69 @@ def validate_audio_file(audio_path: str) -> bool:
     if not audio_file.exists():
         return False
 
-    return audio_file.suffix.lower() in supported_extensions
+    try:
+        with open(audio_path, "rb") as f:
+            header = f.read(64)
+    except OSError:
+        header = b""
+    if detect_format(header) is not None:
+        return True
+    is_iso_media = header[4:8] == b"ftyp"
+    return audio_file.suffix.lower() in supported_extensions and not is_iso_media
+
+
+def find_audio_files(directory: str) -> list[Path]:
+    """
+    List the transcribable files under a directory, recursively.
+
+    Args:
+        directory: Folder to walk
+
+    Returns:
+        Audio and video files accepted by ``validate_audio_file``, sorted
+        by path
+    """
+    return [
+        path
+        for path in sorted(Path(directory).rglob("*"))
+        if path.is_file() and validate_audio_file(str(path))
+    ]
+
+
+def audio_duration(audio_path: str) -> float | None:
+    """
+    Measure the length of a file's audio.
+
+    Uses ffprobe when it is installed; otherwise only WAV files can be
+    measured.
+
+    Args:
+        audio_path: Path to the audio or video file
+
+    Returns:
+        Duration in seconds, or None if it can't be determined
+    """
+    if shutil.which("ffprobe"):
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-show_entries",
+                "format=duration",
+                "-of",
+                "csv=p=0",
+                audio_path,
+            ],
+            capture_output=True,
+            text=True,
+        )
+        try:
+            return round(float(result.stdout.strip()), 3)
+        except ValueError:
+            pass
+    try:
+        with wave.open(audio_path, "rb") as wav:
+            return round(wav.getnframes() / wav.getframerate(), 3)
+    except (wave.Error, EOFError, OSError):
+        return None
@@ -1,20 +1,38 @@
+import threading
+
 from deep_translator import GoogleTranslator
 from openai import OpenAI
 
-_translator = None
+from ..config.cache import artifact_key
+from .concurrency import coalesce, get_limiter
+
+_local = threading.local()
 
 
 def get_translator() -> GoogleTranslator:
-    """Lazy-loaded singleton translator."""
-    global _translator
-    if _translator is None:
-        _translator = GoogleTranslator(source="ja", target="en")
-    return _translator
+    """
+    Lazy-loaded translator for the calling thread.
+
+    GoogleTranslator keeps per-request state on the instance, so batch
+    worker threads sharing one could get each other's translations.
+    """
+    translator = getattr(_local, "translator", None)
+    if translator is None:
+        translator = _local.translator = GoogleTranslator(source="ja", target="en")
+    return translator
 
 
 def translate_to_english(text: str) -> str:
     """Translate Japanese text to English using Google Translate."""
-    return get_translator().translate(text)
+    return coalesce(
+        artifact_key("translation", "google", text),
+        lambda: _translate_google(text),
+    )
+
+
+def _translate_google(text: str) -> str:
+    with get_limiter("google_translate").slot():
+        return get_translator().translate(text)
 
 
 def translate_to_english_openai(
@@ -38,19 +56,27 @@ def translate_to_english_openai(
     if not api_key:
         raise ValueError("OpenAI API key required for translation")
 
+    return coalesce(
+        artifact_key("translation", "openai", model, text),
+        lambda: _translate_openai(text, api_key, model),
+    )
+
+
+def _translate_openai(text: str, api_key: str, model: str) -> str:
     try:
         client = OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a translator. Translate the following Japanese text to English. Provide only the translation, no explanations.",
-                },
-                {"role": "user", "content": text},
-            ],
-            temperature=0.3,
-        )
+        with get_limiter("openai_chat").slot():
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a translator. Translate the following Japanese text to English. Provide only the translation, no explanations.",
+                    },
+                    {"role": "user", "content": text},
+                ],
+                temperature=0.3,
+            )
         translation = response.choices[0].message.content
         if translation is None:
             raise Exception("OpenAI returned empty translation")
@@ -1,6 +1,25 @@
 import zipfile
 import shutil
-from pathlib import Path
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import PurePosixPath, Path
+
+from .placement import place_file, replacing
+
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".ogg", ".opus", ".flac", ".aac"}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+TEXT_EXTENSIONS = {".txt"}
+
+
+@dataclass(frozen=True)
+class Bundle:
+    """The audio, image, and text members of a ZIP that share a file stem."""
+
+    stem: str
+    audio: str | None = None
+    image: str | None = None
+    text: str | None = None
 
 
 def extract_from_zip(zip_path: str, output_dir: str) -> dict[str, str | None]:
@@ -11,15 +30,84 @@ def extract_from_zip(zip_path: str, output_dir: str) -> dict[str, str | None]:
         for filename in zf.namelist():
             ext = Path(filename).suffix.lower()
             if ext in [".jpg", ".jpeg", ".png"] and not result["image"]:
-                result["image"] = zf.extract(filename, output_dir)
+                kind = "image"
             elif ext == ".mp3" and not result["audio"]:
-                result["audio"] = zf.extract(filename, output_dir)
+                kind = "audio"
+            else:
+                continue
+            dest = Path(output_dir, *PurePosixPath(filename).parts)
+            result[kind] = extract_member(zf, filename, str(dest))
 
     return result
 
 
+def iter_bundles(zf: zipfile.ZipFile) -> Iterator[Bundle]:
+    """
+    Group a ZIP's members into per-card bundles by file stem.
+
+    Only the archive's central directory is read; member contents stay
+    compressed until ``read_member_text`` or ``extract_member`` asks for
+    them. Members pair up by path without extension (``clips/001.mp3``
+    with ``clips/001.jpg`` and ``clips/001.txt``), and the first member of
+    each kind wins. Hidden files and ``__MACOSX`` metadata are ignored.
+
+    Args:
+        zf: Open archive
+
+    Yields:
+        Bundles with audio or text, in archive order
+    """
+    groups: dict[str, dict[str, str]] = {}
+    for info in zf.infolist():
+        path = PurePosixPath(info.filename)
+        if info.is_dir() or any(
+            part.startswith(".") or part == "__MACOSX" for part in path.parts
+        ):
+            continue
+        ext = path.suffix.lower()
+        if ext in AUDIO_EXTENSIONS:
+            kind = "audio"
+        elif ext in IMAGE_EXTENSIONS:
+            kind = "image"
+        elif ext in TEXT_EXTENSIONS:
+            kind = "text"
+        else:
+            continue
+        groups.setdefault(str(path.with_suffix("")), {}).setdefault(kind, info.filename)
+
+    for stem, members in groups.items():
+        if "audio" in members or "text" in members:
+            yield Bundle(stem, **members)
+
+
+def read_member_text(zf: zipfile.ZipFile, member: str) -> str:
+    """Read a text member (UTF-8, with or without BOM), stripped."""
+    return zf.read(member).decode("utf-8-sig").strip()
+
+
+def extract_member(zf: zipfile.ZipFile, member: str, dest_path: str) -> str:
+    """
+    Stream one member to ``dest_path`` without staging it elsewhere.
+
+    The member is written next to ``dest_path`` and moved over it, so an
+    existing file there is replaced rather than overwritten in place.
+
+    Args:
+        zf: Open archive
+        member: Member name
+        dest_path: Destination file
+
+    Returns:
+        The destination path
+    """
+    with replacing(dest_path) as tmp_path:
+        with zf.open(member) as source, open(tmp_path, "wb") as dest:
+            shutil.copyfileobj(source, dest, 1 << 20)
+    return dest_path
+
+
 def copy_media_file(source_path: str, dest_dir: str, new_filename: str) -> str:
-    """Copy media file with new filename."""
+    """Place a media file under a new filename (a reflink or copy, never a link)."""
     dest_path = Path(dest_dir) / new_filename
-    shutil.copy2(source_path, dest_path)
+    place_file(source_path, str(dest_path))
     return str(dest_path)
@@ -1,14 +1,78 @@
-import uuid
+import hashlib
+import os
+import re
+import time
+import unicodedata
 
+from ..config.cache import file_digest
 
-def generate_unique_id() -> str:
-    """Generate unique 8-character ID."""
-    return str(uuid.uuid4())[:8]
+# Hex digits in a card ID (80 bits): even at 10 million cards the chance of
+# any two colliding is about 4 in 100 billion
+ID_LENGTH = 20
+DEFAULT_NAMESPACE = "ankicard"
 
 
-def generate_media_filenames(unique_id: str) -> dict[str, str]:
-    """Generate media filenames."""
+def normalize_sentence(sentence: str) -> str:
+    """NFKC-normalize and collapse whitespace, so trivial variants match."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", sentence)).strip()
+
+
+def content_id(sentence: str, namespace: str = DEFAULT_NAMESPACE) -> str:
+    """Deterministic ID from a normalized sentence within a namespace."""
+    payload = f"{namespace}\x1f{normalize_sentence(sentence)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:ID_LENGTH]
+
+
+def sortable_id() -> str:
+    """
+    Time-sortable random ID, like a UUIDv7 or ULID.
+
+    48 bits of Unix time in milliseconds followed by 32 random bits, as
+    fixed-width hex, so IDs sort in creation order.
+    """
+    return f"{time.time_ns() // 1_000_000:012x}{os.urandom(4).hex()}"
+
+
+def source_namespace(paths: list[str], default: str = DEFAULT_NAMESPACE) -> str:
+    """
+    ID namespace for a card whose media comes from the files at ``paths``.
+
+    Derived from the files' contents, so the same sentence read from two
+    different clips or screenshots gets two cards instead of one card whose
+    media the second overwrites. Without source files, ``default``.
+    """
+    if not paths:
+        return default
+    return "+".join(file_digest(path)[:ID_LENGTH] for path in paths)
+
+
+def generate_unique_id(
+    sentence: str | None = None, namespace: str = DEFAULT_NAMESPACE
+) -> str:
+    """
+    Generate a card ID.
+
+    With a sentence the ID is derived from its content, so rerunning the
+    same input gives the same media filenames and note; the namespace keeps
+    apart cards that share a sentence but not their source (e.g. two clips
+    of the same line). Without a sentence the ID is time-sortable.
+    """
+    if sentence is None:
+        return sortable_id()
+    return content_id(sentence, namespace)
+
+
+def generate_media_filenames(
+    unique_id: str,
+    extra_audio: int = 0,
+    audio_extension: str = "mp3",
+    image_extension: str = "jpg",
+) -> dict:
+    """Generate media filenames, with ``extra_audio`` numbered voice variants."""
     return {
-        "audio": f"anki_{unique_id}.mp3",
-        "image": f"anki_{unique_id}.jpg",
+        "audio": f"anki_{unique_id}.{audio_extension}",
+        "image": f"anki_{unique_id}.{image_extension}",
+        "extra_audio": [
+            f"anki_{unique_id}_{n}.{audio_extension}" for n in range(2, extra_audio + 2)
+        ],
     }
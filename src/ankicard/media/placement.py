@@ -0,0 +1,166 @@
+"""Place media files with as little byte copying as the filesystem allows."""
+
+import os
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Linux ioctl that clones a file's extents copy-on-write (Btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+PLACEMENT_METHODS = ("reflink", "hardlink", "copy_file_range", "copy")
+
+_lock = threading.Lock()
+_stats = dict.fromkeys(PLACEMENT_METHODS, 0) | {"bytes_copied": 0}
+
+
+def place_file(source_path: str, dest_path: str, link: bool = False) -> str:
+    """
+    Make ``dest_path`` hold the contents of ``source_path``.
+
+    Tries the cheapest option first: a reflink (copy-on-write clone that
+    shares the source's blocks), then, only with ``link``, a hard link,
+    then an in-kernel ``copy_file_range``, and finally an ordinary copy.
+    Reflinks and hard links copy no bytes; ``copy_file_range`` copies
+    without passing the data through Python. A hard link shares the file
+    itself, so a write to either path shows in both; only link files that
+    are never modified, such as read-only content-store objects.
+
+    Args:
+        source_path: Existing file
+        dest_path: Destination, replaced if it exists
+        link: Allow hard links (for read-only files only)
+
+    Returns:
+        The method used: "reflink", "hardlink", "copy_file_range" or "copy"
+    """
+    if os.path.lexists(dest_path):
+        if os.path.exists(dest_path) and os.path.samefile(source_path, dest_path):
+            _record("hardlink", 0)
+            return "hardlink"
+        os.unlink(dest_path)
+
+    if _reflink(source_path, dest_path):
+        shutil.copystat(source_path, dest_path)
+        _record("reflink", 0)
+        return "reflink"
+
+    if link:
+        try:
+            os.link(source_path, dest_path)
+            _record("hardlink", 0)
+            return "hardlink"
+        except OSError:
+            pass
+
+    copied = _copy_file_range(source_path, dest_path)
+    if copied is not None:
+        method = "copy_file_range"
+    else:
+        shutil.copyfile(source_path, dest_path)
+        copied = os.path.getsize(dest_path)
+        method = "copy"
+    shutil.copystat(source_path, dest_path)
+    _record(method, copied)
+    return method
+
+
+def temporary_path(dest_path: str) -> str:
+    """A private path next to ``dest_path`` with the same extension."""
+    dest = Path(dest_path)
+    tag = f"{os.getpid()}-{threading.get_ident()}"
+    return str(dest.with_name(f".{dest.stem}.{tag}.tmp{dest.suffix}"))
+
+
+@contextmanager
+def replacing(dest_path: str):
+    """
+    Yield a temporary path that is moved over ``dest_path`` on success.
+
+    Writers fill the temporary file and ``os.replace`` swaps it in, so an
+    existing ``dest_path`` is never written in place: a file sharing its
+    storage (a hard link) keeps its contents, and readers never see a
+    partial file. On error the temporary file is removed.
+    """
+    dirname = os.path.dirname(dest_path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp_path = temporary_path(dest_path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+
+def write_file(dest_path: str, data: bytes) -> str:
+    """Write ``data`` to ``dest_path`` by replacement (see ``replacing``)."""
+    with replacing(dest_path) as tmp_path:
+        Path(tmp_path).write_bytes(data)
+    return dest_path
+
+
+def _reflink(source_path: str, dest_path: str) -> bool:
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        _remove(dest_path)
+        return False
+
+
+def _copy_file_range(source_path: str, dest_path: str) -> int | None:
+    """Copy in the kernel; the byte count, or None if unsupported."""
+    if not hasattr(os, "copy_file_range"):
+        return None
+    try:
+        with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+            size = os.fstat(src.fileno()).st_size
+            copied = 0
+            while copied < size:
+                sent = os.copy_file_range(src.fileno(), dst.fileno(), size - copied)
+                if sent == 0:
+                    raise OSError("copy_file_range stopped early")
+                copied += sent
+        return copied
+    except OSError:
+        _remove(dest_path)
+        return None
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _record(method: str, copied: int) -> None:
+    with _lock:
+        _stats[method] += 1
+        _stats["bytes_copied"] += copied
+
+
+def placement_stats() -> dict[str, int]:
+    """Files placed by each method so far, plus the bytes actually copied."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset_placement_stats() -> None:
+    """Zero the placement counters (for tests)."""
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
@@ -0,0 +1,85 @@
+"""Content-addressed media store: each distinct media file is kept once."""
+
+import os
+import re
+from pathlib import Path
+
+from ..config.cache import file_digest
+from .placement import place_file, replacing
+
+
+STORE_DIRNAME = "store"
+
+# Hex digits of the SHA-256 kept in filenames (128 bits)
+DIGEST_LENGTH = 32
+
+# Stored objects are shared by every card that uses them, so never written
+STORED_MODE = 0o444
+
+_SOUND_REF = re.compile(r"\[sound:([^\]]+)\]")
+_SRC_REF = re.compile(r"""(src=["']?)([^"'\s>]+)""")
+
+
+def content_filename(path: str) -> str:
+    """Media filename derived from a file's contents: ``anki_<hash>.<ext>``."""
+    return f"anki_{file_digest(path)[:DIGEST_LENGTH]}{Path(path).suffix.lower()}"
+
+
+def store_media(path: str, store_dir: str) -> str:
+    """
+    Move a media file into the content-addressed store.
+
+    Files are kept at ``<store_dir>/<first two hash digits>/anki_<hash>.<ext>``
+    so no directory grows past a few thousand entries. Anki media names are
+    flat, so notes reference only the file name. If the same content is
+    already stored, ``path`` is deleted and the stored file reused.
+
+    Stored files are made read-only. A file that shares its storage with
+    another path (a hard link) is copied in rather than moved, so a later
+    write through that path cannot change the stored object.
+
+    Args:
+        path: Media file to store (it is moved, not copied)
+        store_dir: Root of the store
+
+    Returns:
+        Path of the stored file
+    """
+    name = content_filename(path)
+    dest = Path(store_dir) / name[5:7] / name
+    if dest.exists():
+        if not os.path.samefile(path, dest):
+            os.unlink(path)
+        return str(dest)
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if os.stat(path).st_nlink > 1:
+            raise OSError("linked elsewhere")
+        os.replace(path, dest)
+    except OSError:
+        # Linked file, or store on another filesystem
+        with replacing(str(dest)) as tmp_path:
+            place_file(path, tmp_path)
+        os.unlink(path)
+    os.chmod(dest, STORED_MODE)
+    return str(dest)
+
+
+def rename_references(field: str, renames: dict[str, str]) -> str:
+    """
+    Point a note field's ``[sound:...]`` and ``src=...`` media at new names.
+
+    Args:
+        field: Note field HTML
+        renames: Old media filename to new filename
+
+    Returns:
+        The field with renamed references (others unchanged)
+    """
+    field = _SOUND_REF.sub(
+        lambda m: f"[sound:{renames.get(m.group(1), m.group(1))}]", field
+    )
+    return _SRC_REF.sub(
+        lambda m: m.group(1) + renames.get(m.group(2), m.group(2)), field
+    )
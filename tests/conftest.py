@@ -1,5 +1,53 @@
+import io
+import os
+import subprocess
+from pathlib import Path
+
 import pytest
+from PIL import Image
 from ankicard.config.settings import Settings
+from ankicard.core.audio import reset_voicevox_health
+
+
+@pytest.fixture(autouse=True)
+def no_container_socket(monkeypatch):
+    """Use the docker CLI path unless a test provides its own socket."""
+    monkeypatch.setattr("ankicard.core.container.find_socket", lambda: None)
+
+
+@pytest.fixture(autouse=True)
+def no_background_warmup(monkeypatch):
+    """Keep commands from starting a real VOICEVOX container in the background."""
+    from concurrent.futures import Future
+
+    def finished_warmup(*args, **kwargs):
+        future = Future()
+        future.set_result(False)
+        return future
+
+    monkeypatch.setattr("ankicard.core.audio.start_voicevox_warmup", finished_warmup)
+
+
+@pytest.fixture(autouse=True)
+def fresh_voicevox_health():
+    """Don't let cached VOICEVOX health leak between tests."""
+    reset_voicevox_health()
+    yield
+    reset_voicevox_health()
+
+
+@pytest.fixture(autouse=True)
+def isolated_artifact_cache(tmp_path, monkeypatch):
+    """Keep cached queries, enhanced text and fingerprints out of the home dir."""
+    monkeypatch.setattr(
+        "ankicard.config.cache.AUDIO_QUERY_DIR", tmp_path / "audio_queries"
+    )
+    monkeypatch.setattr(
+        "ankicard.config.cache.ENHANCED_TEXT_DIR", tmp_path / "enhanced_text"
+    )
+    monkeypatch.setattr(
+        "ankicard.config.cache.FINGERPRINT_FILE", tmp_path / "fingerprints.jsonl"
+    )
 
 
 @pytest.fixture
@@ -57,6 +105,34 @@ def test_image_path(tmp_path):
     return str(tmp_path / "test.jpg")
 
 
+@pytest.fixture
+def sample_png_bytes():
+    """A small transparent PNG, as an image provider might return."""
+    buffer = io.BytesIO()
+    Image.new("RGBA", (64, 48), (200, 40, 40, 128)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def ffmpeg_outputs(tmp_path, monkeypatch):
+    """
+    Stand-in for ``subprocess.run`` that writes ffmpeg's temporary outputs.
+
+    Media writers hand ffmpeg a temporary path and move it into place, so
+    a mocked ffmpeg has to create it. Runs in ``tmp_path`` so relative
+    output names stay out of the working tree.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def run(cmd, *args, **kwargs):
+        for arg in cmd:
+            if ".tmp." in os.path.basename(str(arg)):
+                Path(arg).write_bytes(b"encoded")
+        return subprocess.CompletedProcess(cmd, 0, b"", b"")
+
+    return run
+
+
 @pytest.fixture
 def test_zip_path(tmp_path):
     """Path for test ZIP file."""
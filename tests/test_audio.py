@@ -1,4 +1,8 @@
-from unittest.mock import Mock, patch
+import io
+import json
+import zipfile
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
 import pytest
 import requests
 from ankicard.core.audio import (
@@ -6,14 +10,24 @@ from ankicard.core.audio import (
     generate_audio,
     generate_audio_openai,
     generate_audio_voicevox,
+    generate_audio_voicevox_batch,
+    generate_audio_voicevox_variants,
+    get_audio_query,
     enhance_text_for_speech,
+    enhance_texts_for_speech,
+    get_voicevox_health,
+    initialize_voicevox_speaker,
     is_docker_running,
     is_ffmpeg_available,
     is_voicevox_available,
     start_voicevox_docker,
+    preload_voicevox_speakers,
+    start_voicevox_warmup,
+    warm_up_voicevox,
 )
 
 
+@patch("ankicard.core.audio.is_ffmpeg_available", Mock(return_value=False))
 class TestGenerateAudio:
     """Tests for audio generation."""
 
@@ -26,7 +40,7 @@ class TestGenerateAudio:
         result = generate_audio("こんにちは", test_audio_path)
 
         mock_gtts.assert_called_once_with(text="こんにちは", lang="ja", slow=False)
-        mock_tts_instance.save.assert_called_once_with(test_audio_path)
+        mock_tts_instance.write_to_fp.assert_called_once()
         assert result == test_audio_path
 
     @patch("ankicard.core.audio.gTTS")
@@ -52,16 +66,16 @@ class TestGenerateAudio:
         assert result == test_audio_path
 
     @patch("ankicard.core.audio.gTTS")
-    @patch("ankicard.core.audio.os.makedirs")
-    def test_generate_audio_creates_directory(self, mock_makedirs, mock_gtts, tmp_path):
+    def test_generate_audio_creates_directory(self, mock_gtts, tmp_path):
         """Test that output directory is created if it doesn't exist."""
         nested_path = tmp_path / "nested" / "dir" / "audio.mp3"
         mock_tts_instance = Mock()
+        mock_tts_instance.write_to_fp.side_effect = lambda fp: fp.write(b"mp3")
         mock_gtts.return_value = mock_tts_instance
 
         generate_audio("テスト", str(nested_path))
 
-        mock_makedirs.assert_called()
+        assert nested_path.read_bytes() == b"mp3"
 
     @patch("ankicard.core.audio.gTTS")
     def test_generate_audio_with_japanese_sentence(self, mock_gtts, test_audio_path):
@@ -295,6 +309,83 @@ class TestStartVoicevoxDocker:
         assert start_voicevox_docker(timeout=60) is False
 
 
+class TestVoicevoxWarmup:
+    """Tests for VOICEVOX warm-up and speaker preloading."""
+
+    @patch("ankicard.core.audio.requests.post")
+    def test_initialize_speaker(self, mock_post):
+        """Test that the speaker is preloaded without reinitializing."""
+        mock_post.return_value = Mock(status_code=204)
+
+        assert initialize_voicevox_speaker(speaker_id=3) is True
+        mock_post.assert_called_once_with(
+            "http://127.0.0.1:50021/initialize_speaker",
+            params={"speaker": 3, "skip_reinit": "true"},
+            timeout=120,
+        )
+
+    @patch("ankicard.core.audio.requests.post")
+    def test_initialize_speaker_connection_error(self, mock_post):
+        """Test that an unreachable engine reports failure."""
+        mock_post.side_effect = requests.ConnectionError()
+        assert initialize_voicevox_speaker() is False
+
+    @patch("ankicard.core.audio.initialize_voicevox_speaker", return_value=True)
+    @patch("ankicard.core.audio.start_voicevox_docker")
+    @patch("ankicard.core.audio.is_voicevox_available", return_value=True)
+    def test_warm_up_running_engine(self, _mock_available, mock_start, mock_init):
+        """Test that a running engine only needs the speaker preloaded."""
+        assert warm_up_voicevox(speaker_id=13) is True
+        mock_start.assert_not_called()
+        mock_init.assert_called_once_with("http://127.0.0.1:50021", 13)
+
+    @patch("ankicard.core.audio.initialize_voicevox_speaker", return_value=True)
+    @patch("ankicard.core.audio.start_voicevox_docker", return_value=True)
+    @patch("ankicard.core.audio.is_voicevox_available", return_value=False)
+    def test_warm_up_starts_container(self, _mock_available, mock_start, mock_init):
+        """Test that warm-up starts the container when the engine is down."""
+        assert warm_up_voicevox() is True
+        mock_start.assert_called_once()
+        assert get_voicevox_health().is_available() is True
+
+    @patch("ankicard.core.audio.initialize_voicevox_speaker")
+    @patch("ankicard.core.audio.start_voicevox_docker", return_value=False)
+    @patch("ankicard.core.audio.is_voicevox_available", return_value=False)
+    def test_warm_up_start_fails(self, _mock_available, _mock_start, mock_init):
+        """Test that a failed container start skips speaker preloading."""
+        assert warm_up_voicevox() is False
+        mock_init.assert_not_called()
+
+    @patch("ankicard.core.audio.initialize_voicevox_speaker", return_value=True)
+    @patch("ankicard.core.audio.is_voicevox_available", return_value=True)
+    def test_preload_every_speaker_once(self, _mock_available, mock_init):
+        """Test that each distinct speaker is initialized once."""
+        assert preload_voicevox_speakers("http://engine", [2, 13, 2]) is True
+        assert [c.args for c in mock_init.call_args_list] == [
+            ("http://engine", 2),
+            ("http://engine", 13),
+        ]
+
+    @patch("ankicard.core.audio.initialize_voicevox_speaker")
+    @patch("ankicard.core.audio.start_voicevox_docker")
+    @patch("ankicard.core.audio.is_voicevox_available", return_value=False)
+    def test_preload_never_starts_container(
+        self, _mock_available, mock_start, mock_init
+    ):
+        """Test that preloading leaves a stopped engine alone."""
+        assert preload_voicevox_speakers() is False
+        mock_start.assert_not_called()
+        mock_init.assert_not_called()
+
+    @patch("ankicard.core.audio.preload_voicevox_speakers", return_value=True)
+    def test_start_warmup_runs_in_background(self, mock_preload):
+        """Test that the background warm-up resolves its future."""
+        future = start_voicevox_warmup("http://engine", [5])
+
+        assert future.result(timeout=1) is True
+        mock_preload.assert_called_once_with("http://engine", [5])
+
+
 class TestGenerateAudioVoicevox:
     """Tests for VOICEVOX TTS audio generation."""
 
@@ -317,6 +408,7 @@ class TestGenerateAudioVoicevox:
         mock_unlink,
         _mock_ffmpeg,
         test_audio_path,
+        ffmpeg_outputs,
     ):
         """Test successful VOICEVOX TTS generation."""
         # Mock tempfile
@@ -341,7 +433,7 @@ class TestGenerateAudioVoicevox:
         mock_post.side_effect = [mock_query_response, mock_synth_response]
 
         # Mock ffmpeg subprocess
-        mock_subproc_run.return_value = Mock(returncode=0)
+        mock_subproc_run.side_effect = ffmpeg_outputs
 
         result = generate_audio_voicevox("こんにちは", test_audio_path)
 
@@ -364,6 +456,7 @@ class TestGenerateAudioVoicevox:
         mock_unlink,
         _mock_ffmpeg,
         test_audio_path,
+        ffmpeg_outputs,
     ):
         """Test VOICEVOX with custom speaker and speed."""
         mock_tmp = Mock()
@@ -382,7 +475,7 @@ class TestGenerateAudioVoicevox:
         mock_synth_response = Mock()
         mock_synth_response.content = b"fake wav"
         mock_post.side_effect = [mock_query_response, mock_synth_response]
-        mock_subproc_run.return_value = Mock(returncode=0)
+        mock_subproc_run.side_effect = ffmpeg_outputs
 
         generate_audio_voicevox("テスト", test_audio_path, speaker_id=2, speed=1.0)
 
@@ -403,6 +496,22 @@ class TestGenerateAudioVoicevox:
         with pytest.raises(Exception, match="VOICEVOX TTS failed"):
             generate_audio_voicevox("test", test_audio_path)
 
+    @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.audio.requests.post")
+    def test_generate_audio_voicevox_engine_errors_open_circuit(
+        self, mock_post, _mock_ffmpeg, test_audio_path
+    ):
+        """Test that repeated engine errors open the VOICEVOX circuit."""
+        mock_post.side_effect = requests.Timeout("read timed out")
+        health = get_voicevox_health()
+
+        for _ in range(health.breaker.failure_threshold):
+            with pytest.raises(Exception, match="VOICEVOX TTS failed"):
+                generate_audio_voicevox("test", test_audio_path)
+
+        assert health.breaker.state == "open"
+        assert health.is_available() is False
+
     @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
     @patch("ankicard.core.audio.os.unlink")
     @patch("ankicard.core.audio.subprocess.run")
@@ -416,6 +525,7 @@ class TestGenerateAudioVoicevox:
         mock_unlink,
         _mock_ffmpeg,
         test_audio_path,
+        ffmpeg_outputs,
     ):
         """Test that learner-friendly audio query settings are applied."""
         mock_tmp = Mock()
@@ -435,7 +545,7 @@ class TestGenerateAudioVoicevox:
         mock_synth_response = Mock()
         mock_synth_response.content = b"fake wav"
         mock_post.side_effect = [mock_query_response, mock_synth_response]
-        mock_subproc_run.return_value = Mock(returncode=0)
+        mock_subproc_run.side_effect = ffmpeg_outputs
 
         generate_audio_voicevox("テスト", test_audio_path, speed=0.85)
 
@@ -452,16 +562,15 @@ class TestGenerateAudioVoicevox:
     @patch("ankicard.core.audio.subprocess.run")
     @patch("ankicard.core.audio.requests.post")
     @patch("ankicard.core.audio.tempfile.NamedTemporaryFile")
-    @patch("ankicard.core.audio.os.makedirs")
     def test_generate_audio_voicevox_creates_directory(
         self,
-        mock_makedirs,
         mock_tmpfile,
         mock_post,
         mock_subproc_run,
         mock_unlink,
         _mock_ffmpeg,
         tmp_path,
+        ffmpeg_outputs,
     ):
         """Test that output directory is created if it doesn't exist."""
         nested_path = tmp_path / "nested" / "dir" / "audio.mp3"
@@ -482,10 +591,10 @@ class TestGenerateAudioVoicevox:
         mock_synth_response = Mock()
         mock_synth_response.content = b"fake wav"
         mock_post.side_effect = [mock_query_response, mock_synth_response]
-        mock_subproc_run.return_value = Mock(returncode=0)
+        mock_subproc_run.side_effect = ffmpeg_outputs
 
         generate_audio_voicevox("テスト", str(nested_path))
-        mock_makedirs.assert_called()
+        assert nested_path.exists()
 
     @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
     @patch("ankicard.core.audio.os.unlink")
@@ -524,9 +633,341 @@ class TestGenerateAudioVoicevox:
             generate_audio_voicevox("test", test_audio_path)
 
         # Temp file should still be cleaned up
-        mock_unlink.assert_called_once_with("/tmp/fake.wav")
+        mock_unlink.assert_any_call("/tmp/fake.wav")
+
+
+class TestAudioQueryCache:
+    """Tests for reusing cached audio queries across speeds."""
+
+    @staticmethod
+    def query_response():
+        response = Mock()
+        response.json.return_value = {
+            "accent_phrases": [],
+            "speedScale": 1.0,
+            "intonationScale": 1.0,
+            "prePhonemeLength": 0.1,
+            "postPhonemeLength": 0.1,
+        }
+        return response
+
+    @patch("ankicard.core.audio.requests.get")
+    @patch("ankicard.core.audio.requests.post")
+    def test_second_call_skips_audio_query(self, mock_post, mock_get):
+        """Test that the engine analyzes each sentence once per speaker."""
+        mock_get.return_value = Mock(json=Mock(return_value="0.14.0"))
+        mock_post.return_value = self.query_response()
+
+        first = get_audio_query("テスト", "http://127.0.0.1:50021", 13)
+        second = get_audio_query("テスト", "http://127.0.0.1:50021", 13)
+
+        assert first == second
+        mock_post.assert_called_once()
+        mock_get.assert_called_once()
+
+    @patch("ankicard.core.audio.requests.get")
+    @patch("ankicard.core.audio.requests.post")
+    def test_key_includes_speaker_and_version(self, mock_post, mock_get):
+        """Test that a new speaker or engine version misses the cache."""
+        from ankicard.core.audio import reset_voicevox_health
+
+        mock_get.return_value = Mock(json=Mock(return_value="0.14.0"))
+        mock_post.return_value = self.query_response()
+        url = "http://127.0.0.1:50021"
+
+        get_audio_query("テスト", url, 13)
+        get_audio_query("テスト", url, 2)
+        reset_voicevox_health()
+        mock_get.return_value = Mock(json=Mock(return_value="0.15.0"))
+        get_audio_query("テスト", url, 13)
+
+        assert mock_post.call_count == 3
+
+    @patch("ankicard.core.audio.requests.get")
+    @patch("ankicard.core.audio.requests.post")
+    def test_unknown_version_disables_cache(self, mock_post, mock_get):
+        """Test that queries are not cached without an engine version."""
+        mock_get.side_effect = requests.ConnectionError("down")
+        mock_post.return_value = self.query_response()
+
+        get_audio_query("テスト", "http://127.0.0.1:50021", 13)
+        get_audio_query("テスト", "http://127.0.0.1:50021", 13)
+
+        assert mock_post.call_count == 2
+
+    @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.audio.encode_wav", side_effect=lambda data, path, **kw: path)
+    @patch("ankicard.core.audio.requests.get")
+    @patch("ankicard.core.audio.requests.post")
+    def test_new_speed_only_resynthesizes(
+        self, mock_post, mock_get, _encode, _ffmpeg, tmp_path
+    ):
+        """Test that re-voicing at a new speed calls only /synthesis."""
+        mock_get.return_value = Mock(json=Mock(return_value="0.14.0"))
+        synth = Mock(content=b"wav")
+        mock_post.side_effect = [self.query_response(), synth, synth]
+
+        generate_audio_voicevox("テスト", str(tmp_path / "a.mp3"), speed=0.95)
+        generate_audio_voicevox("テスト", str(tmp_path / "b.mp3"), speed=0.8)
+
+        urls = [c.args[0].rsplit("/", 1)[1] for c in mock_post.call_args_list]
+        assert urls == ["audio_query", "synthesis", "synthesis"]
+        assert mock_post.call_args_list[2].kwargs["json"]["speedScale"] == 0.8
+
+
+def make_wav_zip(payloads):
+    """Build a /multi_synthesis style ZIP with numbered WAV members."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for n, payload in enumerate(payloads):
+            zf.writestr(f"{n + 1:03}.wav", payload)
+    return buffer.getvalue()
+
+
+def zip_response(data):
+    """A streamed /multi_synthesis response that yields ``data`` in pieces."""
+    response = MagicMock()
+    response.iter_content.return_value = (
+        data[i : i + 100] for i in range(0, len(data), 100)
+    )
+    return response
+
+
+class TestGenerateAudioVoicevoxBatch:
+    """Tests for VOICEVOX /multi_synthesis batch synthesis."""
+
+    @staticmethod
+    def fake_post(batches):
+        def post(url, params=None, json=None, timeout=None, stream=False):
+            if url.endswith("/audio_query"):
+                response = Mock()
+                response.json.return_value = {"text": params["text"]}
+                return response
+            assert stream
+            batches.append(json)
+            return zip_response(make_wav_zip([q["text"].encode() for q in json]))
+
+        return post
+
+    @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.audio.encode_wav", side_effect=lambda data, path, **kw: path)
+    @patch("ankicard.core.audio.requests.post")
+    def test_batches_queries_and_keeps_order(self, mock_post, mock_encode, _ffmpeg):
+        """Test that queries are chunked and WAVs map back to their outputs."""
+        batches = []
+        mock_post.side_effect = self.fake_post(batches)
+        texts = ["一", "二", "三", "四", "五"]
+        outputs = [f"out{n}.mp3" for n in range(5)]
+
+        result = generate_audio_voicevox_batch(texts, outputs, batch_size=2)
+
+        assert result == outputs
+        assert [[q["text"] for q in b] for b in batches] == [
+            ["一", "二"],
+            ["三", "四"],
+            ["五"],
+        ]
+        assert all(q["speedScale"] == 0.95 for b in batches for q in b)
+        encoded = {c.args[1]: c.args[0] for c in mock_encode.call_args_list}
+        assert encoded == {o: t.encode() for o, t in zip(outputs, texts)}
+
+    @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.audio.encode_wav", side_effect=lambda data, path, **kw: path)
+    @patch("ankicard.core.audio.requests.post")
+    def test_multi_synthesis_endpoint(self, mock_post, _encode, _ffmpeg):
+        """Test that one /multi_synthesis call replaces per-sentence synthesis."""
+        mock_post.side_effect = self.fake_post([])
+
+        generate_audio_voicevox_batch(["一", "二"], ["a.mp3", "b.mp3"], speaker_id=2)
+
+        urls = [c.args[0] for c in mock_post.call_args_list]
+        assert urls.count("http://127.0.0.1:50021/multi_synthesis") == 1
+        assert not any(url.endswith("/synthesis") for url in urls)
+
+    @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.audio.encode_wav", side_effect=lambda data, path, **kw: path)
+    @patch("ankicard.core.audio.requests.post")
+    def test_wav_count_mismatch(self, mock_post, _encode, _ffmpeg):
+        """Test that a short ZIP is reported instead of misassigning audio."""
+        query = Mock()
+        query.json.return_value = {}
+        synth = zip_response(make_wav_zip([b"wav"]))
+        mock_post.side_effect = [query, query, synth]
+
+        with pytest.raises(Exception, match="VOICEVOX TTS failed"):
+            generate_audio_voicevox_batch(["一", "二"], ["a.mp3", "b.mp3"])
+
+    def test_length_mismatch(self):
+        """Test that texts and outputs must pair up."""
+        with pytest.raises(ValueError):
+            generate_audio_voicevox_batch(["一"], [])
+
+    @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.audio.requests.post")
+    def test_engine_error_records_failure(self, mock_post, _ffmpeg):
+        """Test that connection errors count against the circuit breaker."""
+        mock_post.side_effect = requests.ConnectionError("down")
+
+        with pytest.raises(Exception, match="VOICEVOX TTS failed"):
+            generate_audio_voicevox_batch(["一"], ["a.mp3"])
+        health = get_voicevox_health("http://127.0.0.1:50021")
+        assert health.breaker._failures == 1
+
+
+class TestGenerateAudioVoicevoxVariants:
+    """Tests for one-pass multi-variant VOICEVOX synthesis."""
+
+    @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.audio.encode_wav", side_effect=lambda data, path, **kw: path)
+    @patch("ankicard.core.audio.requests.post")
+    def test_shares_query_per_speaker(self, mock_post, mock_encode, _ffmpeg):
+        """Test that each speaker is analyzed once and each variant synthesized."""
+        synthesized = []
+
+        def post(url, params=None, json=None, timeout=None):
+            response = Mock()
+            if url.endswith("/audio_query"):
+                response.json.return_value = {"speaker": params["speaker"]}
+            else:
+                synthesized.append((params["speaker"], json["speedScale"]))
+                response.content = f"{params['speaker']}@{json['speedScale']}".encode()
+            return response
+
+        mock_post.side_effect = post
+
+        result = generate_audio_voicevox_variants(
+            "テスト",
+            ["a.mp3", "b.mp3", "c.mp3"],
+            [(13, 0.95), (13, 0.7), (2, 0.95)],
+        )
+
+        assert result == ["a.mp3", "b.mp3", "c.mp3"]
+        queries = [c for c in mock_post.call_args_list if "audio_query" in c.args[0]]
+        assert len(queries) == 2
+        assert sorted(synthesized) == [(2, 0.95), (13, 0.7), (13, 0.95)]
+        encoded = {c.args[1]: c.args[0] for c in mock_encode.call_args_list}
+        assert encoded == {
+            "a.mp3": b"13@0.95",
+            "b.mp3": b"13@0.7",
+            "c.mp3": b"2@0.95",
+        }
 
+    def test_length_mismatch(self):
+        """Test that variants and outputs must pair up."""
+        with pytest.raises(ValueError):
+            generate_audio_voicevox_variants("テスト", ["a.mp3"], [])
 
+
+class TestProcessAudioFile:
+    """Tests for cleaning up user-supplied audio."""
+
+    @patch("ankicard.core.audio.encode_wav", side_effect=lambda data, path, **kw: path)
+    @patch("ankicard.core.audio.subprocess.run")
+    def test_decodes_once_then_encodes(self, mock_run, mock_encode):
+        """Test that ffmpeg decodes to a WAV pipe that goes to the encoder."""
+        from ankicard.core.audio import process_audio_file
+
+        mock_run.return_value = Mock(returncode=0, stdout=b"RIFF...")
+
+        assert process_audio_file("in.m4a", "out.mp3") == "out.mp3"
+        args = mock_run.call_args.args[0]
+        assert args[:3] == ["ffmpeg", "-v", "error"]
+        assert args[-3:] == ["-f", "wav", "-"]
+        mock_encode.assert_called_once_with(b"RIFF...", "out.mp3", preset="mp3")
+
+    @patch("ankicard.core.audio.subprocess.run")
+    def test_decode_failure(self, mock_run):
+        """Test that decode errors are reported."""
+        from ankicard.core.audio import process_audio_file
+
+        mock_run.return_value = Mock(returncode=1, stderr=b"bad input")
+
+        with pytest.raises(Exception, match="Audio processing failed"):
+            process_audio_file("in.m4a", "out.mp3")
+
+    @patch("ankicard.core.audio.os.unlink")
+    @patch("ankicard.core.audio.subprocess.run")
+    @patch("ankicard.core.audio.tempfile.NamedTemporaryFile")
+    def test_encode_wav_processes_pcm(
+        self, mock_tmpfile, mock_run, _unlink, ffmpeg_outputs
+    ):
+        """Test that valid WAV input is processed before encoding."""
+        from ankicard.core.audio import encode_wav
+        from ankicard.core.audio_processing import read_wav, write_wav
+        import numpy as np
+
+        mock_tmp = Mock()
+        mock_tmp.name = "/tmp/fake.wav"
+        mock_tmp.__enter__ = Mock(return_value=mock_tmp)
+        mock_tmp.__exit__ = Mock(return_value=False)
+        mock_tmpfile.return_value = mock_tmp
+        mock_run.side_effect = ffmpeg_outputs
+        padded = np.zeros(48000, dtype=np.float32)
+        padded[12000:36000] = 0.3
+
+        encode_wav(write_wav(padded, 24000), "out.mp3")
+
+        samples, _ = read_wav(mock_tmp.write.call_args.args[0])
+        assert len(samples) < len(padded)
+
+
+class TestEncodingPresets:
+    """Tests for preset-driven encoding."""
+
+    @patch("ankicard.core.audio.os.unlink")
+    @patch("ankicard.core.audio.subprocess.run")
+    def test_encode_wav_passes_preset_args(
+        self, mock_run, _unlink, tmp_path, ffmpeg_outputs
+    ):
+        """Test that preset arguments go between the input and output."""
+        from ankicard.core.audio import encode_wav
+
+        mock_run.side_effect = ffmpeg_outputs
+        output = str(tmp_path / "a.ogg")
+
+        encode_wav(b"not wav", output, preset="opus-24k")
+
+        args = mock_run.call_args.args[0]
+        assert args[-1].endswith(".ogg")
+        assert "libopus" in args[args.index("-i") + 2 : -1]
+        assert Path(output).read_bytes() == b"encoded"
+
+    @patch("ankicard.core.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.audio.encode_wav", side_effect=lambda data, path, **kw: path)
+    @patch("ankicard.core.audio.decode_to_wav", return_value=b"wav")
+    @patch("ankicard.core.audio.gTTS")
+    def test_gtts_shares_processing_path(
+        self, mock_gtts, mock_decode, mock_encode, _ffmpeg
+    ):
+        """Test that gTTS MP3 is decoded in memory and encoded like VOICEVOX."""
+        mock_gtts.return_value.write_to_fp.side_effect = lambda fp: fp.write(b"mp3")
+
+        generate_audio("テスト", "out.ogg", preset="opus-24k")
+
+        mock_gtts.return_value.save.assert_not_called()
+        mock_decode.assert_called_once_with(b"mp3")
+        mock_encode.assert_called_once_with(b"wav", "out.ogg", preset="opus-24k")
+
+    @patch("ankicard.core.audio.is_ffmpeg_available", return_value=False)
+    @patch("ankicard.core.audio.gTTS")
+    def test_gtts_preset_needs_ffmpeg(self, _mock_gtts, _ffmpeg):
+        """Test that non-default presets fail clearly without ffmpeg."""
+        with pytest.raises(Exception, match="ffmpeg is required"):
+            generate_audio("テスト", "out.ogg", preset="opus-24k")
+
+    @patch("ankicard.core.audio.subprocess.run")
+    def test_decode_to_wav_uses_pipes(self, mock_run):
+        """Test that decoding never touches a temporary file."""
+        from ankicard.core.audio import decode_to_wav
+
+        mock_run.return_value = Mock(returncode=0, stdout=b"RIFF")
+
+        assert decode_to_wav(b"mp3") == b"RIFF"
+        assert mock_run.call_args.kwargs["input"] == b"mp3"
+        assert "pipe:0" in mock_run.call_args.args[0]
+
+
+@patch("ankicard.core.audio.is_ffmpeg_available", Mock(return_value=False))
 class TestGenerateAudioOpenAI:
     """Tests for OpenAI TTS audio generation."""
 
@@ -544,6 +985,7 @@ class TestGenerateAudioOpenAI:
 
         # Mock streaming response with context manager
         mock_response = Mock()
+        mock_response.read.return_value = b"mp3"
         mock_context_manager = Mock()
         mock_context_manager.__enter__ = Mock(return_value=mock_response)
         mock_context_manager.__exit__ = Mock(return_value=False)
@@ -557,7 +999,9 @@ class TestGenerateAudioOpenAI:
 
         assert result == test_audio_path
         mock_client.audio.speech.with_streaming_response.create.assert_called_once()
-        mock_response.stream_to_file.assert_called_once_with(test_audio_path)
+        mock_response.read.assert_called_once()
+        with open(test_audio_path, "rb") as f:
+            assert f.read() == b"mp3"
 
     @patch("ankicard.core.audio.OpenAI")
     def test_generate_audio_openai_with_options(self, mock_openai, test_audio_path):
@@ -567,6 +1011,7 @@ class TestGenerateAudioOpenAI:
 
         # Mock streaming response with context manager
         mock_response = Mock()
+        mock_response.read.return_value = b"mp3"
         mock_context_manager = Mock()
         mock_context_manager.__enter__ = Mock(return_value=mock_response)
         mock_context_manager.__exit__ = Mock(return_value=False)
@@ -612,6 +1057,7 @@ class TestGenerateAudioOpenAI:
 
         # Mock streaming response with context manager
         mock_response = Mock()
+        mock_response.read.return_value = b"mp3"
         mock_context_manager = Mock()
         mock_context_manager.__enter__ = Mock(return_value=mock_response)
         mock_context_manager.__exit__ = Mock(return_value=False)
@@ -629,6 +1075,30 @@ class TestGenerateAudioOpenAI:
         assert call_kwargs["speed"] == 1.0  # default
 
 
+@patch("ankicard.core.audio.is_ffmpeg_available", Mock(return_value=True))
+class TestGenerateAudioOpenAIEncoding:
+    """Tests for OpenAI TTS through the shared encode path."""
+
+    @patch("ankicard.core.audio.encode_wav", side_effect=lambda data, path, **kw: path)
+    @patch("ankicard.core.audio.OpenAI")
+    def test_requests_wav_and_encodes(self, mock_openai, mock_encode):
+        """Test that WAV is read into memory and encoded with the preset."""
+        response = Mock()
+        response.read.return_value = b"RIFF"
+        stream = mock_openai.return_value.audio.speech.with_streaming_response
+        stream.create.return_value.__enter__ = Mock(return_value=response)
+        stream.create.return_value.__exit__ = Mock(return_value=False)
+
+        generate_audio_openai(
+            "テスト", "out.mp3", api_key="k", preset="speech-32k-mono"
+        )
+
+        assert stream.create.call_args.kwargs["response_format"] == "wav"
+        mock_encode.assert_called_once_with(
+            b"RIFF", "out.mp3", preset="speech-32k-mono"
+        )
+
+
 class TestEnhanceTextForSpeech:
     """Tests for text enhancement for TTS."""
 
@@ -710,6 +1180,106 @@ class TestEnhanceTextForSpeech:
         assert result == original_text
 
 
+def chat_response(content):
+    """Build a chat completion response whose only message has ``content``."""
+    return Mock(choices=[Mock(message=Mock(content=content))])
+
+
+class TestEnhanceTextCache:
+    """Tests for cached and batched speech enhancement."""
+
+    @patch("ankicard.core.audio.OpenAI")
+    def test_cached_enhancement_skips_api(self, mock_openai):
+        """Test that a repeated sentence is answered from the cache."""
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = chat_response("今日は、晴れです。")
+
+        first = enhance_text_for_speech("今日は晴れです", "test-key")
+        second = enhance_text_for_speech("今日は晴れです", "test-key")
+
+        assert first == second == "今日は、晴れです。"
+        create.assert_called_once()
+
+    @patch("ankicard.core.audio.OpenAI")
+    def test_cache_is_keyed_by_model(self, mock_openai):
+        """Test that a different model does not reuse the cached text."""
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = chat_response("今日は、晴れです。")
+
+        enhance_text_for_speech("今日は晴れです", "test-key")
+        enhance_text_for_speech("今日は晴れです", "test-key", model="gpt-4o")
+
+        assert create.call_count == 2
+
+    @patch("ankicard.core.audio.OpenAI")
+    def test_rewritten_text_is_rejected(self, mock_openai):
+        """Test that edits beyond added pauses fall back and are not cached."""
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = chat_response("明日は、雨です。")
+
+        assert enhance_text_for_speech("今日は晴れです", "test-key") == "今日は晴れです"
+        enhance_text_for_speech("今日は晴れです", "test-key")
+        assert create.call_count == 2
+
+    @patch("ankicard.core.audio.OpenAI")
+    def test_batch_uses_one_request(self, mock_openai):
+        """Test that uncached sentences are enhanced in a single JSON call."""
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = chat_response(
+            json.dumps({"sentences": ["猫が、好きです。", "犬も、好きです。"]})
+        )
+
+        result = enhance_texts_for_speech(
+            ["猫が好きです", "犬も好きです", "猫が好きです"], "test-key"
+        )
+
+        assert result == ["猫が、好きです。", "犬も、好きです。", "猫が、好きです。"]
+        create.assert_called_once()
+        kwargs = create.call_args.kwargs
+        assert kwargs["response_format"] == {"type": "json_object"}
+        assert json.loads(kwargs["messages"][1]["content"]) == {
+            "sentences": ["猫が好きです", "犬も好きです"]
+        }
+
+    @patch("ankicard.core.audio.OpenAI")
+    def test_batch_reuses_single_cache(self, mock_openai):
+        """Test that batched and single enhancement share cached results."""
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = chat_response("猫が、好きです。")
+        enhance_text_for_speech("猫が好きです", "test-key")
+        create.return_value = chat_response(
+            json.dumps({"sentences": ["犬も、好きです。"]})
+        )
+
+        result = enhance_texts_for_speech(["猫が好きです", "犬も好きです"], "test-key")
+
+        assert result == ["猫が、好きです。", "犬も、好きです。"]
+        assert json.loads(create.call_args.kwargs["messages"][1]["content"]) == {
+            "sentences": ["犬も好きです"]
+        }
+        assert enhance_text_for_speech("犬も好きです", "test-key") == "犬も、好きです。"
+        assert create.call_count == 2
+
+    @patch("ankicard.core.audio.OpenAI")
+    def test_batch_length_mismatch_keeps_originals(self, mock_openai):
+        """Test that a reply with the wrong sentence count changes nothing."""
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value = chat_response(json.dumps({"sentences": ["一、"]}))
+
+        assert enhance_texts_for_speech(["一", "二"], "test-key") == ["一", "二"]
+
+    @patch("ankicard.core.audio.OpenAI")
+    def test_batch_splits_by_batch_size(self, mock_openai):
+        """Test that large inputs are split into several requests."""
+        create = mock_openai.return_value.chat.completions.create
+        create.side_effect = lambda **kw: chat_response(kw["messages"][1]["content"])
+
+        texts = [f"文{i}" for i in range(5)]
+        assert enhance_texts_for_speech(texts, "test-key", batch_size=2) == texts
+        assert create.call_count == 3
+
+
+@patch("ankicard.core.audio.is_ffmpeg_available", Mock(return_value=False))
 class TestGenerateAudioOpenAIWithEnhancement:
     """Tests for OpenAI TTS with text enhancement."""
 
@@ -727,6 +1297,7 @@ class TestGenerateAudioOpenAIWithEnhancement:
 
         # Mock streaming response
         mock_response = Mock()
+        mock_response.read.return_value = b"mp3"
         mock_context_manager = Mock()
         mock_context_manager.__enter__ = Mock(return_value=mock_response)
         mock_context_manager.__exit__ = Mock(return_value=False)
@@ -758,6 +1329,7 @@ class TestGenerateAudioOpenAIWithEnhancement:
 
         # Mock streaming response
         mock_response = Mock()
+        mock_response.read.return_value = b"mp3"
         mock_context_manager = Mock()
         mock_context_manager.__enter__ = Mock(return_value=mock_response)
         mock_context_manager.__exit__ = Mock(return_value=False)
@@ -0,0 +1,260 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from ankicard.core.audio_processing import (
+    detect_speech,
+    frame_rms,
+    frame_zcr,
+    normalize_loudness,
+    process_wav,
+    read_wav,
+    resample,
+    split_at_silence,
+    to_mono,
+    trim_silence,
+    vad_chunks,
+    write_wav,
+)
+
+
+RATE = 24000
+
+
+def tone(seconds, amplitude=0.5, rate=RATE, freq=440.0):
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def pcm_wav(samples, rate=RATE, width=2):
+    """Encode (frames, channels) float samples as integer PCM WAV."""
+    if samples.ndim == 1:
+        samples = samples[:, np.newaxis]
+    scale = float(1 << (8 * width - 1)) - 1
+    ints = np.round(samples * scale).astype(f"<i{width}")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(ints.tobytes())
+    return buffer.getvalue()
+
+
+class TestWavIO:
+    """Tests for WAV decoding and encoding."""
+
+    def test_round_trip_16bit(self):
+        """Test that 16-bit audio survives a read/write round trip."""
+        signal = tone(0.1)
+        samples, rate = read_wav(write_wav(signal, RATE))
+
+        assert rate == RATE
+        assert samples.shape == (len(signal), 1)
+        assert np.allclose(samples[:, 0], signal, atol=1e-4)
+
+    def test_reads_32bit_stereo(self):
+        """Test that other widths and channel counts are decoded."""
+        stereo = np.stack([tone(0.05), -tone(0.05)], axis=1)
+        samples, _ = read_wav(pcm_wav(stereo, width=4))
+
+        assert samples.shape == stereo.shape
+        assert np.allclose(samples, stereo, atol=1e-6)
+
+    def test_rejects_non_wav(self):
+        """Test that non-WAV data raises wave.Error."""
+        with pytest.raises(wave.Error):
+            read_wav(b"RIFX not a wav file at all")
+
+
+class TestTransforms:
+    """Tests for the individual processing steps."""
+
+    def test_to_mono_averages_channels(self):
+        """Test that channels are averaged."""
+        stereo = np.array([[1.0, 0.0], [0.5, 0.5]], dtype=np.float32)
+        assert np.allclose(to_mono(stereo), [0.5, 0.5])
+
+    def test_resample_length(self):
+        """Test that resampling scales the sample count."""
+        signal = tone(1.0, rate=48000)
+        assert len(resample(signal, 48000, 24000)) == 24000
+        assert resample(signal, 48000, 48000) is signal
+
+    def test_resample_keeps_passband(self):
+        """Test that speech-band tones survive resampling unchanged."""
+        for rate in (16000, 44100, 48000):
+            result = resample(tone(1.0, rate=rate, freq=1000.0), rate, 24000)
+            expected = tone(1.0, freq=1000.0)
+            # Skip the edges, where the filter runs into the zero padding
+            assert np.allclose(result[100:-100], expected[100:-100], atol=1e-3)
+
+    def test_resample_does_not_alias(self):
+        """Test that content above the new Nyquist is filtered, not folded down."""
+        result = resample(tone(1.0, rate=48000, freq=15000.0), 48000, 24000)
+
+        assert np.sqrt(np.mean(result[100:-100] ** 2)) < 1e-3
+
+    def test_frame_rms(self):
+        """Test per-frame RMS including the zero-padded tail."""
+        rms = frame_rms(np.array([1, 1, 0, 0, 1], dtype=np.float32), 2)
+        assert np.allclose(rms, [1.0, 0.0, np.sqrt(0.5)])
+
+    def test_trim_silence_keeps_margin(self):
+        """Test that padding beyond the kept margin is removed."""
+        silence = np.zeros(int(0.5 * RATE), dtype=np.float32)
+        signal = np.concatenate([silence, tone(1.0), silence])
+
+        trimmed = trim_silence(signal, RATE, keep_ms=100)
+
+        assert len(trimmed) == pytest.approx(1.2 * RATE, abs=0.02 * RATE)
+
+    def test_trim_all_silent(self):
+        """Test that an all-silent clip is left alone."""
+        silence = np.zeros(RATE, dtype=np.float32)
+        assert len(trim_silence(silence, RATE)) == RATE
+
+    def test_normalize_reaches_target(self):
+        """Test that quiet speech is raised to the target level."""
+        quiet = tone(1.0, amplitude=0.01)
+        normalized = normalize_loudness(quiet, RATE, target_db=-20)
+
+        rms_db = 20 * np.log10(np.sqrt(np.mean(normalized**2)))
+        assert rms_db == pytest.approx(-20, abs=0.1)
+
+    def test_normalize_limits_peaks(self):
+        """Test that the gain never pushes peaks past the ceiling."""
+        spiky = tone(1.0, amplitude=0.01)
+        spiky[100] = 0.5
+        normalized = normalize_loudness(spiky, RATE, target_db=-20, peak_db=-1)
+
+        assert np.max(np.abs(normalized)) <= 10 ** (-1 / 20) + 1e-6
+
+
+class TestSplitAtSilence:
+    """Tests for splitting long audio at pauses."""
+
+    def test_short_signal_is_one_piece(self):
+        """Test that audio under the limit is not split."""
+        pieces = split_at_silence(tone(2.0), RATE, max_seconds=5)
+        assert len(pieces) == 1
+        assert len(pieces[0]) == int(2.0 * RATE)
+
+    def test_cuts_inside_pause(self):
+        """Test that the cut lands in the pause before the limit."""
+        signal = np.concatenate([tone(3.0), np.zeros(int(0.5 * RATE)), tone(3.0)])
+        pieces = split_at_silence(signal, RATE, max_seconds=4, search_seconds=2)
+
+        assert len(pieces) == 2
+        assert 3.0 * RATE <= len(pieces[0]) <= 3.5 * RATE
+        assert sum(len(p) for p in pieces) == len(signal)
+
+    def test_pieces_respect_limit(self):
+        """Test that continuous sound is still split at the limit."""
+        pieces = split_at_silence(tone(10.0), RATE, max_seconds=3)
+        assert all(len(p) <= 3 * RATE for p in pieces)
+        assert sum(len(p) for p in pieces) == int(10.0 * RATE)
+
+
+def silence(seconds, rate=RATE):
+    return np.zeros(int(seconds * rate), dtype=np.float32)
+
+
+class TestVoiceActivity:
+    """Tests for the energy and zero-crossing VAD."""
+
+    def test_zero_crossing_rate(self):
+        """Test that high-pitched frames cross zero more often."""
+        low = frame_zcr(tone(0.1, freq=200.0), 480)
+        high = frame_zcr(tone(0.1, freq=4000.0), 480)
+        assert high.mean() > 10 * low.mean()
+
+    def test_finds_utterances(self):
+        """Test that speech separated by pauses is found with padding."""
+        signal = np.concatenate([silence(1), tone(2), silence(1), tone(1), silence(1)])
+
+        segments = detect_speech(signal, RATE)
+
+        assert len(segments) == 2
+        (s1, e1), (s2, e2) = segments
+        assert s1 / RATE == pytest.approx(0.9, abs=0.05)
+        assert e1 / RATE == pytest.approx(3.1, abs=0.05)
+        assert s2 / RATE == pytest.approx(3.9, abs=0.05)
+        assert e2 / RATE == pytest.approx(5.1, abs=0.05)
+
+    def test_bridges_short_pauses(self):
+        """Test that a pause shorter than min_silence_ms does not split."""
+        signal = np.concatenate([tone(1), silence(0.1), tone(1)])
+        assert len(detect_speech(signal, RATE)) == 1
+
+    def test_ignores_noise_floor(self):
+        """Test that steady background noise is not mistaken for speech."""
+        rng = np.random.default_rng(0)
+        noise = (0.01 * rng.standard_normal(int(4 * RATE))).astype(np.float32)
+        noise[RATE : 2 * RATE] += tone(1)
+
+        segments = detect_speech(noise, RATE)
+
+        assert len(segments) == 1
+        start, end = segments[0]
+        assert (end - start) / RATE == pytest.approx(1.2, abs=0.1)
+
+    def test_keeps_quiet_fricatives(self):
+        """Test that quiet high-ZCR frames next to speech are kept."""
+        rng = np.random.default_rng(1)
+        hiss = (0.004 * rng.standard_normal(int(0.2 * RATE))).astype(np.float32)
+        signal = np.concatenate([silence(1), hiss, tone(1), silence(1)])
+
+        [(start, _)] = detect_speech(signal, RATE, pad_ms=0)
+
+        assert start / RATE == pytest.approx(1.0, abs=0.05)
+
+    def test_silence_has_no_speech(self):
+        """Test that silence produces no segments."""
+        assert detect_speech(silence(2), RATE) == []
+
+    def test_chunks_pack_utterances(self):
+        """Test that utterances are packed into chunks under the limit."""
+        signal = np.concatenate(
+            [tone(2), silence(1), tone(2), silence(1), tone(2), silence(1), tone(2)]
+        )
+
+        chunks = vad_chunks(signal, RATE, max_seconds=6)
+
+        assert len(chunks) == 2
+        assert all((end - start) <= 6 * RATE for start, end in chunks)
+
+    def test_chunks_split_long_utterance(self):
+        """Test that an utterance over the limit is split."""
+        chunks = vad_chunks(tone(10), RATE, max_seconds=4)
+        assert len(chunks) >= 3
+        assert all((end - start) <= 4 * RATE for start, end in chunks)
+        assert chunks[0][0] == 0 and chunks[-1][1] == 10 * RATE
+
+
+class TestProcessWav:
+    """Tests for the full processing pipeline."""
+
+    def test_stereo_48k_to_trimmed_mono_24k(self):
+        """Test that user audio is downmixed, resampled and trimmed."""
+        silence = np.zeros(int(0.5 * 48000), dtype=np.float32)
+        channel = np.concatenate([silence, tone(1.0, 0.05, rate=48000), silence])
+        data = pcm_wav(np.stack([channel, channel], axis=1), rate=48000)
+
+        samples, rate = read_wav(process_wav(data))
+
+        assert rate == 24000
+        assert samples.shape[1] == 1
+        assert len(samples) == pytest.approx(1.2 * 24000, abs=0.02 * 24000)
+
+    def test_options_disable_steps(self):
+        """Test that trim and normalize can be skipped."""
+        signal = np.concatenate([np.zeros(RATE, dtype=np.float32), tone(0.5, 0.1)])
+        samples, _ = read_wav(
+            process_wav(write_wav(signal, RATE), trim=False, normalize=False)
+        )
+
+        assert len(samples) == len(signal)
+        assert np.max(np.abs(samples)) == pytest.approx(0.1, abs=1e-3)
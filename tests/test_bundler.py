@@ -1,6 +1,14 @@
 import zipfile
 from pathlib import Path
-from ankicard.media.bundler import extract_from_zip, copy_media_file
+from unittest.mock import patch
+from ankicard.media.bundler import (
+    Bundle,
+    copy_media_file,
+    extract_from_zip,
+    extract_member,
+    iter_bundles,
+    read_member_text,
+)
 
 
 class TestExtractFromZip:
@@ -173,3 +181,70 @@ class TestCopyMediaFile:
 
         assert isinstance(result, str)
         assert "new.jpg" in result
+
+
+class TestIterBundles:
+    """Tests for grouping ZIP members into per-card bundles."""
+
+    def test_groups_by_stem(self, tmp_path):
+        """Test that clips, screenshots and text pair up by stem."""
+        zip_path = tmp_path / "deck.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("clips/002.mp3", b"audio2")
+            zf.writestr("clips/001.jpg", b"image1")
+            zf.writestr("clips/001.mp3", b"audio1")
+            zf.writestr("clips/001.txt", "一つ目".encode())
+            zf.writestr("clips/002.png", b"image2")
+            zf.writestr("clips/orphan.jpg", b"image")
+            zf.writestr("__MACOSX/clips/._001.mp3", b"meta")
+            zf.writestr("clips/.DS_Store", b"meta")
+            zf.writestr("readme.md", b"notes")
+
+        with zipfile.ZipFile(zip_path) as zf:
+            bundles = list(iter_bundles(zf))
+
+        assert bundles == [
+            Bundle("clips/002", audio="clips/002.mp3", image="clips/002.png"),
+            Bundle(
+                "clips/001",
+                audio="clips/001.mp3",
+                image="clips/001.jpg",
+                text="clips/001.txt",
+            ),
+        ]
+
+    def test_reads_only_requested_members(self, tmp_path):
+        """Test that grouping leaves member contents unread."""
+        zip_path = tmp_path / "deck.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("a.mp3", b"audio")
+
+        with zipfile.ZipFile(zip_path) as zf:
+            with patch.object(zf, "open", side_effect=AssertionError("read")):
+                assert [b.stem for b in iter_bundles(zf)] == ["a"]
+
+
+class TestMemberAccess:
+    """Tests for reading bundle members."""
+
+    def test_extract_member(self, tmp_path):
+        """Test that a member streams to the destination path."""
+        zip_path = tmp_path / "deck.zip"
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("clips/001.mp3", b"audio" * 1000)
+
+        dest = tmp_path / "anki_1.mp3"
+        with zipfile.ZipFile(zip_path) as zf:
+            assert extract_member(zf, "clips/001.mp3", str(dest)) == str(dest)
+
+        assert dest.read_bytes() == b"audio" * 1000
+        assert not (tmp_path / "clips").exists()
+
+    def test_read_member_text(self, tmp_path):
+        """Test that text members are decoded and stripped."""
+        zip_path = tmp_path / "deck.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("001.txt", "\ufeff猫です\n".encode())
+
+        with zipfile.ZipFile(zip_path) as zf:
+            assert read_member_text(zf, "001.txt") == "猫です"
@@ -1,7 +1,20 @@
+import json
 import os
 from unittest.mock import patch
 
-from ankicard.config.cache import is_cached, mark_cached, clear_cache
+from ankicard.config.cache import (
+    append_fingerprint_entry,
+    artifact_key,
+    clear_cache,
+    file_digest,
+    is_cached,
+    load_audio_query,
+    load_fingerprint_entries,
+    load_enhanced_text,
+    mark_cached,
+    save_audio_query,
+    save_enhanced_text,
+)
 
 
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "test_apkg")
@@ -63,3 +76,101 @@ class TestCache:
                 # Modify the file (different size)
                 test_file.write_bytes(b"modified content")
                 assert is_cached(str(test_file)) is False
+
+
+class TestArtifactKey:
+    """Tests for artifact cache keys."""
+
+    def test_same_inputs_same_key(self):
+        """Test that keys are stable for identical inputs."""
+        assert artifact_key("tts", "voicevox", 13, "テスト") == artifact_key(
+            "tts", "voicevox", 13, "テスト"
+        )
+
+    def test_different_inputs_different_key(self):
+        """Test that any differing input changes the key."""
+        assert artifact_key("tts", 13, "テスト") != artifact_key("tts", 14, "テスト")
+        assert artifact_key("tts", "テスト") != artifact_key("image", "テスト")
+
+    def test_file_digest_tracks_content(self, tmp_path):
+        """Test that file digests depend only on content."""
+        a = tmp_path / "a.mp3"
+        b = tmp_path / "b.mp3"
+        a.write_bytes(b"same")
+        b.write_bytes(b"same")
+        assert file_digest(str(a)) == file_digest(str(b))
+        b.write_bytes(b"different")
+        assert file_digest(str(a)) != file_digest(str(b))
+
+
+class TestAudioQueryCache:
+    """Tests for cached VOICEVOX audio queries."""
+
+    def test_round_trip(self):
+        """Test that a saved query loads back unchanged."""
+        query = {"accent_phrases": [{"text": "テスト"}], "speedScale": 1.0}
+        save_audio_query("abc", query)
+        assert load_audio_query("abc") == query
+
+    def test_missing_key(self):
+        """Test that an uncached key returns None."""
+        assert load_audio_query("missing") is None
+
+    def test_corrupt_entry(self, tmp_path):
+        """Test that an unreadable entry is treated as a miss."""
+        save_audio_query("abc", {})
+        (tmp_path / "audio_queries" / "abc.json").write_text("{not json")
+        assert load_audio_query("abc") is None
+
+
+class TestEnhancedTextCache:
+    """Tests for cached speech-enhanced text."""
+
+    def test_round_trip(self):
+        """Test that saved text loads back unchanged."""
+        save_enhanced_text("abc", "今日は、晴れです。")
+        assert load_enhanced_text("abc") == "今日は、晴れです。"
+
+    def test_missing_key(self):
+        """Test that an uncached key returns None."""
+        assert load_enhanced_text("missing") is None
+
+
+class TestFingerprintEntries:
+    """Tests for the append-only fingerprint index file."""
+
+    def test_later_entry_supersedes(self):
+        """Test that the last line for an id wins."""
+        append_fingerprint_entry({"id": "a", "transcripts": {"ja:text": "一"}})
+        append_fingerprint_entry({"id": "b", "transcripts": {}})
+        append_fingerprint_entry({"id": "a", "transcripts": {"ja:text": "二"}})
+
+        entries = {e["id"]: e for e in load_fingerprint_entries()}
+
+        assert entries["a"]["transcripts"] == {"ja:text": "二"}
+        assert set(entries) == {"a", "b"}
+
+    def test_compacts_superseded_lines(self, tmp_path):
+        """Test that loading rewrites the file with one line per entry."""
+        for n in range(5):
+            append_fingerprint_entry({"id": "a", "count": n})
+        append_fingerprint_entry({"id": "b"})
+
+        load_fingerprint_entries()
+
+        lines = (tmp_path / "fingerprints.jsonl").read_text().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"id": "a", "count": 4},
+            {"id": "b"},
+        ]
+
+    def test_missing_file(self):
+        """Test that a missing index loads as empty."""
+        assert load_fingerprint_entries() == []
+
+    def test_skips_corrupt_lines(self, tmp_path):
+        """Test that a torn line does not lose the rest of the index."""
+        append_fingerprint_entry({"id": "a"})
+        with open(tmp_path / "fingerprints.jsonl", "a") as f:
+            f.write('{"id": "b", "trunc\n')
+        assert [e["id"] for e in load_fingerprint_entries()] == ["a"]
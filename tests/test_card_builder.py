@@ -38,6 +38,20 @@ class TestCreateNote:
         assert note.fields[4] == "[sound:test.mp3]"  # Audio Sentence
         assert note.fields[5] == "abc123"  # ID
 
+    def test_create_note_with_extra_audio(self):
+        """Test that voice variants follow the main audio in one field."""
+        note = create_note(
+            expression="日本語",
+            english="Japanese",
+            reading="日本語[にほんご]",
+            image_filename=None,
+            audio_filename="a.mp3",
+            unique_id="abc123",
+            extra_audio_filenames=["a_2.mp3", "a_3.mp3"],
+        )
+
+        assert note.fields[4] == "[sound:a.mp3][sound:a_2.mp3][sound:a_3.mp3]"
+
     def test_create_note_without_image(self):
         """Test creating a note without an image."""
         note = create_note(
@@ -67,6 +81,16 @@ class TestCreateNote:
         # First 6 fields are populated, remaining 33 are empty padding
         assert all(f == "" for f in note.fields[6:])
 
+    def test_create_note_guid_follows_unique_id(self):
+        """Test that the note GUID is stable for a given ID."""
+        notes = [
+            create_note("猫", "Cat", "猫[ねこ]", None, "a.mp3", unique_id)
+            for unique_id in ("abc123", "abc123", "def456")
+        ]
+
+        assert notes[0].guid == notes[1].guid == genanki.guid_for("abc123")
+        assert notes[0].guid != notes[2].guid
+
 
 class TestCreateDeck:
     """Tests for Anki deck creation."""
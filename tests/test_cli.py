@@ -1,9 +1,12 @@
+import json
 import os
 from pathlib import Path
 
 from click.testing import CliRunner
 from unittest.mock import patch, Mock
-from ankicard.cli import cli
+from ankicard.cli import cli, resolve_voice_variants, synthesize_variants
+from ankicard.media.manager import generate_unique_id
+from ankicard.core.image_processing import get_image_preset
 
 
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "test_apkg")
@@ -92,6 +95,8 @@ class TestAudioCommand:
     ):
         """Test basic audio command falling back to gTTS."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings.load.return_value = mock_settings_instance
         mock_ensure.return_value = False
@@ -109,6 +114,8 @@ class TestAudioCommand:
     def test_audio_with_voicevox(self, mock_ensure, mock_gen_voicevox, mock_settings):
         """Test audio command using VOICEVOX."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.voicevox_url = "http://127.0.0.1:50021"
         mock_settings_instance.voicevox_speaker_id = 13
@@ -130,6 +137,8 @@ class TestAudioCommand:
     ):
         """Test audio command with custom output."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings.load.return_value = mock_settings_instance
         mock_ensure.return_value = False
@@ -147,6 +156,8 @@ class TestAudioCommand:
     ):
         """Test audio command with slow flag (gTTS)."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings.load.return_value = mock_settings_instance
         mock_ensure.return_value = False
@@ -164,6 +175,8 @@ class TestAudioCommand:
     def test_audio_use_gtts_flag(self, mock_ensure, mock_generate_audio, mock_settings):
         """Test --use-gtts skips VOICEVOX entirely."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings.load.return_value = mock_settings_instance
         mock_ensure.return_value = False
@@ -183,6 +196,8 @@ class TestAudioCommand:
     def test_audio_with_speaker_id(self, mock_ensure, mock_gen_voicevox, mock_settings):
         """Test --speaker-id is forwarded to VOICEVOX."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.voicevox_url = "http://127.0.0.1:50021"
         mock_settings_instance.voicevox_speaker_id = 13
@@ -202,6 +217,8 @@ class TestAudioCommand:
     def test_audio_with_speed(self, mock_ensure, mock_gen_voicevox, mock_settings):
         """Test --speed is forwarded to VOICEVOX."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.voicevox_url = "http://127.0.0.1:50021"
         mock_settings_instance.voicevox_speaker_id = 13
@@ -216,6 +233,202 @@ class TestAudioCommand:
         assert call_kwargs["speed"] == 1.0
 
 
+class TestAudioFileCommand:
+    """Tests for audio --file batch generation."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.generate_audio_voicevox_batch")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback", return_value=True)
+    def test_file_uses_batch_synthesis(
+        self, _mock_ensure, mock_batch, mock_settings, tmp_path
+    ):
+        """Test that --file sends every line through one batch call."""
+        mock_settings.load.return_value = Mock(
+            media_dir=str(tmp_path),
+            voicevox_url="http://127.0.0.1:50021",
+            voicevox_speaker_id=13,
+            audio_preset="mp3",
+            image_preset="jpeg",
+        )
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n\n二\n", encoding="utf-8")
+
+        result = self.runner.invoke(cli, ["audio", "--file", str(sentences)])
+
+        assert result.exit_code == 0
+        texts, outputs = mock_batch.call_args.args
+        assert texts == ["一", "二"]
+        assert len(set(outputs)) == 2
+        assert result.output.count("Generated audio:") == 2
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback", return_value=False)
+    def test_file_gtts_fallback(
+        self, _mock_ensure, mock_generate_audio, mock_settings, tmp_path
+    ):
+        """Test that --file falls back to gTTS per sentence."""
+        mock_settings.load.return_value = Mock(
+            media_dir=str(tmp_path), audio_preset="mp3", image_preset="jpeg"
+        )
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n二\n", encoding="utf-8")
+
+        result = self.runner.invoke(cli, ["audio", "--file", str(sentences)])
+
+        assert result.exit_code == 0
+        assert mock_generate_audio.call_count == 2
+
+    def test_requires_sentence_or_file(self):
+        """Test that the command needs some input."""
+        result = self.runner.invoke(cli, ["audio"])
+
+        assert result.exit_code != 0
+        assert "Provide a sentence or --file" in result.output
+
+
+class TestAudioPresetOption:
+    """Tests for --audio-preset."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback", return_value=False)
+    def test_preset_sets_extension(self, _ensure, mock_gen_audio, mock_settings):
+        """Test that the Opus preset writes an .ogg file."""
+        mock_settings.load.return_value = Mock(media_dir="anki_media")
+
+        result = self.runner.invoke(
+            cli, ["audio", "テスト", "--audio-preset", "opus-24k"]
+        )
+
+        assert result.exit_code == 0
+        assert mock_gen_audio.call_args.args[1].endswith(".ogg")
+        assert mock_gen_audio.call_args.kwargs["preset"] == "opus-24k"
+
+    @patch("ankicard.cli.Settings")
+    def test_invalid_configured_preset(self, mock_settings):
+        """Test that a bad AUDIO_PRESET is reported."""
+        mock_settings.load.return_value = Mock(
+            media_dir="anki_media", audio_preset="wav-lossless"
+        )
+
+        result = self.runner.invoke(cli, ["audio", "テスト"])
+
+        assert result.exit_code != 0
+        assert "Unknown audio preset" in result.output
+
+    def test_media_size_report(self, tmp_path, capsys):
+        """Test the average bytes per card line."""
+        from ankicard.cli import echo_media_size
+
+        audio_file = tmp_path / "a.mp3"
+        audio_file.write_bytes(b"x" * 2048)
+        image_file = tmp_path / "a.jpg"
+        image_file.write_bytes(b"x" * 4096)
+
+        echo_media_size([str(audio_file), str(image_file)], [str(audio_file)], 2)
+
+        assert "Media per card: 3.0 KB (audio 1.0 KB)" in capsys.readouterr().out
+
+
+class TestTtsBackendOption:
+    """Tests for --tts-backend."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    def _settings(self, tmp_path, **overrides):
+        values = dict(
+            media_dir=str(tmp_path),
+            output_dir=str(tmp_path),
+            openai_api_key="test-key",
+            gemini_api_key=None,
+            audio_preset="mp3",
+            image_preset="jpeg",
+        )
+        values.update(overrides)
+        return Mock(**values)
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="en")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.audio.generate_audio_openai")
+    @patch("ankicard.cli.export_package")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback")
+    @patch("ankicard.cli.start_warmup")
+    def test_batch_openai_backend(
+        self,
+        mock_warmup,
+        mock_ensure,
+        _mock_export,
+        mock_openai_tts,
+        _mock_furigana,
+        _mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that the OpenAI backend skips VOICEVOX entirely."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_openai_tts.side_effect = lambda text, path, **kw: path
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n二\n", encoding="utf-8")
+
+        result = self.runner.invoke(
+            cli,
+            ["batch", str(sentences), "--no-image", "--tts-backend", "openai"],
+        )
+
+        assert result.exit_code == 0
+        assert mock_openai_tts.call_count == 2
+        assert mock_openai_tts.call_args.kwargs["api_key"] == "test-key"
+        mock_warmup.assert_not_called()
+        mock_ensure.assert_not_called()
+
+    @patch("ankicard.cli.Settings")
+    def test_openai_backend_requires_key(self, mock_settings, tmp_path):
+        """Test that the OpenAI backend needs an API key."""
+        mock_settings.load.return_value = self._settings(tmp_path, openai_api_key=None)
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n", encoding="utf-8")
+
+        result = self.runner.invoke(
+            cli, ["audio", "--file", str(sentences), "--tts-backend", "openai"]
+        )
+
+        assert result.exit_code != 0
+        assert "OPENAI_API_KEY required for OpenAI TTS" in result.output
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.audio.generate_audio_voicevox_batch")
+    def test_audio_file_gtts_backend(
+        self, mock_voicevox_batch, mock_gtts, mock_settings, tmp_path
+    ):
+        """Test that audio --file synthesizes every line with gTTS."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_gtts.side_effect = lambda text, path, **kw: path
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n二\n三\n", encoding="utf-8")
+
+        result = self.runner.invoke(
+            cli, ["audio", "--file", str(sentences), "--tts-backend", "gtts"]
+        )
+
+        assert result.exit_code == 0
+        assert sorted(c.args[0] for c in mock_gtts.call_args_list) == [
+            "一",
+            "三",
+            "二",
+        ]
+        mock_voicevox_batch.assert_not_called()
+
+
 class TestEnsureVoicevoxOrFallback:
     """Tests for ensure_voicevox_or_fallback helper."""
 
@@ -231,6 +444,8 @@ class TestEnsureVoicevoxOrFallback:
     ):
         """Test that Docker not running shows error and falls back to gTTS."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.voicevox_url = "http://127.0.0.1:50021"
         mock_settings.load.return_value = mock_settings_instance
@@ -242,6 +457,118 @@ class TestEnsureVoicevoxOrFallback:
         assert "Docker is not running" in result.output
         mock_gen_audio.assert_called_once()
 
+    @patch("ankicard.cli.audio.is_voicevox_available", return_value=True)
+    def test_engine_state_is_cached(self, mock_available, mock_settings):
+        """Test that repeated checks reuse the cached engine state."""
+        from ankicard.cli import ensure_voicevox_or_fallback
+
+        assert ensure_voicevox_or_fallback(mock_settings, use_gtts=False) is True
+        assert ensure_voicevox_or_fallback(mock_settings, use_gtts=False) is True
+        mock_available.assert_called_once()
+
+    @patch("ankicard.cli.audio.is_voicevox_available")
+    def test_successful_warmup_skips_probe(self, mock_available, mock_settings):
+        """Test that a finished warm-up is trusted without probing again."""
+        from concurrent.futures import Future
+
+        from ankicard.cli import ensure_voicevox_or_fallback
+
+        warmup = Future()
+        warmup.set_result(True)
+
+        assert ensure_voicevox_or_fallback(mock_settings, False, warmup) is True
+        mock_available.assert_not_called()
+
+
+class TestWarmupCommand:
+    """Tests for warmup command."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.warm_up_voicevox", return_value=True)
+    def test_warmup_success(self, mock_warm_up, mock_settings_cls, mock_settings):
+        """Test warming up with the configured speaker."""
+        mock_settings_cls.load.return_value = mock_settings
+
+        result = self.runner.invoke(cli, ["warmup"])
+
+        assert result.exit_code == 0
+        assert "VOICEVOX is ready (speaker 13 loaded)" in result.output
+        mock_warm_up.assert_called_once_with("http://127.0.0.1:50021", 13)
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.warm_up_voicevox", return_value=False)
+    def test_warmup_failure(self, _mock_warm_up, mock_settings_cls, mock_settings):
+        """Test that a failed warm-up exits with an error."""
+        mock_settings_cls.load.return_value = mock_settings
+
+        result = self.runner.invoke(cli, ["warmup", "--speaker-id", "2"])
+
+        assert result.exit_code != 0
+        assert "VOICEVOX is not ready" in result.output
+
+
+class TestSynthesizeSentence:
+    """Tests for TTS dispatch with circuit breaker fallback."""
+
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.audio.generate_audio_voicevox")
+    def test_falls_back_to_gtts_on_failure(
+        self, mock_voicevox, mock_gtts, mock_settings
+    ):
+        """Test that a VOICEVOX failure produces gTTS audio instead."""
+        from ankicard.cli import synthesize_sentence
+
+        mock_voicevox.side_effect = Exception("VOICEVOX TTS failed: timeout")
+        mock_gtts.return_value = "out.mp3"
+
+        result = synthesize_sentence("テスト", "out.mp3", mock_settings, True)
+
+        assert result == "out.mp3"
+        mock_gtts.assert_called_once_with("テスト", "out.mp3", preset="mp3")
+
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.audio.generate_audio_voicevox")
+    def test_open_circuit_skips_voicevox(self, mock_voicevox, mock_gtts, mock_settings):
+        """Test that an open circuit sends cards straight to gTTS."""
+        from ankicard.cli import audio, synthesize_sentence
+
+        health = audio.get_voicevox_health(mock_settings.voicevox_url)
+        for _ in range(health.breaker.failure_threshold):
+            health.record_failure()
+
+        synthesize_sentence("テスト", "out.mp3", mock_settings, True)
+
+        mock_voicevox.assert_not_called()
+        mock_gtts.assert_called_once()
+
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.audio.generate_audio_voicevox")
+    def test_failed_trial_outside_request_recovers(
+        self, mock_voicevox, mock_gtts, mock_settings
+    ):
+        """Test that a half-open trial failing before any request is released."""
+        from ankicard.cli import audio, synthesize_sentence
+
+        health = audio.get_voicevox_health(mock_settings.voicevox_url)
+        for _ in range(health.breaker.failure_threshold):
+            health.record_failure()
+        health.breaker._opened_at -= health.breaker.reset_timeout
+        mock_voicevox.side_effect = RuntimeError("ffmpeg not found")
+
+        synthesize_sentence("テスト", "out.mp3", mock_settings, True)
+
+        assert health.breaker.state == "half_open"
+        mock_voicevox.side_effect = None
+        mock_voicevox.return_value = "out.mp3"
+
+        assert synthesize_sentence("テスト", "out.mp3", mock_settings, True) == (
+            "out.mp3"
+        )
+        assert mock_voicevox.call_count == 2
+
 
 class TestImageCommand:
     """Tests for image command."""
@@ -255,6 +582,8 @@ class TestImageCommand:
     def test_image_basic(self, mock_generate_image, mock_translate, mock_settings):
         """Test basic image command."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.gemini_api_key = "test-key"
         mock_settings.load.return_value = mock_settings_instance
@@ -267,10 +596,30 @@ class TestImageCommand:
         assert result.exit_code == 0
         assert "Generated image:" in result.output
 
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="cat")
+    @patch("ankicard.cli.image.generate_image", return_value="test.webp")
+    def test_image_preset_option(
+        self, mock_generate_image, _mock_translate, mock_settings
+    ):
+        """Test that --image-preset picks the file extension and encoding."""
+        settings = Mock(media_dir="anki_media", gemini_api_key="test-key")
+        settings.image_preset = "jpeg"
+        mock_settings.load.return_value = settings
+
+        result = self.runner.invoke(cli, ["image", "猫", "--image-preset", "webp"])
+
+        assert result.exit_code == 0, result.output
+        output, _key, preset = mock_generate_image.call_args.args[1:]
+        assert output.endswith(".webp")
+        assert preset.name == "webp"
+
     @patch("ankicard.cli.Settings")
     def test_image_no_api_key(self, mock_settings):
         """Test image command without API key."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.gemini_api_key = None
         mock_settings.load.return_value = mock_settings_instance
 
@@ -311,6 +660,8 @@ class TestGenerateCommand:
     ):
         """Test basic generate command with gTTS fallback."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.output_dir = "anki_cards"
         mock_settings_instance.openai_api_key = None
@@ -358,6 +709,8 @@ class TestGenerateCommand:
     ):
         """Test generate command with --no-audio flag."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.output_dir = "anki_cards"
         mock_settings_instance.openai_api_key = None
@@ -380,6 +733,49 @@ class TestGenerateCommand:
         assert result.exit_code == 0
         mock_gen_audio.assert_not_called()
 
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="en")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.create_all_decks")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    def test_generate_audio_sources_get_own_ids(
+        self,
+        _mock_export,
+        mock_create_note,
+        mock_create_all_decks,
+        _mock_furigana,
+        _mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that one sentence with two different --audio clips makes two cards."""
+        settings = Mock()
+        settings.audio_preset = "mp3"
+        settings.image_preset = "jpeg"
+        settings.media_dir = str(tmp_path / "media")
+        settings.output_dir = str(tmp_path / "cards")
+        mock_settings.load.return_value = settings
+        mock_create_all_decks.return_value = [Mock(), Mock(), Mock(), Mock()]
+        (tmp_path / "media").mkdir()
+        clips = []
+        for name, data in (("a.mp3", b"first take"), ("b.mp3", b"second take")):
+            clip = tmp_path / name
+            clip.write_bytes(data)
+            clips.append(clip)
+
+        for clip in clips:
+            result = self.runner.invoke(
+                cli, ["generate", "テスト", "--audio", str(clip), "--no-image"]
+            )
+            assert result.exit_code == 0
+
+        first, second = [c.args for c in mock_create_note.call_args_list]
+        assert first[5] != second[5]
+        assert first[4] != second[4]
+        assert clips[0].read_bytes() == b"first take"
+        assert (tmp_path / "media" / first[4]).read_bytes() == b"first take"
+
     @patch("ankicard.cli.Settings")
     @patch("ankicard.cli.translation.translate_to_english")
     @patch("ankicard.cli.furigana.get_furigana")
@@ -405,6 +801,8 @@ class TestGenerateCommand:
     ):
         """Test generate command using VOICEVOX."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.output_dir = "anki_cards"
         mock_settings_instance.openai_api_key = None
@@ -454,6 +852,8 @@ class TestGenerateCommand:
     ):
         """Test --use-gtts flag skips VOICEVOX."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.output_dir = "anki_cards"
         mock_settings_instance.openai_api_key = None
@@ -493,6 +893,8 @@ class TestTranscribeCommand:
     def test_transcribe_basic(self, mock_validate, mock_transcribe, mock_settings):
         """Test basic transcribe command."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.openai_api_key = "test-key"
         mock_settings.load.return_value = mock_settings_instance
         mock_validate.return_value = True
@@ -507,12 +909,16 @@ class TestTranscribeCommand:
 
         assert result.exit_code == 0
         assert "こんにちは" in result.output
-        mock_transcribe.assert_called_once_with("test.mp3", "test-key", "ja")
+        mock_transcribe.assert_called_once_with(
+            "test.mp3", "test-key", "ja", reuse=True
+        )
 
     @patch("ankicard.cli.Settings")
     def test_transcribe_no_api_key(self, mock_settings):
         """Test transcribe without API key."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.openai_api_key = None
         mock_settings.load.return_value = mock_settings_instance
 
@@ -530,6 +936,8 @@ class TestTranscribeCommand:
     def test_transcribe_invalid_file(self, mock_validate, mock_settings):
         """Test transcribe with invalid audio file."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.openai_api_key = "test-key"
         mock_settings.load.return_value = mock_settings_instance
         mock_validate.return_value = False
@@ -551,6 +959,8 @@ class TestTranscribeCommand:
     ):
         """Test transcribe command with output file."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.openai_api_key = "test-key"
         mock_settings.load.return_value = mock_settings_instance
         mock_validate.return_value = True
@@ -569,6 +979,233 @@ class TestTranscribeCommand:
             assert Path("out.txt").exists()
 
 
+class TestGenerateDuplicateAudio:
+    """Tests for skipping audio that already made a card."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    def _settings(self, tmp_path):
+        settings = Mock()
+        settings.media_dir = str(tmp_path / "media")
+        settings.output_dir = str(tmp_path / "cards")
+        settings.openai_api_key = "test-key"
+        settings.gemini_api_key = None
+        settings.audio_preset = "mp3"
+        settings.image_preset = "jpeg"
+        return settings
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.transcription.fingerprint_file")
+    @patch("ankicard.cli.transcription.transcribe_audio")
+    @patch("ankicard.cli.export_package")
+    def test_duplicate_is_skipped(
+        self, mock_export, mock_transcribe, mock_fingerprint, mock_settings, tmp_path
+    ):
+        """Test that a recorded card is reported instead of rebuilt."""
+        import numpy as np
+        from ankicard.core.fingerprint import get_fingerprint_index
+
+        fingerprint = np.arange(100, dtype=np.uint32)
+        get_fingerprint_index().add(
+            fingerprint, card={"sentence": "前の文", "package": "old.apkg"}
+        )
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_fingerprint.return_value = fingerprint
+        clip = tmp_path / "clip.mp3"
+        clip.write_bytes(b"audio")
+
+        result = self.runner.invoke(
+            cli, ["generate", "--from-audio", str(clip), "--no-image", "--no-audio"]
+        )
+
+        assert result.exit_code == 0
+        assert "Already created a card for this audio: 前の文" in result.output
+        assert "old.apkg" in result.output
+        mock_transcribe.assert_not_called()
+        mock_export.assert_not_called()
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.transcription.fingerprint_file")
+    @patch("ankicard.cli.transcription.transcribe_audio")
+    @patch("ankicard.cli.translation.translate_to_english")
+    @patch("ankicard.cli.furigana.get_furigana")
+    @patch("ankicard.cli.export_package")
+    def test_new_card_is_recorded(
+        self,
+        mock_export,
+        mock_get_furigana,
+        mock_translate,
+        mock_transcribe,
+        mock_fingerprint,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that the card made from new audio is recorded for next time."""
+        import numpy as np
+        from ankicard.core.fingerprint import get_fingerprint_index
+
+        fingerprint = np.arange(100, dtype=np.uint32)
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_fingerprint.return_value = fingerprint
+        mock_transcribe.return_value = "新しい文"
+        mock_translate.return_value = "A new sentence"
+        mock_get_furigana.return_value = "reading"
+        clip = tmp_path / "clip.mp3"
+        clip.write_bytes(b"audio")
+
+        result = self.runner.invoke(
+            cli, ["generate", "--from-audio", str(clip), "--no-image", "--no-audio"]
+        )
+
+        assert result.exit_code == 0, result.output
+        card = get_fingerprint_index().match(fingerprint)["card"]
+        assert card["sentence"] == "新しい文"
+        assert card["package"] == mock_export.call_args.args[2]
+
+
+class TestTranscribeMultiple:
+    """Tests for transcribing several clips at once."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.transcription.transcribe_clips")
+    def test_multiple_files_use_packed_mode(self, mock_clips, mock_settings, tmp_path):
+        """Test that several files and ZIP bundles go to transcribe_clips."""
+        import zipfile
+
+        mock_settings.load.return_value = Mock(openai_api_key="test-key")
+        clip = tmp_path / "one.mp3"
+        clip.write_bytes(b"ID3audio")
+        bundle = tmp_path / "two.zip"
+        with zipfile.ZipFile(bundle, "w") as zf:
+            zf.writestr("card.mp3", b"ID3audio")
+            zf.writestr("card.jpg", b"image")
+        mock_clips.return_value = ["一つ目", "二つ目"]
+
+        result = self.runner.invoke(cli, ["transcribe", str(clip), str(bundle)])
+
+        assert result.exit_code == 0, result.output
+        assert "one.mp3\t一つ目" in result.output
+        assert "two.zip\t二つ目" in result.output
+        paths = mock_clips.call_args.args[0]
+        assert paths[0] == str(clip)
+        assert paths[1].endswith("card.mp3")
+
+
+class TestTranscribeDirectory:
+    """Tests for transcribing a directory to JSON Lines."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    def make_clips(self, tmp_path, names):
+        clip_dir = tmp_path / "clips"
+        clip_dir.mkdir()
+        for name in names:
+            (clip_dir / name).write_bytes(b"ID3audio")
+        return clip_dir
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.transcription.audio_duration", return_value=1.25)
+    @patch("ankicard.cli.transcription.transcribe_audio")
+    def test_writes_one_line_per_file(
+        self, mock_transcribe, _mock_duration, mock_settings, tmp_path
+    ):
+        """Test that each clip gets a JSON line with text, duration, latency."""
+        mock_settings.load.return_value = Mock(openai_api_key="test-key")
+        clip_dir = self.make_clips(tmp_path, ["a.mp3", "b.mp3"])
+        mock_transcribe.side_effect = lambda path, key, language, **kw: Path(path).stem
+        output = tmp_path / "results.jsonl"
+
+        result = self.runner.invoke(
+            cli, ["transcribe", str(clip_dir), "--output", str(output), "--jobs", "2"]
+        )
+
+        assert result.exit_code == 0, result.output
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert sorted((r["file"], r["text"]) for r in records) == [
+            ("a.mp3", "a"),
+            ("b.mp3", "b"),
+        ]
+        assert all(r["duration"] == 1.25 and r["latency"] >= 0 for r in records)
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.transcription.audio_duration", return_value=None)
+    @patch("ankicard.cli.transcription.transcribe_audio", return_value="新しい")
+    def test_resume_skips_recorded_files(
+        self, mock_transcribe, _mock_duration, mock_settings, tmp_path
+    ):
+        """Test that files already in the output are not transcribed again."""
+        mock_settings.load.return_value = Mock(openai_api_key="test-key")
+        clip_dir = self.make_clips(tmp_path, ["a.mp3", "b.mp3"])
+        output = tmp_path / "results.jsonl"
+        output.write_text(
+            json.dumps({"file": "a.mp3", "text": "古い"}, ensure_ascii=False) + "\n",
+            encoding="utf-8",
+        )
+
+        result = self.runner.invoke(
+            cli, ["transcribe", str(clip_dir), "--output", str(output)]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "1 already in" in result.output
+        mock_transcribe.assert_called_once()
+        assert mock_transcribe.call_args.args[0].endswith("b.mp3")
+        lines = output.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["text"] for line in lines] == ["古い", "新しい"]
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.transcription.audio_duration", return_value=None)
+    @patch("ankicard.cli.transcription.transcribe_audio")
+    def test_failures_are_left_for_retry(
+        self, mock_transcribe, _mock_duration, mock_settings, tmp_path
+    ):
+        """Test that a failed file is reported and not written."""
+        mock_settings.load.return_value = Mock(openai_api_key="test-key")
+        clip_dir = self.make_clips(tmp_path, ["a.mp3", "b.mp3"])
+
+        def transcribe(path, key, language, **kw):
+            if path.endswith("b.mp3"):
+                raise Exception("boom")
+            return "ok"
+
+        mock_transcribe.side_effect = transcribe
+        output = tmp_path / "results.jsonl"
+
+        result = self.runner.invoke(
+            cli, ["transcribe", str(clip_dir), "--output", str(output)]
+        )
+
+        assert result.exit_code != 0
+        assert "b.mp3: boom" in result.output
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [r["file"] for r in records] == ["a.mp3"]
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.transcription.audio_duration", return_value=None)
+    @patch("ankicard.cli.transcription.transcribe_audio", return_value="テキスト")
+    def test_streams_to_stdout(
+        self, _mock_transcribe, _mock_duration, mock_settings, tmp_path
+    ):
+        """Test that without --output, stdout holds only JSON lines."""
+        mock_settings.load.return_value = Mock(openai_api_key="test-key")
+        clip_dir = self.make_clips(tmp_path, ["a.mp3"])
+
+        result = CliRunner(mix_stderr=False).invoke(cli, ["transcribe", str(clip_dir)])
+
+        assert result.exit_code == 0, result.stderr
+        assert json.loads(result.stdout) == {
+            "file": "a.mp3",
+            "text": "テキスト",
+            "duration": None,
+            "latency": json.loads(result.stdout)["latency"],
+        }
+
+
 class TestGenerateWithAudio:
     """Tests for generate command with audio transcription."""
 
@@ -602,6 +1239,8 @@ class TestGenerateWithAudio:
     ):
         """Test generate command with --from-audio flag."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.output_dir = "anki_cards"
         mock_settings_instance.openai_api_key = "test-key"
@@ -632,7 +1271,7 @@ class TestGenerateWithAudio:
         assert result.exit_code == 0
         assert "Transcribing: test.mp3" in result.output
         assert "Transcribed: 日本語のテスト" in result.output
-        mock_transcribe.assert_called_once_with("test.mp3", "test-key")
+        mock_transcribe.assert_called_once_with("test.mp3", "test-key", reuse=True)
 
     @patch("ankicard.cli.Settings")
     @patch("ankicard.cli.transcription.transcribe_audio")
@@ -644,6 +1283,7 @@ class TestGenerateWithAudio:
     @patch("ankicard.cli.copy_media_file")
     @patch("ankicard.cli.generate_unique_id")
     @patch("ankicard.cli.generate_media_filenames")
+    @patch("ankicard.cli.audio.is_ffmpeg_available", Mock(return_value=False))
     def test_generate_from_audio_use_original(
         self,
         mock_gen_filenames,
@@ -659,6 +1299,8 @@ class TestGenerateWithAudio:
     ):
         """Test generate with --use-original-audio flag."""
         mock_settings_instance = Mock()
+        mock_settings_instance.audio_preset = "mp3"
+        mock_settings_instance.image_preset = "jpeg"
         mock_settings_instance.media_dir = "anki_media"
         mock_settings_instance.output_dir = "anki_cards"
         mock_settings_instance.openai_api_key = "test-key"
@@ -695,6 +1337,52 @@ class TestGenerateWithAudio:
         assert "Using original audio: test.mp3" in result.output
         mock_copy_media.assert_called_once()
 
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.transcription.transcribe_audio", return_value="テスト")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="test")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="テスト")
+    @patch("ankicard.cli.export_package")
+    @patch("ankicard.cli.copy_media_file")
+    @patch("ankicard.cli.audio.process_audio_file")
+    @patch("ankicard.cli.audio.is_ffmpeg_available", Mock(return_value=True))
+    def test_generate_use_original_processes_audio(
+        self,
+        mock_process,
+        mock_copy_media,
+        _mock_export,
+        _mock_furigana,
+        _mock_translate,
+        _mock_transcribe,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that original audio is cleaned up and re-encoded with ffmpeg."""
+        mock_settings.load.return_value = Mock(
+            media_dir=str(tmp_path),
+            output_dir=str(tmp_path),
+            openai_api_key="k",
+            audio_preset="mp3",
+            image_preset="jpeg",
+        )
+        mock_process.side_effect = lambda source, dest, **kw: dest
+        source = tmp_path / "input.m4a"
+        source.write_bytes(b"fake audio")
+
+        result = self.runner.invoke(
+            cli,
+            [
+                "generate",
+                "--from-audio",
+                str(source),
+                "--use-original-audio",
+                "--no-image",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert mock_process.call_args.args[0] == str(source)
+        mock_copy_media.assert_not_called()
+
     def test_generate_no_input(self):
         """Test generate without sentence or audio."""
         result = self.runner.invoke(cli, ["generate"])
@@ -703,21 +1391,711 @@ class TestGenerateWithAudio:
         assert "Provide <sentence>, --from-audio, or --from-audio-zip" in result.output
 
 
-class TestProcessCommand:
-    """Tests for process command."""
+class TestBatchCommand:
+    """Tests for batch command."""
 
     def setup_method(self):
         self.runner = CliRunner()
-        # Patch cache to use a temp file so tests don't interfere
-        import tempfile
 
-        self._cache_dir = tempfile.mkdtemp()
-        self._cache_patcher_dir = patch(
-            "ankicard.config.cache.CACHE_DIR", Path(self._cache_dir)
-        )
-        self._cache_patcher_file = patch(
-            "ankicard.config.cache.CACHE_FILE",
-            Path(self._cache_dir) / "cache.json",
+    def _settings(self, tmp_path):
+        settings = Mock()
+        settings.media_dir = str(tmp_path / "media")
+        settings.output_dir = str(tmp_path / "cards")
+        settings.openai_api_key = None
+        settings.gemini_api_key = None
+        settings.audio_preset = "mp3"
+        settings.image_preset = "jpeg"
+        return settings
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english")
+    @patch("ankicard.cli.furigana.get_furigana")
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback")
+    def test_batch_builds_one_package(
+        self,
+        mock_ensure,
+        mock_export,
+        mock_create_note,
+        mock_gen_audio,
+        mock_get_furigana,
+        mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that every sentence becomes a note in a single package."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_ensure.return_value = False
+        mock_translate.side_effect = lambda s: f"en:{s}"
+        mock_get_furigana.return_value = "reading"
+        mock_gen_audio.side_effect = lambda s, path, **kw: path
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n\n二\n三\n", encoding="utf-8")
+
+        result = self.runner.invoke(cli, ["batch", str(sentences), "--no-image"])
+
+        assert result.exit_code == 0
+        assert "Processing 3 sentences" in result.output
+        assert "Cards: 3 created, 0 failed" in result.output
+        assert "Media per card:" in result.output
+        assert [c.args[0] for c in mock_create_note.call_args_list] == [
+            "一",
+            "二",
+            "三",
+        ]
+        mock_export.assert_called_once()
+        assert len(mock_export.call_args[0][1]) == 3
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="en")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback", return_value=False)
+    def test_batch_duplicate_lines_get_own_media(
+        self,
+        _mock_ensure,
+        _mock_export,
+        mock_create_note,
+        mock_gen_audio,
+        _mock_furigana,
+        _mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that a repeated line becomes its own card instead of overwriting."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_gen_audio.side_effect = lambda s, path, **kw: path
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n二\n一\n", encoding="utf-8")
+
+        result = self.runner.invoke(cli, ["batch", str(sentences), "--no-image"])
+
+        assert result.exit_code == 0
+        ids = [c.args[5] for c in mock_create_note.call_args_list]
+        assert len(set(ids)) == 3
+        # The first copy keeps the ID the sentence gets anywhere else
+        assert ids[0] == generate_unique_id("一")
+        audio_paths = {c.args[1] for c in mock_gen_audio.call_args_list}
+        assert len(audio_paths) == 3
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english")
+    @patch("ankicard.cli.furigana.get_furigana")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    def test_batch_reports_failures_and_limits(
+        self,
+        mock_export,
+        mock_create_note,
+        mock_get_furigana,
+        mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that failed cards are skipped and provider limits are shown."""
+        from ankicard.core.concurrency import get_limiter, reset_limiters
+
+        reset_limiters()
+        get_limiter("google_translate")
+        mock_settings.load.return_value = self._settings(tmp_path)
+
+        def translate(sentence):
+            if sentence == "悪い":
+                raise Exception("boom")
+            return "ok"
+
+        mock_translate.side_effect = translate
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("良い\n悪い\n", encoding="utf-8")
+
+        result = self.runner.invoke(
+            cli, ["batch", str(sentences), "--no-image", "--no-audio"]
+        )
+        reset_limiters()
+
+        assert result.exit_code == 0
+        assert "Failed: 悪い: boom" in result.output
+        assert "Cards: 1 created, 1 failed" in result.output
+        assert "Provider limits:" in result.output
+        assert "google_translate: limit=4" in result.output
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.image.generate_image")
+    @patch("ankicard.cli.image.generate_images")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    def test_batch_image_grid(
+        self,
+        _mock_export,
+        mock_create_note,
+        mock_generate_images,
+        mock_generate_image,
+        _mock_furigana,
+        mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that --image-grid illustrates cards in groups, skipping failures."""
+        settings = self._settings(tmp_path)
+        settings.gemini_api_key = "gemini-key"
+        mock_settings.load.return_value = settings
+
+        def translate(sentence):
+            if sentence == "悪い":
+                raise Exception("boom")
+            return f"en:{sentence}"
+
+        mock_translate.side_effect = translate
+        mock_generate_images.side_effect = lambda prompts, paths, *args: paths
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n悪い\n三\n四\n五\n", encoding="utf-8")
+
+        result = self.runner.invoke(
+            cli, ["batch", str(sentences), "--no-audio", "--image-grid", "2"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Cards: 4 created, 1 failed" in result.output
+        mock_generate_image.assert_not_called()
+        groups = [c.args[0] for c in mock_generate_images.call_args_list]
+        assert sorted(groups) == [["en:一", "en:三", "en:四"], ["en:五"]]
+        assert mock_generate_images.call_args.args[4] == 2
+        images = [c.args[3] for c in mock_create_note.call_args_list]
+        assert all(name.endswith(".jpg") for name in images)
+
+    @patch("ankicard.cli.Settings")
+    def test_batch_empty_file(self, mock_settings, tmp_path):
+        """Test batch with no sentences."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("\n", encoding="utf-8")
+
+        result = self.runner.invoke(cli, ["batch", str(sentences)])
+
+        assert result.exit_code != 0
+        assert "No sentences found" in result.output
+
+
+class TestBatchBundles:
+    """Tests for batch with a ZIP of clip bundles."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    def _settings(self, tmp_path, api_key="test-key"):
+        settings = Mock()
+        settings.media_dir = str(tmp_path / "media")
+        settings.output_dir = str(tmp_path / "cards")
+        settings.openai_api_key = api_key
+        settings.gemini_api_key = None
+        settings.audio_preset = "mp3"
+        settings.image_preset = "jpeg"
+        (tmp_path / "media").mkdir()
+        return settings
+
+    def _zip(self, tmp_path, members):
+        import zipfile
+
+        path = tmp_path / "clips.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            for name, data in members.items():
+                zf.writestr(name, data)
+        return path
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.start_warmup")
+    @patch("ankicard.cli.transcription.transcribe_audio", return_value="二つ目")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="en")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    def test_bundles_bring_their_media(
+        self,
+        mock_export,
+        mock_create_note,
+        _mock_furigana,
+        _mock_translate,
+        mock_transcribe,
+        mock_warmup,
+        mock_settings,
+        tmp_path,
+        sample_png_bytes,
+    ):
+        """Test that clips and screenshots are used and text read or transcribed."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        bundle = self._zip(
+            tmp_path,
+            {
+                "001.mp3": b"audio1",
+                "001.png": sample_png_bytes,
+                "001.txt": "一つ目".encode(),
+                "002.m4a": b"audio2",
+            },
+        )
+
+        result = self.runner.invoke(cli, ["batch", str(bundle)])
+
+        assert result.exit_code == 0, result.output
+        assert "Processing 2 bundles" in result.output
+        mock_warmup.assert_not_called()
+        mock_transcribe.assert_called_once()
+        assert mock_transcribe.call_args.args[0].endswith(".m4a")
+        notes = mock_create_note.call_args_list
+        assert [c.args[0] for c in notes] == ["一つ目", "二つ目"]
+        # The PNG screenshot is re-encoded to the default JPEG preset
+        assert notes[0].args[3].endswith(".jpg")
+        assert notes[0].args[4].endswith(".mp3")
+        assert notes[1].args[3] is None
+        media = mock_export.call_args[0][1]
+        contents = sorted(Path(p).read_bytes() for p in media)
+        assert contents[:2] == [b"audio1", b"audio2"]
+        assert contents[2].startswith(b"\xff\xd8")
+        assert not list((tmp_path / "media").glob("*.png"))
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback", return_value=False)
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="en")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    def test_text_only_bundle_is_voiced(
+        self,
+        _mock_export,
+        mock_create_note,
+        _mock_furigana,
+        _mock_translate,
+        mock_gen_audio,
+        _mock_ensure,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that a bundle without a clip gets synthesized audio."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_gen_audio.side_effect = lambda s, path, **kw: path
+        bundle = self._zip(tmp_path, {"001.txt": "猫です".encode()})
+
+        result = self.runner.invoke(cli, ["batch", str(bundle), "--use-gtts"])
+
+        assert result.exit_code == 0, result.output
+        assert mock_gen_audio.call_args.args[0] == "猫です"
+        assert mock_create_note.call_args.args[0] == "猫です"
+
+    @patch("ankicard.cli.Settings")
+    def test_transcription_needs_key(self, mock_settings, tmp_path):
+        """Test that clips without text need an OpenAI key."""
+        mock_settings.load.return_value = self._settings(tmp_path, api_key=None)
+        bundle = self._zip(tmp_path, {"001.mp3": b"audio"})
+
+        result = self.runner.invoke(cli, ["batch", str(bundle)])
+
+        assert result.exit_code != 0
+        assert "OPENAI_API_KEY required for transcription" in result.output
+
+
+class TestDedupeMedia:
+    """Tests for the content-addressed media option."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="en")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback", return_value=False)
+    def test_identical_audio_packaged_once(
+        self,
+        _mock_ensure,
+        mock_export,
+        mock_create_note,
+        mock_gen_audio,
+        _mock_furigana,
+        _mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that cards with identical audio reference one stored file."""
+        settings = Mock(
+            media_dir=str(tmp_path / "media"),
+            output_dir=str(tmp_path / "cards"),
+            openai_api_key=None,
+            gemini_api_key=None,
+            audio_preset="mp3",
+            image_preset="jpeg",
+        )
+        (tmp_path / "media").mkdir()
+        mock_settings.load.return_value = settings
+
+        def fake_audio(sentence, path, **kwargs):
+            Path(path).write_bytes(b"same" if sentence != "三" else b"other")
+            return path
+
+        mock_gen_audio.side_effect = fake_audio
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n二\n三\n", encoding="utf-8")
+
+        result = self.runner.invoke(
+            cli, ["batch", str(sentences), "--no-image", "--dedupe-media"]
+        )
+
+        assert result.exit_code == 0, result.output
+        audio_names = [c.args[4] for c in mock_create_note.call_args_list]
+        assert audio_names[0] == audio_names[1] != audio_names[2]
+        assert all(name.startswith("anki_") for name in audio_names)
+        media = mock_export.call_args[0][1]
+        assert len(media) == 2
+        assert all("store" in Path(p).parts for p in media)
+        assert sorted(Path(p).name for p in media) == sorted(set(audio_names))
+
+    def test_process_renames_references(self, tmp_path, monkeypatch):
+        """Test that process rewrites note fields to the stored names."""
+        from ankicard.anki.reader import read_apkg
+
+        monkeypatch.setenv("MEDIA_DIR", str(tmp_path / "media"))
+        monkeypatch.setattr("ankicard.config.cache.CACHE_FILE", tmp_path / "c.json")
+        fixture = os.path.join(FIXTURES_DIR, "anime_durarara___000000097.apkg")
+        output_dir = tmp_path / "output"
+
+        result = self.runner.invoke(
+            cli,
+            ["process", fixture, "--output-dir", str(output_dir), "--dedupe-media"],
+        )
+
+        assert result.exit_code == 0, result.output
+        contents = read_apkg(str(output_dir / "anime_durarara___000000097.apkg"))
+        names = {Path(n).suffix: n for n in contents.media_mapping.values()}
+        assert all(name.startswith("anki_") for name in names.values())
+        fields = contents.notes[0].fields
+        assert fields[3] == f'<img src="{names[".jpg"]}">'
+        assert fields[4] == f"[sound:{names['.mp3']}]"
+
+
+class TestEnhanceSpeechOption:
+    """Tests for --enhance-speech."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    def _settings(self, tmp_path, api_key="test-key"):
+        settings = Mock()
+        settings.media_dir = str(tmp_path / "media")
+        settings.output_dir = str(tmp_path / "cards")
+        settings.openai_api_key = api_key
+        settings.gemini_api_key = None
+        settings.audio_preset = "mp3"
+        settings.image_preset = "jpeg"
+        return settings
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english")
+    @patch("ankicard.cli.furigana.get_furigana")
+    @patch("ankicard.cli.audio.enhance_texts_for_speech")
+    @patch("ankicard.cli.audio.generate_audio")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback")
+    def test_batch_speaks_enhanced_text(
+        self,
+        mock_ensure,
+        mock_export,
+        mock_create_note,
+        mock_gen_audio,
+        mock_enhance,
+        mock_get_furigana,
+        mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that batch enhances once and only the audio uses the result."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_ensure.return_value = False
+        mock_translate.return_value = "en"
+        mock_get_furigana.return_value = "reading"
+        mock_enhance.side_effect = lambda texts, **kw: [f"{t}、" for t in texts]
+        mock_gen_audio.side_effect = lambda s, path, **kw: path
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n二\n", encoding="utf-8")
+
+        result = self.runner.invoke(
+            cli, ["batch", str(sentences), "--no-image", "--enhance-speech"]
+        )
+
+        assert result.exit_code == 0
+        mock_enhance.assert_called_once_with(["一", "二"], api_key="test-key")
+        assert sorted(c.args[0] for c in mock_gen_audio.call_args_list) == [
+            "一、",
+            "二、",
+        ]
+        assert [c.args[0] for c in mock_create_note.call_args_list] == ["一", "二"]
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.enhance_texts_for_speech")
+    @patch("ankicard.cli.audio.generate_audio_voicevox")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback")
+    def test_audio_feeds_enhanced_text_to_voicevox(
+        self, mock_ensure, mock_voicevox, mock_enhance, mock_settings, tmp_path
+    ):
+        """Test that the enhanced sentence is what VOICEVOX reads."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_ensure.return_value = True
+        mock_enhance.return_value = ["今日は、晴れ。"]
+
+        result = self.runner.invoke(cli, ["audio", "今日は晴れ", "--enhance-speech"])
+
+        assert result.exit_code == 0
+        assert mock_voicevox.call_args.args[0] == "今日は、晴れ。"
+
+    @patch("ankicard.cli.Settings")
+    def test_requires_openai_key(self, mock_settings, tmp_path):
+        """Test that enhancement without an OpenAI key aborts."""
+        mock_settings.load.return_value = self._settings(tmp_path, api_key=None)
+
+        result = self.runner.invoke(cli, ["audio", "今日は晴れ", "--enhance-speech"])
+
+        assert result.exit_code != 0
+        assert "OPENAI_API_KEY required for speech enhancement" in result.output
+
+
+class TestMineAudioCommand:
+    """Tests for mine-audio command."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    def _settings(self, tmp_path, api_key="test-key"):
+        settings = Mock()
+        settings.media_dir = str(tmp_path / "media")
+        settings.output_dir = str(tmp_path / "cards")
+        settings.openai_api_key = api_key
+        settings.gemini_api_key = None
+        settings.audio_preset = "mp3"
+        settings.image_preset = "jpeg"
+        return settings
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.cli.transcription.transcribe_segments")
+    @patch("ankicard.cli.clips.cut_clip")
+    @patch("ankicard.cli.translation.translate_to_english")
+    @patch("ankicard.cli.furigana.get_furigana")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    def test_one_card_per_segment(
+        self,
+        mock_export,
+        mock_create_note,
+        mock_get_furigana,
+        mock_translate,
+        mock_cut,
+        mock_segments,
+        _mock_ffmpeg,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that each sentence becomes a card with its own source clip."""
+        from ankicard.core.transcription import Segment
+
+        mock_settings.load.return_value = self._settings(tmp_path)
+        mock_segments.return_value = [
+            Segment(1.0, 3.0, "一つ目。"),
+            Segment(3.0, 3.2, "え"),
+            Segment(4.0, 6.5, "二つ目。"),
+        ]
+        mock_cut.side_effect = lambda src, start, end, path, **kw: path
+        mock_translate.return_value = "en"
+        mock_get_furigana.return_value = "reading"
+        source = tmp_path / "podcast.mp3"
+        source.write_bytes(b"ID3" + b"\x00" * 32)
+
+        result = self.runner.invoke(
+            cli, ["mine-audio", str(source), "--pad", "0.1", "--no-image"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Processing 2 sentences" in result.output
+        assert "Cards: 2 created, 0 failed" in result.output
+        assert sorted(c.args[1:3] for c in mock_cut.call_args_list) == [
+            (0.9, 3.1),
+            (3.9, 6.6),
+        ]
+        assert all(c.args[0] == str(source) for c in mock_cut.call_args_list)
+        assert all(c.kwargs["copy"] for c in mock_cut.call_args_list)
+        notes = mock_create_note.call_args_list
+        assert [c.args[0] for c in notes] == ["一つ目。", "二つ目。"]
+        assert all(c.args[4].endswith(".mp3") for c in notes)
+        mock_export.assert_called_once()
+        assert len(mock_export.call_args[0][1]) == 2
+
+    @patch("ankicard.cli.Settings")
+    def test_requires_openai_key(self, mock_settings, tmp_path):
+        """Test that mining without an OpenAI key aborts."""
+        mock_settings.load.return_value = self._settings(tmp_path, api_key=None)
+        source = tmp_path / "podcast.mp3"
+        source.write_bytes(b"audio")
+
+        result = self.runner.invoke(cli, ["mine-audio", str(source)])
+
+        assert result.exit_code != 0
+        assert "OPENAI_API_KEY required" in result.output
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.is_ffmpeg_available", return_value=False)
+    def test_requires_ffmpeg(self, _mock_ffmpeg, mock_settings, tmp_path):
+        """Test that mining without ffmpeg aborts."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        source = tmp_path / "podcast.mp3"
+        source.write_bytes(b"audio")
+
+        result = self.runner.invoke(cli, ["mine-audio", str(source)])
+
+        assert result.exit_code != 0
+        assert "ffmpeg is required" in result.output
+
+
+class TestVoiceVariants:
+    """Tests for --variant voice variants."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    def test_resolve_fills_defaults(self):
+        """Test that empty variant parts use --speaker-id/--speed or defaults."""
+        settings = Mock(voicevox_speaker_id=13)
+        assert resolve_voice_variants(
+            [(None, None), (None, 0.7), (2, None)], settings, None, None
+        ) == [(13, 0.95), (13, 0.7), (2, 0.95)]
+        assert resolve_voice_variants([(None, None)], settings, 3, 1.1) == [(3, 1.1)]
+
+    def test_invalid_variant(self, tmp_path):
+        """Test that malformed variants are rejected."""
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n", encoding="utf-8")
+
+        result = self.runner.invoke(cli, ["batch", str(sentences), "--variant", "fast"])
+
+        assert result.exit_code != 0
+        assert "SPEAKER:SPEED" in result.output
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="one")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.audio.generate_audio_voicevox_variants")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback", return_value=True)
+    def test_batch_adds_variant_audio(
+        self,
+        _mock_ensure,
+        mock_export,
+        mock_create_note,
+        mock_variants,
+        _mock_furigana,
+        _mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that extra variants are referenced by the note and packaged."""
+        mock_settings.load.return_value = Mock(
+            media_dir=str(tmp_path),
+            output_dir=str(tmp_path),
+            voicevox_url="http://127.0.0.1:50021",
+            voicevox_speaker_id=13,
+            openai_api_key=None,
+            gemini_api_key=None,
+            audio_preset="mp3",
+            image_preset="jpeg",
+        )
+        mock_variants.side_effect = lambda text, outputs, variants, **kw: outputs
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n", encoding="utf-8")
+
+        result = self.runner.invoke(
+            cli,
+            ["batch", str(sentences), "--variant", ":0.95", "--variant", ":0.7"],
+        )
+
+        assert result.exit_code == 0
+        assert mock_variants.call_args.args[2] == [(13, 0.95), (13, 0.7)]
+        extra = mock_create_note.call_args.kwargs["extra_audio_filenames"]
+        assert len(extra) == 1 and extra[0].endswith("_2.mp3")
+        assert len(mock_export.call_args[0][1]) == 2
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="one")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.audio.generate_audio_voicevox_variants")
+    @patch("ankicard.cli.export_package")
+    @patch("ankicard.cli.ensure_voicevox_or_fallback", return_value=True)
+    @patch("ankicard.cli.audio.start_voicevox_warmup")
+    def test_warmup_preloads_variant_speakers(
+        self,
+        mock_warmup,
+        _mock_ensure,
+        _mock_export,
+        mock_variants,
+        _mock_furigana,
+        _mock_translate,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that the background warm-up loads every variant's speaker."""
+        mock_settings.load.return_value = Mock(
+            media_dir=str(tmp_path),
+            output_dir=str(tmp_path),
+            voicevox_url="http://127.0.0.1:50021",
+            voicevox_speaker_id=13,
+            openai_api_key=None,
+            gemini_api_key=None,
+            audio_preset="mp3",
+            image_preset="jpeg",
+        )
+        mock_variants.side_effect = lambda text, outputs, variants, **kw: outputs
+        sentences = tmp_path / "sentences.txt"
+        sentences.write_text("一\n", encoding="utf-8")
+
+        result = self.runner.invoke(
+            cli,
+            ["batch", str(sentences), "--variant", "2:1.0", "--variant", ":0.7"],
+        )
+
+        assert result.exit_code == 0
+        mock_warmup.assert_called_once_with("http://127.0.0.1:50021", [2, 13])
+
+    @patch("ankicard.cli.audio.generate_audio", side_effect=lambda s, p, **kw: p)
+    def test_gtts_fallback_single_track(self, mock_gtts, mock_settings):
+        """Test that without VOICEVOX only the main track is produced."""
+        result = synthesize_variants(
+            "テスト", ["a.mp3", "b.mp3"], mock_settings, False, [(13, 0.95), (13, 0.7)]
+        )
+
+        assert result == ["a.mp3"]
+        mock_gtts.assert_called_once()
+
+
+class TestProcessCommand:
+    """Tests for process command."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+        # Patch cache to use a temp file so tests don't interfere
+        import tempfile
+
+        self._cache_dir = tempfile.mkdtemp()
+        self._cache_patcher_dir = patch(
+            "ankicard.config.cache.CACHE_DIR", Path(self._cache_dir)
+        )
+        self._cache_patcher_file = patch(
+            "ankicard.config.cache.CACHE_FILE",
+            Path(self._cache_dir) / "cache.json",
         )
         self._cache_patcher_dir.start()
         self._cache_patcher_file.start()
@@ -846,3 +2224,131 @@ class TestProcessCommand:
         result = self.runner.invoke(cli, ["process", "--help"])
         assert result.exit_code == 0
         assert "Re-export" in result.output
+
+
+class TestMineVideoCommand:
+    """Tests for mine-video command."""
+
+    def setup_method(self):
+        self.runner = CliRunner()
+
+    def _settings(self, tmp_path):
+        settings = Mock()
+        settings.media_dir = str(tmp_path / "media")
+        settings.output_dir = str(tmp_path / "cards")
+        settings.openai_api_key = None
+        settings.gemini_api_key = "gemini-key"
+        settings.audio_preset = "mp3"
+        settings.image_preset = "jpeg"
+        return settings
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.cli.clips.extract_cue_media")
+    @patch("ankicard.cli.image.generate_image")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="en")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    def test_one_card_per_cue(
+        self,
+        mock_export,
+        mock_create_note,
+        _mock_furigana,
+        _mock_translate,
+        mock_generate_image,
+        mock_extract,
+        _mock_ffmpeg,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that subtitle lines become cards with clips and screenshots."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        video = tmp_path / "episode.mp4"
+        video.write_bytes(b"\x00\x00\x00\x20ftypisom" + b"\x00" * 32)
+        subs = tmp_path / "episode.srt"
+        subs.write_text(
+            "1\n00:00:01,000 --> 00:00:03,000\n一つ目。\n\n"
+            "2\n00:00:03,000 --> 00:00:03,200\nえ\n\n"
+            "3\n00:00:04,000 --> 00:00:06,000\n二つ目。\n",
+            encoding="utf-8",
+        )
+
+        result = self.runner.invoke(
+            cli, ["mine-video", str(video), "--subs", str(subs), "--pad", "0.2"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Processing 2 subtitle lines" in result.output
+        assert "Cards: 2 created, 0 failed" in result.output
+        mock_extract.assert_called_once()
+        source, cues, audio_paths, image_paths = mock_extract.call_args.args
+        assert source == str(video)
+        assert [cue.text for cue in cues] == ["一つ目。", "二つ目。"]
+        assert all(path.endswith(".m4a") for path in audio_paths)
+        assert all(path.endswith(".jpg") for path in image_paths)
+        assert mock_extract.call_args.kwargs == {
+            "copy": True,
+            "pad": 0.2,
+            "image_preset": get_image_preset("jpeg"),
+        }
+        mock_generate_image.assert_not_called()
+        notes = mock_create_note.call_args_list
+        assert [c.args[0] for c in notes] == ["一つ目。", "二つ目。"]
+        assert all(c.args[3].endswith(".jpg") for c in notes)
+        media = mock_export.call_args[0][1]
+        assert set(audio_paths + image_paths) == set(media)
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.clips._audio_codec", Mock(return_value=None))
+    @patch("ankicard.cli.clips.extract_cue_media")
+    @patch("ankicard.cli.translation.translate_to_english", return_value="en")
+    @patch("ankicard.cli.furigana.get_furigana", return_value="reading")
+    @patch("ankicard.cli.create_note")
+    @patch("ankicard.cli.export_package")
+    def test_no_image(
+        self,
+        _mock_export,
+        mock_create_note,
+        _mock_furigana,
+        _mock_translate,
+        mock_extract,
+        _mock_ffmpeg,
+        mock_settings,
+        tmp_path,
+    ):
+        """Test that --no-image skips screenshots."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        video = tmp_path / "episode.mkv"
+        video.write_bytes(b"\x1a\x45\xdf\xa3" + b"\x00" * 32)
+        subs = tmp_path / "episode.srt"
+        subs.write_text("1\n00:00:01,000 --> 00:00:03,000\n一つ目。\n")
+
+        result = self.runner.invoke(
+            cli, ["mine-video", str(video), "--subs", str(subs), "--no-image"]
+        )
+
+        assert result.exit_code == 0, result.output
+        _, _, audio_paths, image_paths = mock_extract.call_args.args
+        assert image_paths == [None]
+        assert audio_paths[0].endswith(".mp3")
+        assert mock_extract.call_args.kwargs["copy"] is False
+        assert mock_create_note.call_args.args[3] is None
+
+    @patch("ankicard.cli.Settings")
+    @patch("ankicard.cli.audio.is_ffmpeg_available", return_value=True)
+    def test_bad_subtitles(self, _mock_ffmpeg, mock_settings, tmp_path):
+        """Test that a subtitle file without cues aborts."""
+        mock_settings.load.return_value = self._settings(tmp_path)
+        video = tmp_path / "episode.mp4"
+        video.write_bytes(b"video")
+        subs = tmp_path / "episode.srt"
+        subs.write_text("nothing here")
+
+        result = self.runner.invoke(
+            cli, ["mine-video", str(video), "--subs", str(subs)]
+        )
+
+        assert result.exit_code != 0
+        assert "No subtitle cues found" in result.output
@@ -0,0 +1,185 @@
+import os
+import re
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from ankicard.core.clips import clip_extension, cut_clip, extract_cue_media
+from ankicard.core.image_processing import get_image_preset
+from ankicard.core.transcription import Segment
+
+
+def _final(cmd):
+    """Map ffmpeg's temporary output names back to their destinations."""
+    return [re.sub(r"^\.(.+)\.\d+-\d+\.tmp(\.\w+)$", r"\1\2", arg) for arg in cmd]
+
+
+class TestClipExtension:
+    """Tests for choosing a stream-copy container."""
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            (b"ID3\x04\x00\x00\x00\x00\x00\x00", "mp3"),
+            (b"RIFF\x24\x00\x00\x00WAVEfmt ", "wav"),
+            (b"OggS\x00\x02\x00\x00", "ogg"),
+            (b"\x00\x00\x00\x20ftypisom\x00\x00", "m4a"),
+        ],
+    )
+    def test_copyable_sources(self, header, expected, tmp_path):
+        """Test that the clip keeps the source's audio container."""
+        source = tmp_path / "source.bin"
+        source.write_bytes(header + b"\x00" * 32)
+        assert clip_extension(str(source)) == expected
+
+    @patch("ankicard.core.clips._audio_codec", return_value=None)
+    def test_unknown_source_is_reencoded(self, _mock_codec, tmp_path):
+        """Test that a source without a copyable container needs re-encoding."""
+        source = tmp_path / "source.mkv"
+        source.write_bytes(b"\x1a\x45\xdf\xa3" + b"\x00" * 32)
+        assert clip_extension(str(source)) is None
+
+    @pytest.mark.parametrize(
+        "codec, expected", [("aac", "m4a"), ("opus", "ogg"), ("ac3", None)]
+    )
+    def test_mkv_follows_audio_codec(self, codec, expected, tmp_path):
+        """Test that MKV audio is copied when a clip container can hold it."""
+        source = tmp_path / "episode.mkv"
+        source.write_bytes(b"\x1a\x45\xdf\xa3" + b"\x00" * 32)
+        probe = subprocess.CompletedProcess([], 0, f"{codec}\n", "")
+
+        with (
+            patch("ankicard.core.clips.shutil.which", return_value="/usr/bin/ffprobe"),
+            patch("ankicard.core.clips.subprocess.run", return_value=probe),
+        ):
+            assert clip_extension(str(source)) == expected
+
+
+class TestCutClip:
+    """Tests for cutting clips with ffmpeg."""
+
+    @patch("ankicard.core.clips.subprocess.run")
+    def test_stream_copy(self, mock_run, ffmpeg_outputs):
+        """Test that clips are cut by seeking the input and copying audio."""
+        mock_run.side_effect = ffmpeg_outputs
+
+        assert cut_clip("talk.mp4", 12.3456, 15.0, "clip.m4a") == "clip.m4a"
+
+        cmd = _final(mock_run.call_args.args[0])
+        assert cmd.index("-ss") < cmd.index("-i")
+        assert cmd[cmd.index("-ss") + 1] == "12.346"
+        assert cmd[cmd.index("-t") + 1] == "2.654"
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+        assert "-vn" in cmd
+        assert cmd[-1] == "clip.m4a"
+        assert os.path.exists("clip.m4a")
+
+    @patch("ankicard.core.clips.subprocess.run")
+    def test_padding_clamped_at_start(self, mock_run, ffmpeg_outputs):
+        """Test that a negative start (from padding) seeks to zero."""
+        mock_run.side_effect = ffmpeg_outputs
+
+        cut_clip("talk.mp3", -0.2, 1.0, "clip.mp3")
+
+        cmd = _final(mock_run.call_args.args[0])
+        assert cmd[cmd.index("-ss") + 1] == "0.000"
+
+    @patch("ankicard.core.clips.subprocess.run")
+    def test_reencode(self, mock_run, ffmpeg_outputs):
+        """Test that copy=False encodes the clip as MP3."""
+        mock_run.side_effect = ffmpeg_outputs
+
+        cut_clip("talk.mkv", 1.0, 2.0, "clip.mp3", copy=False)
+
+        cmd = _final(mock_run.call_args.args[0])
+        assert cmd[cmd.index("-c:a") + 1] == "libmp3lame"
+
+    @patch("ankicard.core.clips.subprocess.run")
+    def test_failure(self, mock_run):
+        """Test that an ffmpeg error is reported."""
+        mock_run.return_value = subprocess.CompletedProcess([], 1, b"", b"bad input")
+
+        with pytest.raises(Exception, match="Clip extraction failed: bad input"):
+            cut_clip("talk.mp3", 0.0, 1.0, "clip.mp3")
+
+
+class TestExtractCueMedia:
+    """Tests for batched clip and screenshot extraction."""
+
+    @patch("ankicard.core.clips.convert_image_file")
+    @patch("ankicard.core.clips.subprocess.run")
+    def test_batches_seeked_inputs(self, mock_run, mock_convert, ffmpeg_outputs):
+        """Test that cues share ffmpeg runs, each output reading a seeked input."""
+        mock_run.side_effect = ffmpeg_outputs
+        mock_convert.side_effect = lambda src, dst, preset: Path(dst).write_bytes(b"")
+        cues = [Segment(10.0 * n, 10.0 * n + 2, str(n)) for n in range(1, 4)]
+
+        extract_cue_media(
+            "episode.mp4",
+            cues,
+            ["a1.m4a", "a2.m4a", "a3.m4a"],
+            ["i1.jpg", None, "i3.jpg"],
+            pad=0.5,
+            cues_per_run=2,
+        )
+
+        assert mock_run.call_count == 2
+        first = _final(mock_run.call_args_list[0].args[0])
+        assert first.count("-i") == 3
+        seeks = [first[i + 1] for i, arg in enumerate(first) if arg == "-ss"]
+        assert seeks == ["9.500", "11.000", "19.500"]
+        maps = [first[i + 1] for i, arg in enumerate(first) if arg == "-map"]
+        assert maps == ["0:a:0", "1:v:0", "2:a:0"]
+        assert first[first.index("1:v:0") + 1 : first.index("1:v:0") + 3] == [
+            "-frames:v",
+            "1",
+        ]
+        assert first[-1] == "a2.m4a"
+        assert os.path.exists("a2.m4a") and os.path.exists("i3.jpg")
+        assert [c.args[1] for c in mock_convert.call_args_list] == ["i1.jpg", "i3.jpg"]
+
+    @patch("ankicard.core.clips.convert_image_file")
+    @patch("ankicard.core.clips.subprocess.run")
+    def test_frames_follow_image_preset(self, mock_run, mock_convert, ffmpeg_outputs):
+        """Test that screenshots are scaled to the preset and encoded by it."""
+        mock_run.side_effect = ffmpeg_outputs
+        preset = get_image_preset("webp-small")
+
+        extract_cue_media(
+            "episode.mp4",
+            [Segment(1.0, 3.0, "a")],
+            ["a.m4a"],
+            ["i.webp"],
+            image_preset=preset,
+        )
+
+        cmd = mock_run.call_args.args[0]
+        frame = cmd[cmd.index("1:v:0") + 1 :]
+        assert frame[frame.index("-c:v") + 1] == "png"
+        assert "min(iw,480)" in frame[frame.index("-vf") + 1]
+        source, output, used = mock_convert.call_args.args
+        assert source.endswith(".png") and source == frame[-1]
+        assert (output, used) == ("i.webp", preset)
+
+    @patch("ankicard.core.clips.subprocess.run")
+    def test_audio_only(self, mock_run, ffmpeg_outputs):
+        """Test that without screenshot paths only audio is mapped."""
+        mock_run.side_effect = ffmpeg_outputs
+
+        extract_cue_media(
+            "episode.mkv", [Segment(1.0, 2.0, "a")], ["a.mp3"], copy=False
+        )
+
+        cmd = _final(mock_run.call_args.args[0])
+        assert cmd.count("-i") == 1
+        assert cmd[cmd.index("-c:a") + 1] == "libmp3lame"
+
+    @patch("ankicard.core.clips.subprocess.run")
+    def test_failure(self, mock_run):
+        """Test that an ffmpeg error is reported."""
+        mock_run.return_value = subprocess.CompletedProcess([], 1, b"", b"no stream")
+
+        with pytest.raises(Exception, match="Clip extraction failed: no stream"):
+            extract_cue_media("episode.mp4", [Segment(1.0, 2.0, "a")], ["a.m4a"])
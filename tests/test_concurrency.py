@@ -0,0 +1,239 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from ankicard.core.concurrency import (
+    AdaptiveLimiter,
+    SingleFlight,
+    coalesce_file,
+    coalesced_count,
+    get_limiter,
+    is_overload_error,
+    limiter_stats,
+    reset_limiters,
+)
+
+
+class TestIsOverloadError:
+    """Tests for rate-limit and timeout detection."""
+
+    def test_requests_timeout(self):
+        """Test that requests timeouts count as overload."""
+        assert is_overload_error(requests.Timeout()) is True
+
+    def test_http_429(self):
+        """Test that an HTTP 429 response counts as overload."""
+        response = Mock(status_code=429)
+        assert is_overload_error(requests.HTTPError(response=response)) is True
+
+    def test_status_code_attribute(self):
+        """Test that SDK errors exposing status_code=429 count as overload."""
+        exc = Exception("rate limited")
+        exc.status_code = 429
+        assert is_overload_error(exc) is True
+
+    def test_wrapped_cause(self):
+        """Test that overload is detected through a wrapping exception."""
+        try:
+            try:
+                raise requests.Timeout()
+            except requests.Timeout as e:
+                raise Exception("VOICEVOX TTS failed") from e
+        except Exception as wrapped:
+            assert is_overload_error(wrapped) is True
+
+    def test_other_errors(self):
+        """Test that ordinary failures are not treated as overload."""
+        response = Mock(status_code=500)
+        assert is_overload_error(ValueError("bad")) is False
+        assert is_overload_error(requests.HTTPError(response=response)) is False
+
+
+class TestAdaptiveLimiter:
+    """Tests for AIMD limit adjustment."""
+
+    def test_initial_limit(self):
+        """Test that the limiter starts at its initial limit."""
+        limiter = AdaptiveLimiter("test", initial=3)
+        assert limiter.limit == 3
+
+    def test_additive_increase_when_latency_stable(self):
+        """Test that stable latency grows the limit by one per window."""
+        limiter = AdaptiveLimiter("test", initial=2, maximum=8, window=5)
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release(0.1)
+        assert limiter.limit == 4
+
+    def test_no_increase_when_latency_rises(self):
+        """Test that rising p95 latency holds the limit."""
+        limiter = AdaptiveLimiter("test", initial=2, window=5)
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(0.1)
+        assert limiter.limit == 3
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(1.0)
+        assert limiter.limit == 3
+
+    def test_increase_capped_at_maximum(self):
+        """Test that the limit never exceeds the maximum."""
+        limiter = AdaptiveLimiter("test", initial=2, maximum=3, window=1)
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release(0.1)
+        assert limiter.limit == 3
+
+    def test_multiplicative_decrease_on_overload(self):
+        """Test that overload halves the limit."""
+        limiter = AdaptiveLimiter("test", initial=8, minimum=1)
+        limiter.acquire()
+        limiter.release(0.1, overloaded=True)
+        assert limiter.limit == 4
+        assert limiter.stats()["decreases"] == 1
+
+    def test_decrease_floored_at_minimum(self):
+        """Test that the limit never drops below the minimum."""
+        limiter = AdaptiveLimiter("test", initial=2, minimum=1)
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(0.1, overloaded=True)
+        assert limiter.limit == 1
+
+    def test_slot_records_overload(self):
+        """Test that an overload error raised inside a slot lowers the limit."""
+        limiter = AdaptiveLimiter("test", initial=4)
+        with pytest.raises(requests.Timeout):
+            with limiter.slot():
+                raise requests.Timeout()
+        assert limiter.limit == 2
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_slot_blocks_beyond_limit(self):
+        """Test that callers wait while the limit is reached."""
+        limiter = AdaptiveLimiter("test", initial=1)
+        limiter.acquire()
+        entered = threading.Event()
+
+        def worker():
+            with limiter.slot():
+                entered.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not entered.wait(0.1)
+        limiter.release(0.1)
+        assert entered.wait(1)
+        thread.join()
+
+
+class TestLimiterRegistry:
+    """Tests for shared per-provider limiters."""
+
+    def setup_method(self):
+        reset_limiters()
+
+    def teardown_method(self):
+        reset_limiters()
+
+    def test_get_limiter_is_shared(self):
+        """Test that the same provider returns the same limiter."""
+        assert get_limiter("voicevox") is get_limiter("voicevox")
+
+    def test_limiter_stats_lists_used_providers(self):
+        """Test that stats include each provider used so far."""
+        get_limiter("gemini")
+        get_limiter("whisper")
+        stats = limiter_stats()
+        assert list(stats) == ["gemini", "whisper"]
+        assert stats["gemini"]["limit"] == 2
+
+
+class TestSingleFlight:
+    """Tests for in-flight request coalescing."""
+
+    def test_concurrent_calls_share_one_result(self):
+        """Test that concurrent calls with one key run the work once."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait(1)
+            return "result"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("k", work)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        while flight.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["result"] * 4
+
+    def test_sequential_calls_run_again(self):
+        """Test that a finished key is not cached."""
+        flight = SingleFlight()
+        calls = []
+        flight.do("k", lambda: calls.append(1))
+        flight.do("k", lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_error_propagates_and_clears_key(self):
+        """Test that the leader's error is raised and the key is released."""
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            flight.do("k", fail)
+        assert flight.do("k", lambda: "ok") == "ok"
+
+    def test_coalesce_file_copies_to_each_path(self, tmp_path):
+        """Test that a waiting caller receives a copy at its own path."""
+        release = threading.Event()
+        started = threading.Event()
+
+        def produce(path):
+            started.set()
+            release.wait(1)
+            with open(path, "w") as f:
+                f.write("audio")
+            return path
+
+        first = str(tmp_path / "a.mp3")
+        second = str(tmp_path / "out" / "b.mp3")
+        results = {}
+        leader = threading.Thread(
+            target=lambda: results.update(a=coalesce_file("same", first, produce))
+        )
+        leader.start()
+        started.wait(1)
+        before = coalesced_count()
+        follower = threading.Thread(
+            target=lambda: results.update(
+                b=coalesce_file("same", second, lambda p: pytest.fail("ran twice"))
+            )
+        )
+        follower.start()
+        while coalesced_count() == before:
+            time.sleep(0.001)
+        release.set()
+        leader.join()
+        follower.join()
+
+        assert results == {"a": first, "b": second}
+        assert (tmp_path / "out" / "b.mp3").read_text() == "audio"
@@ -0,0 +1,203 @@
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+
+import pytest
+
+from ankicard.core.audio import start_voicevox_docker
+from ankicard.core.container import ContainerClient, find_socket
+
+
+class FakeEngine:
+    """In-memory Docker Engine API state served over a Unix socket."""
+
+    def __init__(self):
+        self.containers = {}
+        self.images = set()
+        self.requests = []
+        self.version = {"Components": [{"Name": "Engine"}]}
+
+
+def make_handler(engine):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=None):
+            data = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            engine.requests.append(("GET", self.path))
+            path = self.path.split("/", 2)[2]
+            if path == "_ping":
+                self._send(200, "OK")
+            elif path == "version":
+                self._send(200, engine.version)
+            elif path.startswith("containers/") and path.endswith("/json"):
+                name = path.split("/")[1]
+                if name in engine.containers:
+                    self._send(200, {"State": {"Status": engine.containers[name]}})
+                else:
+                    self._send(404, {"message": "no such container"})
+            else:
+                self._send(404)
+
+        def do_POST(self):
+            engine.requests.append(("POST", self.path))
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            path = self.path.split("/", 2)[2]
+            if path.startswith("containers/create"):
+                if body["Image"] not in engine.images:
+                    self._send(404, {"message": "no such image"})
+                    return
+                name = path.split("name=")[1]
+                engine.containers[name] = "created"
+                self._send(201, {"Id": "abc"})
+            elif path.startswith("images/create"):
+                engine.images.add("voicevox/voicevox_engine:cpu-latest")
+                self._send(200)
+            elif path.startswith("containers/") and path.endswith("/start"):
+                name = path.split("/")[1]
+                if name not in engine.containers:
+                    self._send(404)
+                    return
+                already = engine.containers[name] == "running"
+                engine.containers[name] = "running"
+                self._send(304 if already else 204)
+            else:
+                self._send(404)
+
+    return Handler
+
+
+@pytest.fixture
+def fake_engine(tmp_path):
+    engine = FakeEngine()
+    socket_path = str(tmp_path / "docker.sock")
+    server = socketserver.ThreadingUnixStreamServer(socket_path, make_handler(engine))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    engine.socket_path = socket_path
+    yield engine
+    server.shutdown()
+    server.server_close()
+
+
+PORTS = {"50021/tcp": ("127.0.0.1", "50021")}
+
+
+class TestFindSocket:
+    """Tests for API socket discovery."""
+
+    def test_docker_host_env(self, fake_engine, monkeypatch):
+        """Test that DOCKER_HOST takes precedence."""
+        monkeypatch.setenv("DOCKER_HOST", f"unix://{fake_engine.socket_path}")
+        assert find_socket() == fake_engine.socket_path
+
+    def test_ignores_non_socket_paths(self, tmp_path, monkeypatch):
+        """Test that regular files are not mistaken for sockets."""
+        regular = tmp_path / "docker.sock"
+        regular.write_text("")
+        monkeypatch.setenv("DOCKER_HOST", f"unix://{regular}")
+        with patch("ankicard.core.container.Path.is_socket", return_value=False):
+            assert find_socket() is None
+
+
+class TestContainerClient:
+    """Tests for the Engine API client."""
+
+    def test_ping(self, fake_engine):
+        """Test that ping reaches the daemon."""
+        assert ContainerClient(fake_engine.socket_path).ping() is True
+
+    def test_ping_missing_socket(self, tmp_path):
+        """Test that an unreachable socket reports not running."""
+        assert ContainerClient(str(tmp_path / "missing.sock")).ping() is False
+
+    def test_runtime_docker(self, fake_engine):
+        """Test Docker detection from version info."""
+        assert ContainerClient(fake_engine.socket_path).runtime() == "docker"
+
+    def test_runtime_podman(self, fake_engine):
+        """Test Podman detection from version components."""
+        fake_engine.version = {"Components": [{"Name": "Podman Engine"}]}
+        assert ContainerClient(fake_engine.socket_path).runtime() == "podman"
+
+    def test_container_status_missing(self, fake_engine):
+        """Test that a missing container has no status."""
+        client = ContainerClient(fake_engine.socket_path)
+        assert client.container_status("voicevox") is None
+
+    def test_ensure_running_starts_stopped_container(self, fake_engine):
+        """Test that an existing stopped container is started."""
+        fake_engine.containers["voicevox"] = "exited"
+        client = ContainerClient(fake_engine.socket_path)
+
+        assert client.ensure_running("voicevox", "img", PORTS) is True
+        assert fake_engine.containers["voicevox"] == "running"
+        assert not any("create" in path for _, path in fake_engine.requests)
+
+    def test_ensure_running_creates_and_pulls(self, fake_engine):
+        """Test that a missing container is created, pulling the image first."""
+        client = ContainerClient(fake_engine.socket_path)
+
+        assert (
+            client.ensure_running(
+                "voicevox", "voicevox/voicevox_engine:cpu-latest", PORTS
+            )
+            is True
+        )
+        assert fake_engine.containers["voicevox"] == "running"
+        assert any("images/create" in path for _, path in fake_engine.requests)
+
+    def test_ensure_running_already_running(self, fake_engine):
+        """Test that a running container needs no start call."""
+        fake_engine.containers["voicevox"] = "running"
+        client = ContainerClient(fake_engine.socket_path)
+
+        assert client.ensure_running("voicevox", "img", PORTS) is True
+        assert all(method == "GET" for method, _ in fake_engine.requests)
+
+
+class TestStartVoicevoxViaSocket:
+    """Tests for starting VOICEVOX through the API socket."""
+
+    @patch("ankicard.core.audio.subprocess.run")
+    @patch("ankicard.core.audio.time.sleep")
+    @patch("ankicard.core.audio.is_voicevox_available")
+    def test_start_uses_socket_not_cli(
+        self, mock_available, _mock_sleep, mock_run, fake_engine, monkeypatch
+    ):
+        """Test that the socket client replaces docker CLI calls."""
+        monkeypatch.setattr(
+            "ankicard.core.container.find_socket", lambda: fake_engine.socket_path
+        )
+        fake_engine.containers["voicevox"] = "exited"
+        mock_available.side_effect = [False, True]
+
+        assert start_voicevox_docker() is True
+        assert fake_engine.containers["voicevox"] == "running"
+        mock_run.assert_not_called()
+
+
+class TestWaitForVoicevox:
+    """Tests for readiness polling."""
+
+    @patch("ankicard.core.audio.time.sleep")
+    @patch("ankicard.core.audio.is_voicevox_available")
+    def test_backs_off_exponentially(self, mock_available, mock_sleep):
+        """Test that poll intervals double up to the cap."""
+        from ankicard.core.audio import wait_for_voicevox
+
+        mock_available.side_effect = [False] * 6 + [True]
+
+        assert wait_for_voicevox(initial_delay=0.1, max_delay=1.0) is True
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert delays == pytest.approx([0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
@@ -0,0 +1,35 @@
+import pytest
+
+from ankicard.core.encoding import DEFAULT_PRESET, ENCODING_PRESETS, get_preset
+
+
+class TestGetPreset:
+    """Tests for encoding preset lookup."""
+
+    def test_default(self):
+        """Test that no name selects the default MP3 preset."""
+        preset = get_preset()
+        assert preset.name == DEFAULT_PRESET
+        assert preset.extension == "mp3"
+        assert preset.ffmpeg_args == ()
+
+    def test_speech_mono(self):
+        """Test the low-bitrate mono MP3 preset."""
+        args = get_preset("speech-32k-mono").ffmpeg_args
+        assert args[args.index("-ac") + 1] == "1"
+        assert args[args.index("-b:a") + 1] == "32k"
+
+    def test_opus_uses_ogg(self):
+        """Test that the Opus preset writes .ogg files."""
+        preset = get_preset("opus-24k")
+        assert preset.extension == "ogg"
+        assert "libopus" in preset.ffmpeg_args
+
+    def test_unknown_preset(self):
+        """Test that unknown names list the available presets."""
+        with pytest.raises(ValueError, match="speech-32k-mono"):
+            get_preset("flac-hifi")
+
+    def test_names_match_keys(self):
+        """Test that every preset is registered under its own name."""
+        assert all(name == p.name for name, p in ENCODING_PRESETS.items())
@@ -0,0 +1,174 @@
+from unittest.mock import patch
+
+import numpy as np
+
+from ankicard.core.audio_processing import resample
+from ankicard.core.fingerprint import (
+    MATCH_THRESHOLD,
+    FingerprintIndex,
+    compute_fingerprint,
+    decode_fingerprint,
+    encode_fingerprint,
+    get_fingerprint_index,
+    similarity,
+)
+
+
+RATE = 16000
+
+
+def speech_like(seed, seconds=4.0):
+    """Harmonic signal with a gliding pitch and syllable-like gaps."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * RATE)) / RATE
+    f0 = 110 + 60 * rng.random() + 40 * np.sin(2 * np.pi * rng.uniform(0.3, 1.5) * t)
+    phase = 2 * np.pi * np.cumsum(f0) / RATE
+    voice = sum(rng.random() / k * np.sin(k * phase) for k in range(1, 15))
+    envelope = np.sin(2 * np.pi * rng.uniform(2, 5) * t + rng.random() * 6) > 0
+    return (0.2 * voice * envelope).astype(np.float32)
+
+
+def reencoded(samples):
+    """Band-limit, re-level, add noise and shift the start of a clip."""
+    rng = np.random.default_rng(99)
+    lowpassed = resample(resample(samples, RATE, 8000), 8000, RATE)
+    noisy = 0.5 * lowpassed + 0.002 * rng.standard_normal(len(samples))
+    return np.concatenate([np.zeros(4000), noisy[3000:]]).astype(np.float32)
+
+
+class TestFingerprint:
+    """Tests for computing and comparing fingerprints."""
+
+    def test_one_word_per_frame(self):
+        """Test that a 4 s clip gives a few hundred 32-bit words."""
+        fingerprint = compute_fingerprint(speech_like(1), RATE)
+        assert fingerprint.dtype == np.uint32
+        assert 200 < len(fingerprint) < 260
+
+    def test_short_audio_has_no_fingerprint(self):
+        """Test that audio shorter than one frame gives an empty result."""
+        assert len(compute_fingerprint(speech_like(1, 0.1), RATE)) == 0
+
+    def test_silence_has_no_fingerprint(self):
+        """Test that silent and near-silent clips are not fingerprinted."""
+        assert len(compute_fingerprint(np.zeros(4 * RATE), RATE)) == 0
+        hiss = 1e-4 * np.random.default_rng(0).standard_normal(4 * RATE)
+        assert len(compute_fingerprint(hiss, RATE)) == 0
+
+    def test_steady_tone_has_no_fingerprint(self):
+        """Test that a constant tone, whose words barely vary, is rejected."""
+        t = np.arange(4 * RATE) / RATE
+        for freq in (440, 1000):
+            tone = 0.3 * np.sin(2 * np.pi * freq * t)
+            assert len(compute_fingerprint(tone, RATE)) == 0
+
+    def test_blocks_do_not_change_result(self):
+        """Test that the blocked spectrum matches a single-block one."""
+        samples = speech_like(1)
+        with patch("ankicard.core.fingerprint.BLOCK_FRAMES", 7):
+            blocked = compute_fingerprint(samples, RATE)
+        with patch("ankicard.core.fingerprint.BLOCK_FRAMES", 10_000):
+            whole = compute_fingerprint(samples, RATE)
+        assert np.array_equal(blocked, whole)
+
+    def test_reencoded_copy_matches(self):
+        """Test that a re-encoded, trimmed copy stays above the threshold."""
+        original = compute_fingerprint(speech_like(1), RATE)
+        copy = compute_fingerprint(reencoded(speech_like(1)), RATE)
+        assert similarity(original, copy) >= MATCH_THRESHOLD
+
+    def test_different_audio_does_not_match(self):
+        """Test that unrelated clips stay well below the threshold."""
+        original = compute_fingerprint(speech_like(1), RATE)
+        for seed in range(2, 6):
+            other = compute_fingerprint(speech_like(seed), RATE)
+            assert similarity(original, other) < MATCH_THRESHOLD
+
+    def test_very_different_lengths_do_not_match(self):
+        """Test that a clip is not matched against a much longer one."""
+        short = compute_fingerprint(speech_like(1, 2.0), RATE)
+        long = compute_fingerprint(speech_like(1, 4.0), RATE)
+        assert similarity(short, long) == 0.0
+
+    def test_serialization_round_trip(self):
+        """Test that fingerprints survive the JSON encoding."""
+        fingerprint = compute_fingerprint(speech_like(1), RATE)
+        assert np.array_equal(
+            decode_fingerprint(encode_fingerprint(fingerprint)), fingerprint
+        )
+
+
+class TestFingerprintIndex:
+    """Tests for near-duplicate lookup."""
+
+    def test_match_and_merge(self):
+        """Test that a re-encoded copy finds and extends the stored entry."""
+        index = FingerprintIndex()
+        original = compute_fingerprint(speech_like(1), RATE)
+        copy = compute_fingerprint(reencoded(speech_like(1)), RATE)
+
+        index.add(original, transcripts={"ja:text": "こんにちは"})
+        index.add(copy, card={"sentence": "こんにちは", "package": "a.apkg"})
+
+        assert len(index) == 1
+        entry = index.match(copy)
+        assert entry["transcripts"] == {"ja:text": "こんにちは"}
+        assert entry["card"]["package"] == "a.apkg"
+
+    def test_no_match(self):
+        """Test that unrelated audio finds nothing."""
+        index = FingerprintIndex()
+        index.add(compute_fingerprint(speech_like(1), RATE), transcripts={})
+        assert index.match(compute_fingerprint(speech_like(2), RATE)) is None
+
+    def test_match_compares_only_candidates(self):
+        """Test that a lookup in a large index compares only a few clips."""
+        index = FingerprintIndex()
+        for seed in range(1, 41):
+            index.add(compute_fingerprint(speech_like(seed), RATE), seed=seed)
+        copy = compute_fingerprint(reencoded(speech_like(7)), RATE)
+
+        with patch(
+            "ankicard.core.fingerprint.similarity", wraps=similarity
+        ) as mock_similarity:
+            entry = index.match(copy)
+
+        assert entry["seed"] == 7
+        assert mock_similarity.call_count <= 5
+
+    def test_candidates_survive_threshold_bit_errors(self):
+        """Test that a copy with bit errors near the threshold is still found."""
+        rng = np.random.default_rng(0)
+        original = compute_fingerprint(speech_like(1), RATE)
+        flips = rng.random((len(original), 32)) < 0.12
+        weights = np.left_shift(np.uint32(1), np.arange(32, dtype=np.uint32))
+        noisy = original ^ (flips * weights).sum(axis=1, dtype=np.uint32)
+        index = FingerprintIndex()
+        entry = index.add(original)
+
+        assert similarity(original, noisy) >= MATCH_THRESHOLD
+        assert entry["id"] in index.candidates(noisy)
+
+    def test_long_clip_found_by_indexed_frames(self):
+        """Test that clips are found from their first MAX_INDEXED_FRAMES words."""
+        index = FingerprintIndex()
+        with patch("ankicard.core.fingerprint.MAX_INDEXED_FRAMES", 48):
+            for seed in range(1, 6):
+                index.add(compute_fingerprint(speech_like(seed), RATE), seed=seed)
+            entry = index.match(compute_fingerprint(reencoded(speech_like(3)), RATE))
+
+        assert entry["seed"] == 3
+
+    def test_persisted_between_runs(self):
+        """Test that a fresh index loads entries written earlier."""
+        fingerprint = compute_fingerprint(speech_like(1), RATE)
+        FingerprintIndex().add(fingerprint, transcripts={"ja:text": "一"})
+        FingerprintIndex().add(fingerprint, transcripts={"en:text": "one"})
+
+        entry = FingerprintIndex().match(fingerprint)
+
+        assert entry["transcripts"] == {"ja:text": "一", "en:text": "one"}
+
+    def test_shared_index(self):
+        """Test that the shared index is reused for the same cache file."""
+        assert get_fingerprint_index() is get_fingerprint_index()
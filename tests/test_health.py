@@ -0,0 +1,152 @@
+from unittest.mock import Mock
+
+from ankicard.core.health import CircuitBreaker, HealthMonitor
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Tests for circuit breaker state transitions."""
+
+    def test_starts_closed(self):
+        """Test that a new breaker allows calls."""
+        breaker = CircuitBreaker()
+        assert breaker.state == "closed"
+        assert breaker.allow() is True
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the circuit."""
+        breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.allow() is False
+
+    def test_success_resets_failure_count(self):
+        """Test that a success between failures keeps the circuit closed."""
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+    def test_half_opens_after_timeout(self):
+        """Test that one trial call is allowed after the reset timeout."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 29
+        assert breaker.allow() is False
+        clock.now = 30
+        assert breaker.allow() is True
+        assert breaker.state == "half_open"
+        assert breaker.allow() is False
+
+    def test_trial_success_closes(self):
+        """Test that a successful trial closes the circuit."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 30
+        breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_trial_failure_reopens(self):
+        """Test that a failed trial reopens the circuit for another timeout."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 30
+        breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        clock.now = 59
+        assert breaker.allow() is False
+
+    def test_release_allows_another_trial(self):
+        """Test that releasing an abandoned trial lets the next caller try."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 30
+        assert breaker.allow() is True
+        breaker.release()
+        assert breaker.state == "half_open"
+        assert breaker.allow() is True
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+
+class TestHealthMonitor:
+    """Tests for cached health probing."""
+
+    def test_caches_probe_result(self):
+        """Test that the probe runs once within the TTL."""
+        clock = FakeClock()
+        probe = Mock(return_value=True)
+        monitor = HealthMonitor(probe, ttl=30, clock=clock)
+
+        assert monitor.is_available() is True
+        assert monitor.is_available() is True
+        probe.assert_called_once()
+
+        clock.now = 31
+        monitor.is_available()
+        assert probe.call_count == 2
+
+    def test_caches_unavailable_state(self):
+        """Test that a down engine is not re-probed within the TTL."""
+        clock = FakeClock()
+        probe = Mock(return_value=False)
+        monitor = HealthMonitor(probe, ttl=30, clock=clock)
+
+        assert monitor.is_available() is False
+        assert monitor.is_available() is False
+        probe.assert_called_once()
+
+    def test_open_circuit_skips_probe(self):
+        """Test that call failures open the circuit and stop probing."""
+        clock = FakeClock()
+        probe = Mock(return_value=True)
+        monitor = HealthMonitor(
+            probe,
+            ttl=30,
+            breaker=CircuitBreaker(failure_threshold=2, clock=clock),
+            clock=clock,
+        )
+        assert monitor.is_available() is True
+
+        monitor.record_failure()
+        assert monitor.is_available() is True
+        monitor.record_failure()
+        assert monitor.is_available() is False
+        probe.assert_called_once()
+
+    def test_recovers_after_reset_timeout(self):
+        """Test that the half-open probe restores availability."""
+        clock = FakeClock()
+        probe = Mock(return_value=True)
+        monitor = HealthMonitor(
+            probe,
+            ttl=30,
+            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock),
+            clock=clock,
+        )
+        monitor.record_failure()
+        assert monitor.is_available() is False
+
+        clock.now = 10
+        assert monitor.is_available() is True
+        assert monitor.breaker.state == "closed"
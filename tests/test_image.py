@@ -1,5 +1,18 @@
+import io
+from pathlib import Path
 from unittest.mock import Mock, patch
-from ankicard.core.image import generate_image
+
+import numpy as np
+from PIL import Image
+
+from ankicard.core.image import (
+    generate_image,
+    generate_images,
+    grid_size,
+    slice_grid,
+    validate_grid,
+)
+from ankicard.core.image_processing import get_image_preset
 
 
 class TestGenerateImage:
@@ -11,18 +24,15 @@ class TestGenerateImage:
         assert result is None
 
     @patch("ankicard.core.image.genai.Client")
-    @patch("ankicard.core.image.os.makedirs")
     def test_generate_image_success(
-        self, mock_makedirs, mock_client_cls, test_image_path
+        self, mock_client_cls, test_image_path, sample_png_bytes
     ):
-        """Test successful image generation."""
+        """Test that a PNG response is saved as a JPEG."""
         mock_client = Mock()
         mock_client_cls.return_value = mock_client
 
-        mock_image = Mock()
         mock_part = Mock()
-        mock_part.inline_data = b"fake_image_data"
-        mock_part.as_image.return_value = mock_image
+        mock_part.inline_data = Mock(data=sample_png_bytes)
 
         mock_response = Mock()
         mock_response.parts = [mock_part]
@@ -32,20 +42,39 @@ class TestGenerateImage:
 
         assert result == test_image_path
         mock_client.models.generate_content.assert_called_once()
-        mock_image.save.assert_called_once_with(test_image_path)
+        with Image.open(test_image_path) as img:
+            assert img.format == "JPEG"
+            assert img.size == (64, 48)
+
+    @patch("ankicard.core.image.genai.Client")
+    def test_generate_image_keeps_fitting_response(
+        self, mock_client_cls, test_image_path
+    ):
+        """Test that a response already fitting the preset is written as-is."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (320, 240), "blue").save(buffer, "JPEG")
+        mock_part = Mock()
+        mock_part.inline_data = Mock(data=buffer.getvalue())
+        mock_client_cls.return_value.models.generate_content.return_value = Mock(
+            parts=[mock_part]
+        )
+
+        generate_image(
+            "sky", test_image_path, api_key="test-key", preset=get_image_preset()
+        )
+
+        assert Path(test_image_path).read_bytes() == buffer.getvalue()
 
     @patch("ankicard.core.image.genai.Client")
-    @patch("ankicard.core.image.os.makedirs")
     def test_generate_image_prompt_enhancement(
-        self, mock_makedirs, mock_client_cls, test_image_path
+        self, mock_client_cls, test_image_path, sample_png_bytes
     ):
         """Test that prompts are enhanced with minimalist instruction."""
         mock_client = Mock()
         mock_client_cls.return_value = mock_client
 
         mock_part = Mock()
-        mock_part.inline_data = b"fake_image_data"
-        mock_part.as_image.return_value = Mock()
+        mock_part.inline_data = Mock(data=sample_png_bytes)
 
         mock_response = Mock()
         mock_response.parts = [mock_part]
@@ -58,17 +87,15 @@ class TestGenerateImage:
         assert "do not write out the full sentence" in call_kwargs["contents"]
 
     @patch("ankicard.core.image.genai.Client")
-    @patch("ankicard.core.image.os.makedirs")
     def test_generate_image_parameters(
-        self, mock_makedirs, mock_client_cls, test_image_path
+        self, mock_client_cls, test_image_path, sample_png_bytes
     ):
         """Test that correct parameters are passed to Gemini."""
         mock_client = Mock()
         mock_client_cls.return_value = mock_client
 
         mock_part = Mock()
-        mock_part.inline_data = b"fake_image_data"
-        mock_part.as_image.return_value = Mock()
+        mock_part.inline_data = Mock(data=sample_png_bytes)
 
         mock_response = Mock()
         mock_response.parts = [mock_part]
@@ -97,20 +124,18 @@ class TestGenerateImage:
         assert "Image generation failed" in str(mock_print.call_args)
 
     @patch("ankicard.core.image.genai.Client")
-    @patch("ankicard.core.image.os.makedirs")
+    @patch("ankicard.core.image.save_image")
     @patch("ankicard.core.image.print")
     def test_generate_image_save_error(
-        self, mock_print, mock_makedirs, mock_client_cls, test_image_path
+        self, mock_print, mock_save_image, mock_client_cls, test_image_path
     ):
         """Test error handling when image save fails."""
         mock_client = Mock()
         mock_client_cls.return_value = mock_client
 
-        mock_image = Mock()
-        mock_image.save.side_effect = Exception("Save Error")
+        mock_save_image.side_effect = Exception("Save Error")
         mock_part = Mock()
-        mock_part.inline_data = b"fake_image_data"
-        mock_part.as_image.return_value = mock_image
+        mock_part.inline_data = Mock(data=b"fake_image_data")
 
         mock_response = Mock()
         mock_response.parts = [mock_part]
@@ -142,3 +167,128 @@ class TestGenerateImage:
         assert result is None
         mock_print.assert_called_once()
         assert "no image in response" in str(mock_print.call_args)
+
+
+COLORS = [(220, 40, 40), (40, 160, 60), (40, 60, 200), (230, 200, 30)]
+
+
+def _grid_pixels(size=2, side=512, colors=COLORS):
+    """A grid of flat panels with a little noise, like a model's output."""
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 6, (side, side, 3)).astype(np.uint8)
+    step = side // size
+    for n in range(size * size):
+        row, col = divmod(n, size)
+        color = colors[n % len(colors)]
+        pixels[row * step : (row + 1) * step, col * step : (col + 1) * step] += (
+            np.array(color, dtype=np.uint8)
+        )
+    return pixels
+
+
+def _png(pixels):
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class TestGridLayout:
+    """Tests for grid validation and slicing."""
+
+    def test_grid_size(self):
+        """Test that the smallest fitting grid is chosen."""
+        assert [grid_size(n) for n in (2, 4, 5, 9)] == [2, 2, 3, 3]
+
+    def test_valid_grid(self):
+        """Test that distinct panels pass."""
+        assert validate_grid(_grid_pixels(2), 2)
+        assert validate_grid(_grid_pixels(3, side=600), 3)
+
+    def test_single_picture_rejected(self):
+        """Test that a smooth picture with no panel edges fails."""
+        ramp = np.linspace(0, 255, 512, dtype=np.float32)
+        pixels = np.broadcast_to((ramp[:, None] + ramp[None, :]) / 2, (512, 512))
+        assert not validate_grid(pixels.astype(np.uint8), 2)
+
+    def test_wrong_grid_size_rejected(self):
+        """Test that a 3x3 grid is not accepted as 2x2."""
+        assert not validate_grid(_grid_pixels(3, side=600), 2)
+
+    def test_non_square_rejected(self):
+        """Test that a wide image fails the aspect check."""
+        assert not validate_grid(_grid_pixels(2)[:300], 2)
+
+    def test_slice_reading_order(self):
+        """Test that tiles come left to right, top to bottom, without borders."""
+        tiles = slice_grid(_grid_pixels(2), 2)
+
+        assert len(tiles) == 4
+        assert all(tile.shape == (242, 242, 3) for tile in tiles)
+        for tile, color in zip(tiles, COLORS):
+            assert np.abs(tile.mean(axis=(0, 1)) - color).max() < 5
+
+
+class TestGenerateImages:
+    """Tests for grid-tiled image generation."""
+
+    def _respond(self, mock_client_cls, *images):
+        parts = [[Mock(inline_data=Mock(data=data))] for data in images]
+        mock_client_cls.return_value.models.generate_content.side_effect = [
+            Mock(parts=p) for p in parts
+        ]
+        return mock_client_cls.return_value.models.generate_content
+
+    @patch("ankicard.core.image.genai.Client")
+    def test_one_call_per_grid(self, mock_client_cls, tmp_path):
+        """Test that four sentences share one square grid request."""
+        generate_content = self._respond(mock_client_cls, _png(_grid_pixels(2)))
+        paths = [str(tmp_path / f"{n}.jpg") for n in range(4)]
+
+        result = generate_images(["a", "b", "c", "d"], paths, api_key="key")
+
+        assert result == paths
+        generate_content.assert_called_once()
+        kwargs = generate_content.call_args.kwargs
+        assert "2x2 grid" in kwargs["contents"]
+        assert "4. d" in kwargs["contents"]
+        assert kwargs["config"].image_config.aspect_ratio == "1:1"
+        for path, color in zip(paths, COLORS):
+            with Image.open(path) as img:
+                assert img.format == "JPEG"
+                assert np.abs(np.asarray(img).mean(axis=(0, 1)) - color).max() < 8
+
+    @patch("ankicard.core.image.genai.Client")
+    @patch("ankicard.core.image.print")
+    def test_malformed_grid_falls_back(self, mock_print, mock_client_cls, tmp_path):
+        """Test that a response without panels is replaced by single calls."""
+        single = _png(np.full((64, 64, 3), 128, dtype=np.uint8))
+        generate_content = self._respond(
+            mock_client_cls, single, single, single, single
+        )
+        paths = [str(tmp_path / f"{n}.jpg") for n in range(3)]
+
+        result = generate_images(["a", "b", "c"], paths, api_key="key")
+
+        assert result == paths
+        assert generate_content.call_count == 4
+        assert "not a 2x2 grid" in str(mock_print.call_args)
+
+    @patch("ankicard.core.image.genai.Client")
+    def test_single_leftover_uses_one_image_call(self, mock_client_cls, tmp_path):
+        """Test that a lone sentence is not sent as a grid."""
+        generate_content = self._respond(
+            mock_client_cls,
+            _png(_grid_pixels(3, side=600, colors=COLORS * 3)),
+            _png(np.zeros((64, 64, 3), dtype=np.uint8)),
+        )
+        prompts = [str(n) for n in range(10)]
+        paths = [str(tmp_path / f"{n}.jpg") for n in range(10)]
+
+        generate_images(prompts, paths, api_key="key", grid=3)
+
+        assert generate_content.call_count == 2
+        assert "grid" not in generate_content.call_args.kwargs["contents"]
+
+    def test_no_api_key(self, tmp_path):
+        """Test that nothing is generated without a key."""
+        assert generate_images(["a", "b"], ["x", "y"], api_key=None) == [None, None]
@@ -0,0 +1,178 @@
+import io
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from ankicard.core.image_processing import (
+    IMAGE_PRESETS,
+    convert_image_file,
+    get_image_preset,
+    image_pool,
+    meets_preset,
+    save_image,
+    transcode_image,
+)
+
+
+def _encode(size, format="PNG", mode="RGB", color=(30, 120, 200)):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format)
+    return buffer.getvalue()
+
+
+class TestGetImagePreset:
+    """Tests for image preset lookup."""
+
+    def test_default(self):
+        """Test that the default preset is an 800 px JPEG."""
+        preset = get_image_preset()
+        assert (preset.format, preset.extension, preset.max_size) == (
+            "JPEG",
+            "jpg",
+            800,
+        )
+
+    def test_by_name(self):
+        """Test looking up a preset by name."""
+        assert get_image_preset("webp") is IMAGE_PRESETS["webp"]
+
+    def test_unknown(self):
+        """Test that an unknown name lists the choices."""
+        with pytest.raises(ValueError, match="jpeg-small"):
+            get_image_preset("gif")
+
+
+class TestTranscodeImage:
+    """Tests for fitting images to a preset."""
+
+    def test_fitting_image_passes_through(self):
+        """Test that a small JPEG is returned without re-encoding."""
+        data = _encode((320, 240), "JPEG")
+        assert meets_preset(data, get_image_preset())
+        assert transcode_image(data, get_image_preset()) is data
+
+    def test_large_image_is_shrunk(self):
+        """Test that the longest side is capped and the aspect ratio kept."""
+        data = _encode((2048, 1536), "JPEG")
+
+        result = transcode_image(data, get_image_preset("jpeg"))
+
+        with Image.open(io.BytesIO(result)) as img:
+            assert img.format == "JPEG"
+            assert img.size == (800, 600)
+        assert len(result) < len(data)
+
+    def test_small_image_is_not_enlarged(self):
+        """Test that images under the limit keep their size."""
+        result = transcode_image(_encode((100, 50)), get_image_preset("jpeg"))
+
+        with Image.open(io.BytesIO(result)) as img:
+            assert img.size == (100, 50)
+
+    def test_jpeg_flattens_transparency_onto_white(self):
+        """Test that transparent pixels become white in a JPEG."""
+        data = _encode((40, 40), mode="RGBA", color=(0, 0, 0, 0))
+
+        result = transcode_image(data, get_image_preset("jpeg"))
+
+        with Image.open(io.BytesIO(result)) as img:
+            assert img.mode == "RGB"
+            assert min(img.getpixel((20, 20))) > 245
+
+    def test_webp_keeps_transparency(self):
+        """Test that WebP output keeps the alpha channel."""
+        data = _encode((1000, 500), mode="RGBA", color=(255, 0, 0, 100))
+
+        result = transcode_image(data, get_image_preset("webp-small"))
+
+        with Image.open(io.BytesIO(result)) as img:
+            assert img.format == "WEBP"
+            assert img.mode == "RGBA"
+            assert img.size == (480, 240)
+
+    def test_exif_orientation_is_applied(self):
+        """Test that rotated phone photos come out upright."""
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotate 90 degrees clockwise to display
+        buffer = io.BytesIO()
+        Image.new("RGB", (200, 100)).save(buffer, "PNG", exif=exif)
+
+        result = transcode_image(buffer.getvalue(), get_image_preset())
+
+        with Image.open(io.BytesIO(result)) as img:
+            assert img.size == (100, 200)
+
+
+class TestSaveImage:
+    """Tests for writing images."""
+
+    def test_creates_directories(self, tmp_path):
+        """Test that the output directory is created."""
+        output = tmp_path / "media" / "a.jpg"
+
+        save_image(_encode((10, 10)), str(output), get_image_preset())
+
+        assert output.read_bytes().startswith(b"\xff\xd8")
+
+    def test_in_process_pool(self, tmp_path):
+        """Test that transcodes inside image_pool give the same bytes."""
+        data = _encode((1200, 900))
+        expected = transcode_image(data, get_image_preset())
+
+        with image_pool(1):
+            path = save_image(data, str(tmp_path / "a.jpg"), get_image_preset())
+
+        assert Path(path).read_bytes() == expected
+
+
+class TestConvertImageFile:
+    """Tests for fitting user-supplied image files."""
+
+    def test_png_becomes_jpeg(self, tmp_path):
+        """Test that a PNG is re-encoded rather than renamed to .jpg."""
+        source = tmp_path / "photo.png"
+        source.write_bytes(_encode((64, 64)))
+
+        output = convert_image_file(
+            str(source), str(tmp_path / "a.jpg"), get_image_preset()
+        )
+
+        with Image.open(output) as img:
+            assert img.format == "JPEG"
+        assert source.exists()
+
+    def test_fitting_file_is_placed(self, tmp_path):
+        """Test that a fitting file is placed without decoding."""
+        source = tmp_path / "photo.jpg"
+        source.write_bytes(_encode((64, 64), "JPEG"))
+
+        output = convert_image_file(
+            str(source), str(tmp_path / "a.jpg"), get_image_preset()
+        )
+
+        assert Path(output).read_bytes() == source.read_bytes()
+
+    def test_rewriting_output_keeps_source(self, tmp_path):
+        """Test that overwriting a placed image leaves the user's file intact."""
+        source = tmp_path / "photo.jpg"
+        original = _encode((64, 64), "JPEG")
+        source.write_bytes(original)
+        output = tmp_path / "a.jpg"
+        convert_image_file(str(source), str(output), get_image_preset())
+
+        save_image(
+            _encode((32, 32), "JPEG", color=(0, 0, 0)), str(output), get_image_preset()
+        )
+
+        assert source.read_bytes() == original
+        assert output.read_bytes() != original
+        assert not list(tmp_path.glob(".*.tmp*"))
+
+    def test_unreadable_image(self, tmp_path):
+        """Test that a non-image raises a conversion error."""
+        source = tmp_path / "notes.jpg"
+        source.write_bytes(b"not an image")
+
+        with pytest.raises(Exception, match="Image conversion failed"):
+            convert_image_file(str(source), str(tmp_path / "a.jpg"), get_image_preset())
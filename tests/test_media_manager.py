@@ -1,13 +1,42 @@
-from ankicard.media.manager import generate_unique_id, generate_media_filenames
+import time
+from unittest.mock import patch
+
+from ankicard.media.manager import (
+    content_id,
+    generate_media_filenames,
+    generate_unique_id,
+    sortable_id,
+    source_namespace,
+)
+
+
+class TestSourceNamespace:
+    """Tests for namespaces derived from media source files."""
+
+    def test_no_sources_uses_default(self):
+        """Test that cards without source files keep the default namespace."""
+        assert source_namespace([]) == "ankicard"
+
+    def test_differs_by_content(self, tmp_path):
+        """Test that different clips give the same sentence different IDs."""
+        first = tmp_path / "a.mp3"
+        second = tmp_path / "b.mp3"
+        copy = tmp_path / "c.mp3"
+        first.write_bytes(b"one")
+        second.write_bytes(b"two")
+        copy.write_bytes(b"one")
+
+        assert source_namespace([str(first)]) != source_namespace([str(second)])
+        assert source_namespace([str(first)]) == source_namespace([str(copy)])
 
 
 class TestGenerateUniqueId:
     """Tests for unique ID generation."""
 
     def test_generate_unique_id_length(self):
-        """Test that unique ID is 8 characters long."""
-        unique_id = generate_unique_id()
-        assert len(unique_id) == 8
+        """Test that unique IDs are 20 hex characters (80 bits)."""
+        assert len(generate_unique_id()) == 20
+        assert len(generate_unique_id("猫です")) == 20
 
     def test_generate_unique_id_is_string(self):
         """Test that unique ID is a string."""
@@ -28,9 +57,44 @@ class TestGenerateUniqueId:
     def test_generate_unique_id_hex_characters(self):
         """Test that unique ID contains valid hex characters."""
         unique_id = generate_unique_id()
-        # UUID4 hex representation should only contain 0-9, a-f, and hyphens
-        # Our substring should only have hex chars (no hyphens in first 8 chars)
-        assert all(c in "0123456789abcdef-" for c in unique_id)
+        assert all(c in "0123456789abcdef" for c in unique_id)
+
+    def test_sentence_id_is_deterministic(self):
+        """Test that the same sentence always gets the same ID."""
+        assert generate_unique_id("猫です") == generate_unique_id("猫です")
+        assert generate_unique_id("猫です") == content_id("猫です")
+        assert generate_unique_id("猫です") != generate_unique_id("犬です")
+
+
+class TestContentId:
+    """Tests for content-derived IDs."""
+
+    def test_normalized(self):
+        """Test that width and whitespace variants share an ID."""
+        assert content_id("  ｶﾀｶﾅ　です ") == content_id("カタカナ です")
+
+    def test_namespace(self):
+        """Test that namespaces separate identical sentences."""
+        assert content_id("猫", "a.mp4@1.000") != content_id("猫", "a.mp4@9.000")
+
+
+class TestSortableId:
+    """Tests for time-sortable IDs."""
+
+    def test_sorts_by_creation_time(self):
+        """Test that later IDs sort after earlier ones."""
+        with patch("ankicard.media.manager.time.time_ns", return_value=1_000_000):
+            earlier = sortable_id()
+        with patch("ankicard.media.manager.time.time_ns", return_value=2_000_000):
+            later = sortable_id()
+
+        assert earlier < later
+        assert earlier[:12] == "000000000001"
+
+    def test_timestamp_prefix(self):
+        """Test that the prefix is the current Unix time in milliseconds."""
+        millis = int(sortable_id()[:12], 16)
+        assert abs(millis - time.time() * 1000) < 60_000
 
 
 class TestGenerateMediaFilenames:
@@ -87,3 +151,19 @@ class TestGenerateMediaFilenames:
 
         assert filenames["audio"].startswith("anki_")
         assert filenames["image"].startswith("anki_")
+
+    def test_generate_media_filenames_extra_audio(self):
+        """Test numbered filenames for extra voice variants."""
+        assert generate_media_filenames("test")["extra_audio"] == []
+        assert generate_media_filenames("test", extra_audio=2)["extra_audio"] == [
+            "anki_test_2.mp3",
+            "anki_test_3.mp3",
+        ]
+
+    def test_generate_media_filenames_audio_extension(self):
+        """Test that the encoding preset's extension is used for audio."""
+        filenames = generate_media_filenames("test", 1, "ogg")
+
+        assert filenames["audio"] == "anki_test.ogg"
+        assert filenames["extra_audio"] == ["anki_test_2.ogg"]
+        assert filenames["image"] == "anki_test.jpg"
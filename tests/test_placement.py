@@ -0,0 +1,89 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from ankicard.media.placement import (
+    place_file,
+    placement_stats,
+    reset_placement_stats,
+)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.mp3"
+    path.write_bytes(b"audio" * 100)
+    return path
+
+
+class TestPlaceFile:
+    """Tests for zero-copy media placement."""
+
+    def setup_method(self):
+        reset_placement_stats()
+
+    @patch("ankicard.media.placement._reflink", return_value=False)
+    def test_hardlink(self, _mock_reflink, source, tmp_path):
+        """Test that link=True hard-links when reflinks are unavailable."""
+        dest = tmp_path / "dest.mp3"
+
+        assert place_file(str(source), str(dest), link=True) == "hardlink"
+        assert os.path.samefile(source, dest)
+        assert placement_stats()["bytes_copied"] == 0
+
+    @patch("ankicard.media.placement.fcntl")
+    def test_reflink_first(self, mock_fcntl, source, tmp_path):
+        """Test that a successful clone skips linking and copying."""
+        dest = tmp_path / "dest.mp3"
+
+        with patch("ankicard.media.placement.sys.platform", "linux"):
+            assert place_file(str(source), str(dest)) == "reflink"
+
+        mock_fcntl.ioctl.assert_called_once()
+        assert not os.path.samefile(source, dest)
+        assert placement_stats()["reflink"] == 1
+
+    @patch("ankicard.media.placement._reflink", return_value=False)
+    def test_kernel_copy_without_links(self, _mock_reflink, source, tmp_path):
+        """Test that files are copied in the kernel, not linked, by default."""
+        dest = tmp_path / "dest.mp3"
+
+        method = place_file(str(source), str(dest))
+
+        assert method in ("copy_file_range", "copy")
+        assert dest.read_bytes() == source.read_bytes()
+        assert not os.path.samefile(source, dest)
+        assert placement_stats()["bytes_copied"] == 500
+
+    @patch("ankicard.media.placement.os.copy_file_range", side_effect=OSError)
+    @patch("ankicard.media.placement.os.link", side_effect=OSError("EXDEV"))
+    @patch("ankicard.media.placement._reflink", return_value=False)
+    def test_falls_back_to_copy(self, _r, _l, _c, source, tmp_path):
+        """Test that a plain copy is the last resort."""
+        dest = tmp_path / "dest.mp3"
+
+        assert place_file(str(source), str(dest)) == "copy"
+        assert dest.read_bytes() == source.read_bytes()
+        assert placement_stats() == {
+            "reflink": 0,
+            "hardlink": 0,
+            "copy_file_range": 0,
+            "copy": 1,
+            "bytes_copied": 500,
+        }
+
+    @patch("ankicard.media.placement._reflink", return_value=False)
+    def test_replaces_existing_dest(self, _mock_reflink, source, tmp_path):
+        """Test that an existing destination is replaced, as a copy would."""
+        dest = tmp_path / "dest.mp3"
+        dest.write_bytes(b"old")
+
+        place_file(str(source), str(dest))
+
+        assert dest.read_bytes() == source.read_bytes()
+
+    def test_same_file(self, source):
+        """Test that placing a file onto itself leaves it intact."""
+        assert place_file(str(source), str(source)) == "hardlink"
+        assert source.read_bytes() == b"audio" * 100
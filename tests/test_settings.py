@@ -99,3 +99,17 @@ class TestSettings:
         settings = Settings()
         settings.media_dir = "new_dir"
         assert settings.media_dir == "new_dir"
+
+    @patch.dict(os.environ, {"AUDIO_PRESET": "opus-24k"}, clear=True)
+    @patch("ankicard.config.settings.load_dotenv")
+    def test_settings_load_audio_preset(self, mock_load_dotenv):
+        """Test that AUDIO_PRESET selects the encoding preset."""
+        assert Settings().audio_preset == "mp3"
+        assert Settings.load().audio_preset == "opus-24k"
+
+    @patch.dict(os.environ, {"IMAGE_PRESET": "webp"}, clear=True)
+    @patch("ankicard.config.settings.load_dotenv")
+    def test_settings_load_image_preset(self, mock_load_dotenv):
+        """Test that IMAGE_PRESET selects the image preset."""
+        assert Settings().image_preset == "jpeg"
+        assert Settings.load().image_preset == "webp"
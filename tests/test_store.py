@@ -0,0 +1,90 @@
+import hashlib
+import os
+import stat
+from pathlib import Path
+
+from ankicard.media.store import content_filename, rename_references, store_media
+
+
+class TestContentFilename:
+    """Tests for hash-derived media names."""
+
+    def test_name_from_content(self, tmp_path):
+        """Test that the name is the content hash with a lowercase extension."""
+        path = tmp_path / "clip.MP3"
+        path.write_bytes(b"audio")
+        digest = hashlib.sha256(b"audio").hexdigest()[:32]
+
+        assert content_filename(str(path)) == f"anki_{digest}.mp3"
+
+
+class TestStoreMedia:
+    """Tests for moving media into the sharded store."""
+
+    def test_sharded_location(self, tmp_path):
+        """Test that files land in a two-digit shard and are moved, not copied."""
+        path = tmp_path / "anki_1.mp3"
+        path.write_bytes(b"audio")
+
+        stored = Path(store_media(str(path), str(tmp_path / "store")))
+
+        assert stored.parent.name == stored.name[5:7]
+        assert stored.parent.parent == tmp_path / "store"
+        assert stored.read_bytes() == b"audio"
+        assert not path.exists()
+
+    def test_duplicates_share_one_file(self, tmp_path):
+        """Test that identical content is stored once."""
+        first = tmp_path / "anki_1.jpg"
+        second = tmp_path / "anki_2.jpg"
+        first.write_bytes(b"image")
+        second.write_bytes(b"image")
+
+        stored = {
+            store_media(str(first), str(tmp_path / "store")),
+            store_media(str(second), str(tmp_path / "store")),
+        }
+
+        assert len(stored) == 1
+        assert not second.exists()
+        assert len(list((tmp_path / "store").rglob("*.jpg"))) == 1
+
+    def test_stored_file_is_read_only(self, tmp_path):
+        """Test that stored objects cannot be written in place."""
+        path = tmp_path / "anki_1.mp3"
+        path.write_bytes(b"audio")
+
+        stored = store_media(str(path), str(tmp_path / "store"))
+
+        assert stat.S_IMODE(os.stat(stored).st_mode) == 0o444
+
+    def test_linked_file_is_copied_in(self, tmp_path):
+        """Test that a hard-linked file does not share storage with the store."""
+        path = tmp_path / "anki_1.mp3"
+        other = tmp_path / "user.mp3"
+        other.write_bytes(b"audio")
+        os.link(other, path)
+
+        stored = store_media(str(path), str(tmp_path / "store"))
+        other.write_bytes(b"edited")
+
+        assert not os.path.samefile(stored, other)
+        assert Path(stored).read_bytes() == b"audio"
+        assert not path.exists()
+
+
+class TestRenameReferences:
+    """Tests for rewriting media references in note fields."""
+
+    def test_sound_and_img(self):
+        """Test that sound tags and image sources are renamed."""
+        renames = {"a.mp3": "anki_x.mp3", "b.jpg": "anki_y.jpg"}
+
+        assert (
+            rename_references("[sound:a.mp3][sound:c.mp3]", renames)
+            == "[sound:anki_x.mp3][sound:c.mp3]"
+        )
+        assert (
+            rename_references('<img src="b.jpg"> b.jpg', renames)
+            == '<img src="anki_y.jpg"> b.jpg'
+        )
@@ -0,0 +1,95 @@
+import pytest
+
+from ankicard.core.subtitles import load_subtitles, parse_ass, parse_srt
+from ankicard.core.transcription import Segment
+
+
+SRT = """1
+00:00:01,500 --> 00:00:03,250
+<i>今日は</i>
+いい天気ですね。
+
+2
+00:01:02,000 --> 00:01:04,000
+Hello
+there
+
+3
+00:01:05,000 --> 00:01:06,000
+
+"""
+
+ASS = r"""[Script Info]
+Title: Example
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize
+Style: Default,Arial,20
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.50,0:00:03.25,Default,,0,0,0,,{\i1}今日は{\i0}\Nいい天気ですね、本当に。
+Comment: 0,0:00:02.00,0:00:03.00,Default,,0,0,0,,翻訳メモ
+Dialogue: 0,0:00:05.00,0:00:06.00,Sign,,0,0,0,,{\p1}m 0 0 l 10 10{\p0}
+Dialogue: 0,0:01:00.00,0:01:02.10,Default,,0,0,0,,時間, 場所
+"""
+
+
+class TestParseSrt:
+    """Tests for SubRip parsing."""
+
+    def test_cues(self):
+        """Test that timings are read, tags stripped and lines joined."""
+        assert parse_srt(SRT) == [
+            Segment(1.5, 3.25, "今日はいい天気ですね。"),
+            Segment(62.0, 64.0, "Hello there"),
+        ]
+
+    def test_webvtt(self):
+        """Test that WebVTT headers and cue settings are ignored."""
+        content = "WEBVTT\n\n00:01.000 --> 00:02.500 align:start\nこんにちは\n"
+        assert parse_srt(content) == [Segment(1.0, 2.5, "こんにちは")]
+
+
+class TestParseAss:
+    """Tests for Advanced SubStation Alpha parsing."""
+
+    def test_dialogue_only(self):
+        """Test that comments and drawings are skipped and commas in text kept."""
+        assert parse_ass(ASS) == [
+            Segment(1.5, 3.25, "今日はいい天気ですね、本当に。"),
+            Segment(60.0, 62.1, "時間, 場所"),
+        ]
+
+
+class TestLoadSubtitles:
+    """Tests for loading subtitle files."""
+
+    def test_shift_jis_srt(self, tmp_path):
+        """Test that Shift JIS files are decoded."""
+        path = tmp_path / "episode.srt"
+        path.write_bytes("1\n00:00:01,000 --> 00:00:02,000\n猫です\n".encode("cp932"))
+        assert load_subtitles(str(path)) == [Segment(1.0, 2.0, "猫です")]
+
+    def test_ass_sorted_and_deduplicated(self, tmp_path):
+        """Test that repeated layers collapse and cues come in time order."""
+        events = (
+            ASS.split("[Events]")[0]
+            + "[Events]\n"
+            + (
+                "Format: Layer, Start, End, Style, Text\n"
+                "Dialogue: 0,0:00:05.00,0:00:06.00,Default,二\n"
+                "Dialogue: 0,0:00:01.00,0:00:02.00,Default,一\n"
+                "Dialogue: 1,0:00:01.00,0:00:02.00,Default,一\n"
+            )
+        )
+        path = tmp_path / "episode.ass"
+        path.write_text(events, encoding="utf-8-sig")
+        assert [cue.text for cue in load_subtitles(str(path))] == ["一", "二"]
+
+    def test_no_cues(self, tmp_path):
+        """Test that a file without cues is rejected."""
+        path = tmp_path / "empty.srt"
+        path.write_text("not subtitles", encoding="utf-8")
+        with pytest.raises(ValueError, match="No subtitle cues"):
+            load_subtitles(str(path))
@@ -1,10 +1,27 @@
 """Tests for audio transcription module."""
 
+import subprocess
+
+import numpy as np
 import pytest
 from unittest.mock import patch, Mock, mock_open
-from ankicard.core.transcription import transcribe_audio, validate_audio_file
+from ankicard.core.audio_processing import read_wav, write_wav
+from ankicard.core.transcription import (
+    Segment,
+    UploadPart,
+    assign_segments,
+    audio_duration,
+    detect_format,
+    find_audio_files,
+    prepare_upload,
+    transcribe_audio,
+    transcribe_clips,
+    transcribe_segments,
+    validate_audio_file,
+)
 
 
+@patch("ankicard.core.transcription.is_ffmpeg_available", Mock(return_value=False))
 class TestTranscribeAudio:
     """Tests for transcribe_audio function."""
 
@@ -142,3 +159,495 @@ class TestValidateAudioFile:
         """Test validation of missing file."""
         mock_exists.return_value = False
         assert validate_audio_file("missing.mp3") is False
+
+    def test_validate_audio_file_by_magic_bytes(self, tmp_path):
+        """Test that a recognised container passes whatever its extension."""
+        recording = tmp_path / "clip.mov"
+        recording.write_bytes(b"\x00\x00\x00\x14ftypqt  " + b"\x00" * 16)
+        assert validate_audio_file(str(recording)) is True
+
+        notes = tmp_path / "notes.txt"
+        notes.write_text("hello")
+        assert validate_audio_file(str(notes)) is False
+
+    def test_validate_audio_file_rejects_heic(self, tmp_path):
+        """Test that an ISO media image (HEIC) is not taken for audio."""
+        for name in ("photo.heic", "photo.m4a"):
+            photo = tmp_path / name
+            photo.write_bytes(b"\x00\x00\x00\x18ftypheic\x00\x00\x00\x00mif1heic")
+            assert validate_audio_file(str(photo)) is False
+
+
+class TestDetectFormat:
+    """Tests for container detection by magic bytes."""
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            (b"RIFF\x24\x00\x00\x00WAVEfmt ", "wav"),
+            (b"ID3\x04\x00\x00\x00\x00\x00\x00", "mp3"),
+            (b"\xff\xfb\x90\x64\x00", "mp3"),
+            (b"\xff\xf1\x50\x80\x00", "aac"),
+            (b"OggS\x00\x02\x00\x00", "ogg"),
+            (b"fLaC\x00\x00\x00\x22", "flac"),
+            (b"\x00\x00\x00\x20ftypM4A \x00\x00", "m4a"),
+            (b"\x00\x00\x00\x20ftypisom\x00\x00", "mp4"),
+            (b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom", "mp4"),
+            (b"\x00\x00\x00\x18ftypXYZ \x00\x00\x00\x00M4A isom", "m4a"),
+            (b"\x00\x00\x00\x18ftypheic\x00\x00\x00\x00mif1heic", None),
+            (b"\x00\x00\x00\x1cftypavif\x00\x00\x00\x00avifmif1miaf", None),
+            (b"\x00\x00\x00\x18ftypmif1\x00\x00\x00\x00mif1isom", None),
+            (b"\x00\x00\x00\x14ftypcrx \x00\x00\x00\x01crx ", None),
+            (b"\x1a\x45\xdf\xa3\x9fB\x86\x81\x01B\x82\x84webm", "webm"),
+            (b"hello world, not audio", None),
+        ],
+    )
+    def test_detects_containers(self, header, expected):
+        """Test that common containers are identified."""
+        assert detect_format(header) == expected
+
+
+class TestPrepareUpload:
+    """Tests for compacting audio before upload."""
+
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=False)
+    def test_without_ffmpeg_names_real_container(self, _mock_ffmpeg, tmp_path):
+        """Test that a mislabelled file is uploaded under its real extension."""
+        path = tmp_path / "voice.dat"
+        path.write_bytes(b"OggS" + b"\x00" * 60)
+
+        [part] = prepare_upload(str(path))
+
+        assert part.name == "voice.ogg"
+        assert part.data == path.read_bytes()
+
+    @patch("ankicard.core.transcription.MAX_UPLOAD_BYTES", 10)
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=False)
+    def test_without_ffmpeg_rejects_oversized(self, _mock_ffmpeg, tmp_path):
+        """Test that an oversized file fails with a hint instead of uploading."""
+        path = tmp_path / "long.wav"
+        path.write_bytes(b"\x00" * 20)
+
+        with pytest.raises(ValueError, match="Install ffmpeg"):
+            prepare_upload(str(path))
+
+    @patch("ankicard.core.transcription.LONG_AUDIO_SECONDS", 5)
+    @patch("ankicard.core.transcription.CHUNK_SECONDS", 6)
+    @patch("ankicard.core.transcription.subprocess.run")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=True)
+    def test_long_audio_split_by_voice_activity(self, _mock_ffmpeg, mock_run, tmp_path):
+        """Test that long audio is decoded to 16 kHz mono and cut at pauses."""
+        rate = 16000
+        speech = tone_at(4.0, rate)
+        pause = np.zeros(2 * rate, dtype=np.float32)
+        decoded = write_wav(
+            np.concatenate([speech, pause, speech, pause, speech]), rate
+        )
+        encoded_lengths = []
+
+        def run(cmd, input=None, **kwargs):
+            if input is None:
+                return subprocess.CompletedProcess(cmd, 0, decoded, b"")
+            samples, piece_rate = read_wav(input)
+            encoded_lengths.append(len(samples) / piece_rate)
+            return subprocess.CompletedProcess(cmd, 0, b"opus", b"")
+
+        mock_run.side_effect = run
+
+        parts = prepare_upload(str(tmp_path / "lecture.mp4"))
+
+        decode_cmd = mock_run.call_args_list[0].args[0]
+        assert decode_cmd[decode_cmd.index("-ac") + 1] == "1"
+        assert decode_cmd[decode_cmd.index("-ar") + 1] == "16000"
+        assert "-vn" in decode_cmd
+        assert "libopus" in mock_run.call_args_list[1].args[0]
+        assert [part.name for part in parts] == ["part0.ogg", "part1.ogg", "part2.ogg"]
+        assert [part.offset for part in parts] == pytest.approx(
+            [0.0, 5.9, 11.9], abs=0.05
+        )
+        assert all(length <= 6 for length in encoded_lengths)
+
+    @patch("ankicard.core.transcription.subprocess.run")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=True)
+    def test_short_audio_is_one_part(self, _mock_ffmpeg, mock_run, tmp_path):
+        """Test that a short clip is sent whole, silence included."""
+        decoded = write_wav(tone_at(3.0, 16000), 16000)
+        mock_run.side_effect = lambda cmd, input=None, **kw: (
+            subprocess.CompletedProcess(cmd, 0, decoded if input is None else b"", b"")
+        )
+
+        [part] = prepare_upload(str(tmp_path / "clip.wav"))
+
+        assert part.offset == 0.0
+        assert mock_run.call_count == 2
+
+
+def tone_at(seconds, rate):
+    t = np.arange(int(seconds * rate)) / rate
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+@patch("ankicard.core.transcription.is_ffmpeg_available", Mock(return_value=False))
+class TestParallelTranscription:
+    """Tests for transcribing upload parts concurrently."""
+
+    def _parts(self):
+        return [
+            UploadPart("part0.ogg", b"a", 0.0),
+            UploadPart("part1.ogg", b"b", 31.5),
+        ]
+
+    @patch("ankicard.core.transcription.OpenAI")
+    @patch("ankicard.core.transcription.prepare_upload")
+    def test_parts_are_joined_in_order(self, mock_prepare, mock_openai_class, tmp_path):
+        """Test that each part is transcribed and the text joined in order."""
+        path = tmp_path / "long.wav"
+        path.write_bytes(b"audio")
+        mock_prepare.return_value = self._parts()
+        create = mock_openai_class.return_value.audio.transcriptions.create
+        texts = {"part0.ogg": "一つ目", "part1.ogg": "二つ目"}
+        create.side_effect = lambda file, **kw: texts[file[0]]
+
+        assert transcribe_audio(str(path), "test-key") == "一つ目\n二つ目"
+        assert sorted(c.kwargs["file"] for c in create.call_args_list) == [
+            ("part0.ogg", b"a"),
+            ("part1.ogg", b"b"),
+        ]
+
+    @patch("ankicard.core.transcription.OpenAI")
+    @patch("ankicard.core.transcription.prepare_upload")
+    def test_segments_shifted_by_offset(
+        self, mock_prepare, mock_openai_class, tmp_path
+    ):
+        """Test that segment times refer to the original recording."""
+        path = tmp_path / "long.wav"
+        path.write_bytes(b"audio")
+        mock_prepare.return_value = self._parts()
+        create = mock_openai_class.return_value.audio.transcriptions.create
+        segments = {
+            "part0.ogg": [Mock(start=0.5, end=2.0, text=" 一つ目。")],
+            "part1.ogg": [
+                Mock(start=0.2, end=1.5, text="二つ目。"),
+                Mock(start=1.5, end=1.6, text=" "),
+            ],
+        }
+        create.side_effect = lambda file, **kw: Mock(segments=segments[file[0]])
+
+        result = transcribe_segments(str(path), "test-key")
+
+        assert result == [
+            Segment(0.5, 2.0, "一つ目。"),
+            Segment(pytest.approx(31.7), pytest.approx(33.0), "二つ目。"),
+        ]
+        assert create.call_args.kwargs["response_format"] == "verbose_json"
+
+    @patch("ankicard.core.transcription.OpenAI")
+    @patch("ankicard.core.transcription.prepare_upload")
+    def test_failed_part_fails_transcription(
+        self, mock_prepare, mock_openai_class, tmp_path
+    ):
+        """Test that an error in any part surfaces as a transcription failure."""
+        path = tmp_path / "long.wav"
+        path.write_bytes(b"audio")
+        mock_prepare.return_value = self._parts()
+        create = mock_openai_class.return_value.audio.transcriptions.create
+
+        def create_transcript(file, **kwargs):
+            if file[0] == "part1.ogg":
+                raise Exception("boom")
+            return "ok"
+
+        create.side_effect = create_transcript
+
+        with pytest.raises(Exception, match="Transcription failed: boom"):
+            transcribe_audio(str(path), "test-key")
+
+
+def seg(start, end, text):
+    return Mock(start=start, end=end, text=text)
+
+
+class TestAssignSegments:
+    """Tests for mapping packed segments back to clips."""
+
+    SPANS = [(0.0, 3.0), (4.0, 6.0), (7.0, 10.0)]
+
+    def test_one_segment_per_clip(self):
+        """Test that segments inside each clip map straight back."""
+        segments = [seg(0.1, 2.9, "一。"), seg(4.0, 6.1, "二。"), seg(6.8, 9.5, "三。")]
+        assert assign_segments(segments, self.SPANS, 1.0) == ["一。", "二。", "三。"]
+
+    def test_segments_joined_within_clip(self):
+        """Test that several segments of one clip are concatenated."""
+        segments = [
+            seg(0.0, 1.5, "前半、"),
+            seg(1.5, 3.0, "後半。"),
+            seg(4.0, 6.0, "二。"),
+            seg(7.0, 10.0, "三。"),
+        ]
+        assert assign_segments(segments, self.SPANS, 1.0)[0] == "前半、後半。"
+
+    def test_straddling_segment_is_ambiguous(self):
+        """Test that a segment across a clip boundary marks both clips."""
+        segments = [seg(0.0, 2.0, "一"), seg(2.0, 5.5, "一二"), seg(7.0, 10.0, "三。")]
+        assert assign_segments(segments, self.SPANS, 1.0) == [None, None, "三。"]
+
+    def test_clip_without_segments_is_ambiguous(self):
+        """Test that a clip Whisper skipped is redone rather than left blank."""
+        segments = [seg(0.0, 3.0, "一。"), seg(7.0, 10.0, "三。")]
+        assert assign_segments(segments, self.SPANS, 1.0) == ["一。", None, "三。"]
+
+
+class TestTranscribeClips:
+    """Tests for packing short clips into one request."""
+
+    def _clips(self, tmp_path, count):
+        paths = []
+        for i in range(count):
+            path = tmp_path / f"clip{i}.mp3"
+            path.write_bytes(b"audio")
+            paths.append(str(path))
+        return paths
+
+    @patch("ankicard.core.transcription.transcribe_audio")
+    @patch("ankicard.core.transcription._encode_opus", return_value=b"opus")
+    @patch("ankicard.core.transcription.decode_mono")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.transcription.OpenAI")
+    def test_packs_clips_into_one_request(
+        self,
+        mock_openai_class,
+        _mock_ffmpeg,
+        mock_decode,
+        mock_encode,
+        mock_single,
+        tmp_path,
+    ):
+        """Test that clips share one upload and map back by offset."""
+        mock_decode.return_value = (np.zeros(2 * 16000, dtype=np.float32), 16000)
+        create = mock_openai_class.return_value.audio.transcriptions.create
+        # Clips sit at 0-2 s, 3-5 s and 6-8 s with 1 s gaps
+        create.return_value = Mock(
+            segments=[
+                seg(0.0, 2.0, "一。"),
+                seg(3.0, 5.0, "二。"),
+                seg(6.0, 8.0, "三。"),
+            ]
+        )
+
+        result = transcribe_clips(self._clips(tmp_path, 3), "test-key")
+
+        assert result == ["一。", "二。", "三。"]
+        create.assert_called_once()
+        assert create.call_args.kwargs["response_format"] == "verbose_json"
+        samples, _ = read_wav(mock_encode.call_args.args[0])
+        assert len(samples) == 3 * 3 * 16000
+        mock_single.assert_not_called()
+
+    @patch("ankicard.core.transcription.transcribe_audio")
+    @patch("ankicard.core.transcription._encode_opus", return_value=b"opus")
+    @patch("ankicard.core.transcription.decode_mono")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.transcription.OpenAI")
+    def test_ambiguous_clips_fall_back(
+        self,
+        mock_openai_class,
+        _mock_ffmpeg,
+        mock_decode,
+        _mock_encode,
+        mock_single,
+        tmp_path,
+    ):
+        """Test that clips with an unclear mapping are transcribed alone."""
+        mock_decode.return_value = (np.zeros(2 * 16000, dtype=np.float32), 16000)
+        create = mock_openai_class.return_value.audio.transcriptions.create
+        create.return_value = Mock(
+            segments=[seg(0.0, 4.5, "一二"), seg(6.0, 8.0, "三。")]
+        )
+        mock_single.side_effect = lambda path, *args, **kw: f"single:{path[-9:]}"
+        paths = self._clips(tmp_path, 3)
+
+        result = transcribe_clips(paths, "test-key")
+
+        assert result == ["single:clip0.mp3", "single:clip1.mp3", "三。"]
+        assert sorted(c.args[0] for c in mock_single.call_args_list) == paths[:2]
+
+    @patch("ankicard.core.transcription.MAX_PACK_SECONDS", 7)
+    @patch("ankicard.core.transcription._encode_opus", return_value=b"opus")
+    @patch("ankicard.core.transcription.decode_mono")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.transcription.OpenAI")
+    def test_packs_are_capped(
+        self, mock_openai_class, _mock_ffmpeg, mock_decode, _mock_encode, tmp_path
+    ):
+        """Test that clips beyond the pack length go into further requests."""
+        mock_decode.return_value = (np.zeros(2 * 16000, dtype=np.float32), 16000)
+        create = mock_openai_class.return_value.audio.transcriptions.create
+        create.return_value = Mock(
+            segments=[seg(0.0, 2.0, "一。"), seg(3.0, 5.0, "二。")]
+        )
+
+        result = transcribe_clips(self._clips(tmp_path, 4), "test-key")
+
+        assert result == ["一。", "二。", "一。", "二。"]
+        assert create.call_count == 2
+
+    @patch("ankicard.core.transcription.transcribe_audio")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=False)
+    def test_without_ffmpeg_per_clip(self, _mock_ffmpeg, mock_single, tmp_path):
+        """Test that each clip is sent on its own without ffmpeg."""
+        mock_single.side_effect = lambda path, *args, **kw: path[-9:]
+
+        result = transcribe_clips(self._clips(tmp_path, 2), "test-key")
+
+        assert result == ["clip0.mp3", "clip1.mp3"]
+
+
+class TestFingerprintReuse:
+    """Tests for reusing transcripts of re-encoded audio."""
+
+    @patch("ankicard.core.transcription._encode_opus", return_value=b"opus")
+    @patch("ankicard.core.transcription.decode_mono")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.transcription.OpenAI")
+    def test_near_duplicate_skips_whisper(
+        self, mock_openai_class, _mock_ffmpeg, mock_decode, _mock_encode, tmp_path
+    ):
+        """Test that a re-encoded copy reuses the first transcript."""
+        from tests.test_fingerprint import reencoded, speech_like
+
+        first = tmp_path / "line.mp3"
+        first.write_bytes(b"mp3 data")
+        second = tmp_path / "line.m4a"
+        second.write_bytes(b"m4a data")
+        decoded = {
+            str(first): (speech_like(1), 16000),
+            str(second): (reencoded(speech_like(1)), 16000),
+        }
+        mock_decode.side_effect = lambda path: decoded[path]
+        create = mock_openai_class.return_value.audio.transcriptions.create
+        create.return_value = "同じ台詞"
+
+        assert transcribe_audio(str(first), "test-key") == "同じ台詞"
+        assert transcribe_audio(str(second), "test-key") == "同じ台詞"
+        create.assert_called_once()
+
+    @patch("ankicard.core.transcription._encode_opus", return_value=b"opus")
+    @patch("ankicard.core.transcription.decode_mono")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.transcription.OpenAI")
+    def test_reuse_can_be_turned_off(
+        self, mock_openai_class, _mock_ffmpeg, mock_decode, _mock_encode, tmp_path
+    ):
+        """Test that reuse=False sends a near-duplicate to Whisper anyway."""
+        from tests.test_fingerprint import reencoded, speech_like
+
+        first = tmp_path / "line.mp3"
+        first.write_bytes(b"mp3 data")
+        second = tmp_path / "line.m4a"
+        second.write_bytes(b"m4a data")
+        decoded = {
+            str(first): (speech_like(1), 16000),
+            str(second): (reencoded(speech_like(1)), 16000),
+        }
+        mock_decode.side_effect = lambda path: decoded[path]
+        create = mock_openai_class.return_value.audio.transcriptions.create
+        create.side_effect = ["同じ台詞", "おなじせりふ"]
+
+        assert transcribe_audio(str(first), "test-key") == "同じ台詞"
+        assert transcribe_audio(str(second), "test-key", reuse=False) == (
+            "おなじせりふ"
+        )
+
+    @patch("ankicard.core.transcription._encode_opus", return_value=b"opus")
+    @patch("ankicard.core.transcription.decode_mono")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.transcription.OpenAI")
+    def test_different_audio_is_transcribed(
+        self, mock_openai_class, _mock_ffmpeg, mock_decode, _mock_encode, tmp_path
+    ):
+        """Test that unrelated audio still goes to Whisper."""
+        from tests.test_fingerprint import speech_like
+
+        first = tmp_path / "one.mp3"
+        first.write_bytes(b"one")
+        second = tmp_path / "two.mp3"
+        second.write_bytes(b"two")
+        decoded = {str(first): speech_like(1), str(second): speech_like(2)}
+        mock_decode.side_effect = lambda path: (decoded[path], 16000)
+        create = mock_openai_class.return_value.audio.transcriptions.create
+        create.side_effect = ["一", "二"]
+
+        assert transcribe_audio(str(first), "test-key") == "一"
+        assert transcribe_audio(str(second), "test-key") == "二"
+
+    @patch("ankicard.core.transcription._encode_opus", return_value=b"opus")
+    @patch("ankicard.core.transcription.decode_mono")
+    @patch("ankicard.core.transcription.is_ffmpeg_available", return_value=True)
+    @patch("ankicard.core.transcription.compute_fingerprint")
+    @patch("ankicard.core.transcription.OpenAI")
+    def test_long_audio_is_not_fingerprinted(
+        self,
+        mock_openai_class,
+        mock_fingerprint,
+        _mock_ffmpeg,
+        mock_decode,
+        _mock_encode,
+        tmp_path,
+    ):
+        """Test that recordings over LONG_AUDIO_SECONDS skip the index."""
+        audio_file = tmp_path / "lecture.mp3"
+        audio_file.write_bytes(b"mp3 data")
+        mock_decode.return_value = (np.zeros(16000 * 61, dtype=np.float32), 16000)
+        create = mock_openai_class.return_value.audio.transcriptions.create
+        create.return_value = ""
+
+        transcribe_audio(str(audio_file), "test-key")
+
+        mock_fingerprint.assert_not_called()
+
+
+class TestFindAudioFiles:
+    """Tests for walking a directory of clips."""
+
+    def test_recurses_and_skips_non_audio(self, tmp_path):
+        """Test that nested clips are found and other files ignored."""
+        (tmp_path / "b.mp3").write_bytes(b"ID3audio")
+        (tmp_path / "notes.txt").write_text("not audio")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "a.wav").write_bytes(write_wav(np.zeros(160), 16000))
+
+        found = find_audio_files(str(tmp_path))
+
+        assert [p.relative_to(tmp_path).as_posix() for p in found] == [
+            "b.mp3",
+            "sub/a.wav",
+        ]
+
+
+class TestAudioDuration:
+    """Tests for measuring audio length."""
+
+    @patch("ankicard.core.transcription.shutil.which", return_value=None)
+    def test_wav_without_ffprobe(self, _mock_which, tmp_path):
+        """Test that WAV length is read from the header."""
+        clip = tmp_path / "clip.wav"
+        clip.write_bytes(write_wav(np.zeros(24000), 16000))
+
+        assert audio_duration(str(clip)) == 1.5
+
+    @patch("ankicard.core.transcription.shutil.which", return_value=None)
+    def test_unknown_without_ffprobe(self, _mock_which, tmp_path):
+        """Test that other formats have no duration without ffprobe."""
+        clip = tmp_path / "clip.mp3"
+        clip.write_bytes(b"ID3audio")
+
+        assert audio_duration(str(clip)) is None
+
+    @patch("ankicard.core.transcription.subprocess.run")
+    @patch("ankicard.core.transcription.shutil.which", return_value="/bin/ffprobe")
+    def test_ffprobe(self, _mock_which, mock_run, tmp_path):
+        """Test that ffprobe's reported duration is used."""
+        mock_run.return_value = Mock(stdout="2.345678\n")
+
+        assert audio_duration(str(tmp_path / "clip.mp3")) == 2.346
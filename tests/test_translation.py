@@ -1,3 +1,5 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch
 import pytest
 from ankicard.core.translation import (
@@ -60,19 +62,43 @@ class TestTranslateToEnglish:
 
 
 class TestGetTranslator:
-    """Tests for translator singleton."""
-
-    def test_translator_singleton(self):
-        """Test that get_translator returns the same instance."""
-        # Reset the global translator
-        import ankicard.core.translation as translation_module
-
-        translation_module._translator = None
+    """Tests for the per-thread translator."""
 
+    def test_translator_reused_within_thread(self):
+        """Test that get_translator returns the same instance in one thread."""
         translator1 = get_translator()
         translator2 = get_translator()
         assert translator1 is translator2
 
+    def test_translator_per_thread(self):
+        """Test that each thread gets its own translator."""
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            other = pool.submit(get_translator).result()
+
+        assert other is not get_translator()
+
+    @patch("ankicard.core.translation.GoogleTranslator")
+    def test_concurrent_translations_do_not_mix(self, mock_translator_cls):
+        """Test that two threads translating at once each get their own text."""
+        barrier = threading.Barrier(2)
+
+        class StatefulTranslator:
+            # Like deep_translator, keeps the request on the instance
+            def __init__(self, **kwargs):
+                self.text = None
+
+            def translate(self, text):
+                self.text = text
+                barrier.wait(timeout=5)
+                return f"en:{self.text}"
+
+        mock_translator_cls.side_effect = StatefulTranslator
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(translate_to_english, ["犬", "猫"]))
+
+        assert results == ["en:犬", "en:猫"]
+
     def test_translator_configuration(self):
         """Test that translator is configured for Japanese to English."""
         translator = get_translator()